@@ -2,5 +2,6 @@ from .galSimDetector import *
 from .galSimCelestialObject import *
 from .galSimNoiseAndBackground import *
 from .galSimPSF import *
+from .galSimTemplateBank import *
 from .galSimInterpreter import *
 from .galSimCatalogs import *
@@ -12,13 +12,12 @@ GalSimStars
 
 import numpy
 import os
-import copy
 import lsst.utils
 from lsst.sims.utils import arcsecFromRadians
 from lsst.sims.catalogs.measures.instance import InstanceCatalog, cached, is_null
 from lsst.sims.catUtils.mixins import CameraCoords, AstrometryGalaxies, AstrometryStars, \
                                       EBVmixin
-from lsst.sims.GalSimInterface import GalSimInterpreter, GalSimDetector, GalSimCelestialObject
+from lsst.sims.GalSimInterface import GalSimInterpreter, GalSimDetector, GalSimObjectBatch
 from lsst.sims.photUtils import Sed, Bandpass, PhotometryHardware, \
                                 PhotometricParameters, LSSTdefaults
 import lsst.afw.cameraGeom.testUtils as camTestUtils
@@ -151,6 +150,129 @@ class GalSimBase(InstanceCatalog, CameraCoords, PhotometryHardware):
     #which will be applied to the FITS images when they are created
     noise_and_background = None
 
+    #If True, objects are drawn onto postage stamps sized to the object which are
+    #then added into the detector images.  If False, each object is drawn onto
+    #a blank image the size of the whole detector (much slower).
+    useStamps = True
+
+    #If False, the detectors illumined by each object are found from an estimate of
+    #the object's extent based on its GalSim profile.  If True, they are found by
+    #drawing a photon-shot test image of each object (much slower).
+    exactFootprint = False
+
+    #The maximum number of object footprints the GalSimInterpreter will cache, and
+    #the fractional tolerance to which the half light radius, Sersic index and axis ratio
+    #of two galaxies must agree for them to share a cached footprint
+    footprintCacheSize = 10000
+    footprintCacheTolerance = 0.05
+
+    #If True (and if noise_and_background adds noise), the footprints and postage stamps
+    #of objects are sized so that the light falling outside of them is comparable to the
+    #sky noise in a single pixel, i.e. bright objects get larger stamps.  Faint objects do
+    #not get smaller stamps: photons falling off a stamp are lost, so shrinking the stamps
+    #of faint objects would bias their photometry.  This changes the images of bright
+    #objects, so it is off by default.
+    skyLimitedFootprint = False
+
+    #If True and the PSF is wavelength dependent, the footprint of each object is only
+    #evaluated once, in the bandpass with the widest PSF, rather than once per bandpass
+    singleFootprintPass = False
+
+    #The numpy type in which the pixels of the images are stored.  numpy.int32
+    #images contain electrons rather than ADU.
+    pixelDtype = numpy.float32
+
+    #If True and the PSF is not wavelength dependent, objects are drawn as achromatic
+    #profiles scaled by their fluxes in each bandpass, rather than having GalSim
+    #integrate over their SEDs
+    achromaticFastPath = False
+
+    #If True (and objects are being drawn by the achromatic fast path), the photons of
+    #each object are shot once and divided among the bandpasses
+    sharedPhotons = False
+
+    #How objects are drawn onto postage stamps: 'phot' (photon shooting), 'fft', or 'auto'.
+    #'auto' draws objects brighter than fftFluxThreshold electrons (and fftPhotonsPerPixel
+    #electrons per pixel of their postage stamps) with an FFT, as long as their postage
+    #stamps are no larger than fftMaxStampSize pixels on a side.
+    drawMethod = 'phot'
+    fftFluxThreshold = 1.0e6
+    fftPhotonsPerPixel = 20.0
+    fftMaxStampSize = 1024
+
+    #The maximum number of photons to shoot for an object in one bandpass on one detector
+    #(None for no limit).  Brighter objects are drawn with photons carrying more than one
+    #electron each, as long as the extra variance this adds to their brightest pixels is
+    #less than photonNoiseFraction times the variance those pixels would otherwise have
+    #(the Poisson variance of the object plus the sky noise).  Integer images
+    #(see pixelDtype) are always drawn with photons carrying one electron each.
+    maxPhotons = None
+    photonNoiseFraction = 0.1
+
+    #Objects whose predicted signal to noise ratio in a bandpass is below snrFloor are not
+    #drawn in that bandpass (None to draw all objects).  Objects which are too faint to be
+    #drawn in any bandpass are not drawn at all, and their fitsFiles entries are None.
+    snrFloor = None
+
+    #If True, the flux of objects too faint to be drawn (see snrFloor) is added to a smooth
+    #background on each detector, interpolated from a grid of cells faintBackgroundCellSize
+    #pixels on a side, rather than being discarded
+    faintBackground = False
+    faintBackgroundCellSize = 32
+
+    #The maximum number of unit Sersic profiles the GalSimInterpreter will cache, keyed on
+    #Sersic index, and the spacing of the grid onto which Sersic indices are rounded before
+    #drawing (None to draw the exact indices)
+    sersicCacheSize = 100
+
+    #The maximum number of galsim.SEDs to cache.  Objects with the same SED file, redshift,
+    #and dust parameters share one galsim.SED, scaled by their own normalizations.
+    spectrumCacheSize = 1000
+    sersicIndexStep = None
+
+    #An instantiation of GalSimTemplateBank.  If not None (and if the PSF depends on
+    #neither position nor wavelength), galaxies are drawn from pre-rendered images of
+    #PSF-convolved Sersic profiles rather than being convolved with the PSF one by one.
+    templateBank = None
+
+    #If True (and if the PSF is not wavelength dependent), the photons of objects which
+    #illumine several detectors are shot once and binned into whichever detector they land
+    #on, rather than being shot once per detector
+    shootStraddlersOnce = False
+
+    #If True (and if achromaticFastPath is True and the PSF depends on neither position nor
+    #wavelength), the point sources in each chunk of the catalog are drawn together, by shooting
+    #all of their photons from the PSF at once and binning them into the images with numpy.
+    #At most pointSourcePhotonBatchSize photons are shot and binned at a time.
+    batchPointSources = False
+    pointSourcePhotonBatchSize = 1000000
+
+    #Point sources depositing fewer than psfStampFluxThreshold electrons in a bandpass are drawn
+    #by copying a pre-rendered image of the PSF (sampled psfStampOversampling times per pixel,
+    #and re-rendered every psfStampPositionStep arcseconds if the PSF is position dependent)
+    #rather than by photon shooting.  None draws all point sources with GalSim.
+    psfStampFluxThreshold = None
+    psfStampOversampling = 4
+    psfStampPositionStep = 60.0
+
+    #If True (and if achromaticFastPath is True and the PSF is a sum of circular Gaussians
+    #which depends on neither position nor wavelength, e.g. DoubleGaussianPSF or SNRdocumentPSF),
+    #the point sources in each chunk of the catalog are drawn by integrating the PSF over pixels
+    #analytically, with Poisson noise added to the expected counts of each of them
+    analyticPointSources = False
+
+    #Galaxies whose half light radius is less than unresolvedRadiusRatio times that of the PSF
+    #(and whose Sersic index is at most 1.5) are drawn as the PSF, broadened and sheared to match
+    #the second moments of the galaxy convolved with the PSF, rather than as Sersic profiles
+    #convolved with the PSF (see GalSimInterpreter.__init__ for its accuracy).  Galaxies
+    #whose half light radius is less than pointSourceRadiusRatio times that of the PSF are drawn
+    #as point sources (and so by any of the point source fast paths above).  None disables either.
+    #The half light radius of a position dependent PSF is evaluated on a grid of pupil
+    #coordinates with a spacing of psfRadiusPositionStep arcseconds.
+    unresolvedRadiusRatio = None
+    pointSourceRadiusRatio = None
+    psfRadiusPositionStep = 60.0
+
     #Stores the gain and readnoise
     photParams = PhotometricParameters()
 
@@ -160,6 +282,8 @@ class GalSimBase(InstanceCatalog, CameraCoords, PhotometryHardware):
 
 
     uniqueSeds = {} #a cache for un-normalized SED files, so that we do not waste time on I/O
+    uniqueSedMagnitudes = {} #the imsim magnitudes of the un-normalized SEDs in uniqueSeds
+    uniqueSedDust = {} #the CCM dust coefficients (a, b) evaluated on the wavelength grids of uniqueSeds
 
     hasBeenInitialized = False
 
@@ -231,12 +355,10 @@ class GalSimBase(InstanceCatalog, CameraCoords, PhotometryHardware):
                     sedFile = os.path.join(self.sedDir, sedName)
                     sed.readSED_flambda(sedFile)
 
-                    flambdaCopy = copy.deepcopy(sed.flambda)
-
                     #If the SED is zero inside of the bandpass, GalSim raises an error.
                     #This sets a minimum flux value of 1.0e-30 so that the SED is never technically
                     #zero inside of the bandpass.
-                    sed.flambda = numpy.array([ff if ff>1.0e-30 else 1.0e-30 for ff in flambdaCopy])
+                    sed.flambda = numpy.where(sed.flambda>1.0e-30, sed.flambda, 1.0e-30)
                     sed.fnu = None
 
                     #copy the unnormalized file to uniqueSeds so we don't have to read it in again
@@ -244,6 +366,11 @@ class GalSimBase(InstanceCatalog, CameraCoords, PhotometryHardware):
                                   fnu=sed.fnu, name=sed.name)
                     self.uniqueSeds[sedName] = sedCopy
 
+                    #the magnitude and dust coefficients of the unnormalized SED only depend on
+                    #the file, so there is no need to calculate them for every object
+                    self.uniqueSedMagnitudes[sedName] = sedCopy.calcMag(imsimband)
+                    self.uniqueSedDust[sedName] = sedCopy.setupCCMab()
+
                 #normalize the SED
                 #Consulting the file sed.py in GalSim/galsim/ it appears that GalSim expects
                 #its SEDs to ultimately be in units of ergs/nm so that, when called, they can
@@ -262,12 +389,14 @@ class GalSimBase(InstanceCatalog, CameraCoords, PhotometryHardware):
                 #We will take these parameters from an instantiation of the PhotometricParameters
                 #class (which can be reassigned by defining a daughter class of this class)
                 #
-                fNorm = sed.calcFluxNorm(norm, imsimband)
-                sed.multiplyFluxNorm(fNorm*self.photParams.exptime*self.photParams.effarea*self.photParams.nexp)
+                #this is equivalent to sed.calcFluxNorm(norm, imsimband)
+                fNorm = numpy.power(10.0, -0.4*(norm - self.uniqueSedMagnitudes[sedName]))
+                normalization = fNorm*self.photParams.exptime*self.photParams.effarea*self.photParams.nexp
+                sed.multiplyFluxNorm(normalization)
 
                 #apply dust extinction (internal)
+                a_int, b_int = self.uniqueSedDust[sedName]
                 if iAv != 0.0 and iRv != 0.0:
-                    a_int, b_int = sed.setupCCMab()
                     sed.addCCMDust(a_int, b_int, A_v=iAv, R_v=iRv)
 
                 #22 June 2015
@@ -277,9 +406,18 @@ class GalSimBase(InstanceCatalog, CameraCoords, PhotometryHardware):
                 if zz != 0.0:
                     sed.redshiftSED(zz, dimming=True)
 
-                #apply dust extinction (galactic)
-                a_int, b_int = sed.setupCCMab()
+                #apply dust extinction (galactic); the dust coefficients of the
+                #unnormalized SED can only be re-used if it has not been redshifted
+                if zz != 0.0:
+                    a_int, b_int = sed.setupCCMab()
                 sed.addCCMDust(a_int, b_int, A_v=gAv, R_v=gRv)
+
+                #dust and redshift act linearly on the SED, so it is the normalization times
+                #an unnormalized template which only depends on these parameters; the
+                #GalSimInterpreter converts each template into a galsim.SED only once
+                #(see GalSimInterpreter._getSpectrum)
+                sed.galSimTemplate = (sedName, float(zz), float(iAv), float(iRv), float(gAv), float(gRv))
+                sed.galSimNormalization = normalization
                 sedList.append(sed)
 
         return sedList
@@ -315,9 +453,8 @@ class GalSimBase(InstanceCatalog, CameraCoords, PhotometryHardware):
             self._initializeGalSimCatalog()
 
         output = []
-        for (name, ra, dec, xp, yp, hlr, minor, major, pa, ss, sn) in \
-            zip(objectNames, raObserved, decObserved, xPupil, yPupil, halfLight, \
-                minorAxis, majorAxis, positionAngle, sedList, sindex):
+        drawnIndices = []
+        for (name, ss) in zip(objectNames, sedList):
 
             if ss is None or name in self.objectHasBeenDrawn:
                 #do not draw objects that have no SED or have already been drawn
@@ -336,13 +473,27 @@ class GalSimBase(InstanceCatalog, CameraCoords, PhotometryHardware):
 
                 self.objectHasBeenDrawn.append(name)
 
-                gsObj = GalSimCelestialObject(self.galsim_type, ss, ra, dec, xp, yp, \
-                                              hlr, minor, major, pa, sn)
+                #the detectors will be filled in once the objects are drawn
+                drawnIndices.append(len(output))
+                output.append(None)
+
+        if len(drawnIndices) > 0:
+            #collect the objects to be drawn into arrays, rather than creating a
+            #GalSimCelestialObject for each of them
+            drawnIndices = numpy.array(drawnIndices)
+            gsObjectBatch = GalSimObjectBatch(self.galsim_type, [sedList[ix] for ix in drawnIndices],
+                                              raObserved[drawnIndices], decObserved[drawnIndices],
+                                              xPupil[drawnIndices], yPupil[drawnIndices],
+                                              halfLight[drawnIndices], minorAxis[drawnIndices],
+                                              majorAxis[drawnIndices], positionAngle[drawnIndices],
+                                              sindex[drawnIndices])
 
-                #actually draw the object
-                detectorsString = self.galSimInterpreter.drawObject(gsObj)
+            #actually draw the objects (the detectors illumined by all of the objects
+            #in this chunk are found at once, before any of them are drawn)
+            detectorsStringList = self.galSimInterpreter.drawObjectList(gsObjectBatch)
 
-                output.append(detectorsString)
+            for ix, detectorsString in zip(drawnIndices, detectorsStringList):
+                output[ix] = detectorsString
 
         return numpy.array(output)
 
@@ -489,7 +640,38 @@ class GalSimBase(InstanceCatalog, CameraCoords, PhotometryHardware):
 
             self.galSimInterpreter = GalSimInterpreter(obs_metadata=self.obs_metadata, epoch=self.db_obj.epoch, detectors=detectors,
                                                        bandpassDict=self.bandpassDict, noiseWrapper=self.noise_and_background,
-                                                       seed=self.seed)
+                                                       seed=self.seed, useStamps=self.useStamps,
+                                                       exactFootprint=self.exactFootprint,
+                                                       footprintCacheSize=self.footprintCacheSize,
+                                                       footprintCacheTolerance=self.footprintCacheTolerance,
+                                                       skyLimitedFootprint=self.skyLimitedFootprint,
+                                                       singleFootprintPass=self.singleFootprintPass,
+                                                       pixelDtype=self.pixelDtype,
+                                                       achromaticFastPath=self.achromaticFastPath,
+                                                       sharedPhotons=self.sharedPhotons,
+                                                       drawMethod=self.drawMethod,
+                                                       fftFluxThreshold=self.fftFluxThreshold,
+                                                       fftPhotonsPerPixel=self.fftPhotonsPerPixel,
+                                                       fftMaxStampSize=self.fftMaxStampSize,
+                                                       maxPhotons=self.maxPhotons,
+                                                       photonNoiseFraction=self.photonNoiseFraction,
+                                                       snrFloor=self.snrFloor,
+                                                       faintBackground=self.faintBackground,
+                                                       faintBackgroundCellSize=self.faintBackgroundCellSize,
+                                                       sersicCacheSize=self.sersicCacheSize,
+                                                       spectrumCacheSize=self.spectrumCacheSize,
+                                                       sersicIndexStep=self.sersicIndexStep,
+                                                       templateBank=self.templateBank,
+                                                       shootStraddlersOnce=self.shootStraddlersOnce,
+                                                       batchPointSources=self.batchPointSources,
+                                                       pointSourcePhotonBatchSize=self.pointSourcePhotonBatchSize,
+                                                       psfStampFluxThreshold=self.psfStampFluxThreshold,
+                                                       psfStampOversampling=self.psfStampOversampling,
+                                                       psfStampPositionStep=self.psfStampPositionStep,
+                                                       analyticPointSources=self.analyticPointSources,
+                                                       unresolvedRadiusRatio=self.unresolvedRadiusRatio,
+                                                       pointSourceRadiusRatio=self.pointSourceRadiusRatio,
+                                                       psfRadiusPositionStep=self.psfRadiusPositionStep)
 
             self.galSimInterpreter.setPSF(PSF=self.PSF)
 
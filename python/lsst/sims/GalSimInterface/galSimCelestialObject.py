@@ -1,7 +1,8 @@
 import numpy
+from collections import namedtuple
 from lsst.sims.utils import arcsecFromRadians
 
-__all__ = ["GalSimCelestialObject"]
+__all__ = ["GalSimCelestialObject", "GalSimObjectBatch"]
 
 class GalSimCelestialObject(object):
     """
@@ -194,3 +195,124 @@ class GalSimCelestialObject(object):
     def sindex(self, value):
         raise RuntimeError("You should not be setting sindex on the fly; " \
         + "just instantiate a new GalSimCelestialObject")
+
+
+
+#The objects yielded by GalSimObjectBatch.  They have the same (read-only) attributes
+#as GalSimCelestialObject, but, being tuples, they are much cheaper to create.
+_GalSimObjectRow = namedtuple('_GalSimObjectRow',
+                              ['galSimType', 'sed', 'raRadians', 'decRadians',
+                               'xPupilRadians', 'xPupilArcsec', 'yPupilRadians', 'yPupilArcsec',
+                               'halfLightRadiusRadians', 'halfLightRadiusArcsec',
+                               'minorAxisRadians', 'majorAxisRadians', 'positionAngleRadians',
+                               'sindex'])
+
+
+class GalSimObjectBatch(object):
+    """
+    This class carries the data required by the GalSimInterpreter to draw a chunk of objects
+    as numpy arrays (one per datum), rather than as one GalSimCelestialObject per object.
+    The conversions from radians to arcseconds are done once for the whole chunk.
+
+    The GalSimInterpreter reads the arrays directly wherever it can (see
+    GalSimInterpreter.drawObjectList).  Iterating over a batch (or indexing it with an integer)
+    yields objects with the same read-only attributes as GalSimCelestialObject.  Indexing it
+    with a slice or an array of indices yields another GalSimObjectBatch.
+    """
+
+    def __init__(self, galSimType, sedList, ra, dec, xPupil, yPupil,
+                 halfLightRadius, minorAxis, majorAxis, positionAngle,
+                 sindex):
+        """
+        @param [in] galSimType is a string ('pointSource' or 'sersic') denoting the shape of all of
+        the objects, or a numpy array of such strings (one per object)
+
+        @param [in] sedList is a list of the SEDs of the objects (instantiations of the Sed class
+        defined in sims_photUtils/../../Sed.py)
+
+        @param [in] ra is a numpy array of the observed RA coordinates of the objects in radians
+
+        @param [in] dec is a numpy array of the observed Dec coordinates of the objects in radians
+
+        @param [in] xPupil is a numpy array of the x pupil coordinates of the objects in radians
+
+        @param [in] yPupil is a numpy array of the y pupil coordinates of the objects in radians
+
+        @param [in] halfLightRadius is a numpy array of the halfLightRadii of the objects in radians
+
+        @param [in] minorAxis is a numpy array of the semi-minor axes of the objects in radians
+
+        @param [in] majorAxis is a numpy array of the semi-major axes of the objects in radians
+
+        @param [in] positionAngle is a numpy array of the position angles of the objects in radians
+
+        @param [in] sindex is a numpy array of the sersic indices of the objects
+        """
+
+        self.sedList = list(sedList)
+        nObjects = len(self.sedList)
+
+        if isinstance(galSimType, basestring):
+            self.galSimType = numpy.array([galSimType]*nObjects)
+        else:
+            self.galSimType = numpy.array(galSimType)
+
+        self.raRadians = numpy.array(ra, dtype=float)
+        self.decRadians = numpy.array(dec, dtype=float)
+        self.xPupilRadians = numpy.array(xPupil, dtype=float)
+        self.yPupilRadians = numpy.array(yPupil, dtype=float)
+        self.halfLightRadiusRadians = numpy.array(halfLightRadius, dtype=float)
+        self.minorAxisRadians = numpy.array(minorAxis, dtype=float)
+        self.majorAxisRadians = numpy.array(majorAxis, dtype=float)
+        self.positionAngleRadians = numpy.array(positionAngle, dtype=float)
+        self.sindex = numpy.array(sindex, dtype=float)
+
+        self.xPupilArcsec = arcsecFromRadians(self.xPupilRadians)
+        self.yPupilArcsec = arcsecFromRadians(self.yPupilRadians)
+        self.halfLightRadiusArcsec = arcsecFromRadians(self.halfLightRadiusRadians)
+
+        for column in (self.galSimType, self.raRadians, self.decRadians, self.xPupilRadians,
+                       self.yPupilRadians, self.halfLightRadiusRadians, self.minorAxisRadians,
+                       self.majorAxisRadians, self.positionAngleRadians, self.sindex):
+
+            if len(column) != nObjects:
+                raise RuntimeError("The columns passed to GalSimObjectBatch do not all have the same length")
+
+
+    def __len__(self):
+        return len(self.sedList)
+
+
+    def _columns(self):
+        """
+        Return the data of the batch as a list of columns in the order of the fields of _GalSimObjectRow
+        """
+        return [self.galSimType, self.sedList, self.raRadians, self.decRadians,
+                self.xPupilRadians, self.xPupilArcsec, self.yPupilRadians, self.yPupilArcsec,
+                self.halfLightRadiusRadians, self.halfLightRadiusArcsec,
+                self.minorAxisRadians, self.majorAxisRadians, self.positionAngleRadians,
+                self.sindex]
+
+
+    def __iter__(self):
+        #convert each column to a list of Python scalars in one call, rather than
+        #extracting numpy scalars one at a time
+        columns = [column if isinstance(column, list) else column.tolist() for column in self._columns()]
+        return (_GalSimObjectRow._make(row) for row in zip(*columns))
+
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, long, numpy.integer)):
+            return _GalSimObjectRow._make([column[index] for column in self._columns()])
+
+        if isinstance(index, slice):
+            sedList = self.sedList[index]
+        else:
+            index = numpy.arange(len(self))[index]
+            sedList = [self.sedList[ix] for ix in index]
+
+        return GalSimObjectBatch(self.galSimType[index], sedList, self.raRadians[index],
+                                 self.decRadians[index], self.xPupilRadians[index],
+                                 self.yPupilRadians[index], self.halfLightRadiusRadians[index],
+                                 self.minorAxisRadians[index], self.majorAxisRadians[index],
+                                 self.positionAngleRadians[index], self.sindex[index])
@@ -8,7 +8,7 @@ from lsst.sims.coordUtils import _raDecFromPixelCoords, \
                                  pixelCoordsFromPupilCoords
 from lsst.sims.GalSimInterface.wcsUtils import tanSipWcsFromDetector
 
-__all__ = ["GalSimDetector"]
+__all__ = ["GalSimDetector", "GalSimDetectorIndex"]
 
 
 class GalSim_afw_TanSipWCS(galsim.wcs.CelestialWCS):
@@ -172,6 +172,12 @@ class GalSimDetector(object):
 
         self._bbox = afwGeom.Box2D(bbox)
 
+        #the bounds of self._bbox, for vectorized comparisons in _containsPixelCoordinates
+        self._bboxMinX = self._bbox.getMinX()
+        self._bboxMaxX = self._bbox.getMaxX()
+        self._bboxMinY = self._bbox.getMinY()
+        self._bboxMaxY = self._bbox.getMaxY()
+
         pupilSystem = afwDetector.makeCameraSys(PUPIL)
         pixelSystem = afwDetector.makeCameraSys(PIXELS)
 
@@ -290,14 +296,12 @@ class GalSimDetector(object):
 
         @param [in] dec is a numpy array or a float indicating Dec in radians
 
-        @param [out] answer is an array of booleans indicating whether or not
+        @param [out] answer is a numpy array of booleans indicating whether or not
         the corresponding RA, Dec pair falls on this detector
         """
 
         xPix, yPix = self.pixelCoordinatesFromRaDec(ra, dec)
-        points = [afwGeom.Point2D(xx, yy) for xx, yy in zip(xPix, yPix)]
-        answer = [self._bbox.contains(pp) for pp in points]
-        return answer
+        return self._containsPixelCoordinates(xPix, yPix)
 
 
     def containsPupilCoordinates(self, xPupil, yPupil):
@@ -310,13 +314,29 @@ class GalSimDetector(object):
         @param [in] yPupuil is a numpy array or a float indicating y pupil coordinates
         in radians
 
-        @param [out] answer is an array of booleans indicating whether or not
+        @param [out] answer is a numpy array of booleans indicating whether or not
         the corresponding RA, Dec pair falls on this detector
         """
         xPix, yPix = self.pixelCoordinatesFromPupilCoordinates(xPupil, yPupil)
-        points = [afwGeom.Point2D(xx, yy) for xx, yy in zip(xPix, yPix)]
-        answer = [self._bbox.contains(pp) for pp in points]
-        return answer
+        return self._containsPixelCoordinates(xPix, yPix)
+
+
+    def _containsPixelCoordinates(self, xPix, yPix):
+        """
+        Do a given set of pixel coordinates fall on this detector?
+
+        @param [in] xPix is a numpy array of x pixel coordinates
+
+        @param [in] yPix is a numpy array of y pixel coordinates
+
+        @param [out] answer is a numpy array of booleans indicating whether or not
+        the corresponding pixel coordinates fall on this detector
+        """
+
+        #this reproduces afw.geom.Box2D.contains(), which includes the minimum
+        #bounds of the box, but not the maximum bounds
+        return numpy.logical_and(numpy.logical_and(xPix >= self._bboxMinX, xPix < self._bboxMaxX),
+                                 numpy.logical_and(yPix >= self._bboxMinY, yPix < self._bboxMaxY))
 
 
     @property
@@ -543,3 +563,223 @@ class GalSimDetector(object):
         raise RuntimeError("You should not be setting wcs on the fly; " \
                            + "just instantiate a new GalSimDetector")
 
+
+
+class GalSimDetectorIndex(object):
+    """
+    This class stores a list of GalSimDetectors on a uniform grid laid over the focal plane
+    so that the detectors overlapping a given region of pupil coordinates can be found
+    without comparing that region against every detector in the camera.
+    """
+
+    def __init__(self, detectors, cellSize=None):
+        """
+        @param [in] detectors is a list of GalSimDetectors
+
+        @param [in] cellSize is the side length in arcseconds of the cells in the grid.
+        Defaults to the median size of the detectors, so that each detector
+        overlaps only a few cells.
+        """
+
+        self._detectors = list(detectors)
+
+        self._xMin = numpy.array([dd.xMinArcsec for dd in self._detectors])
+        self._xMax = numpy.array([dd.xMaxArcsec for dd in self._detectors])
+        self._yMin = numpy.array([dd.yMinArcsec for dd in self._detectors])
+        self._yMax = numpy.array([dd.yMaxArcsec for dd in self._detectors])
+
+        self._cells = {}
+
+        #the contents of self._cells as flat arrays (see circleMembership): the detectors in
+        #the cell (xCell, yCell) are self._cellDetectors[self._cellStart[n]:self._cellStart[n+1]],
+        #where n = xCell*self._ny + yCell
+        self._cellStart = numpy.zeros(1, dtype=int)
+        self._cellDetectors = numpy.array([], dtype=int)
+
+        if len(self._detectors) == 0:
+            self._nx = 0
+            self._ny = 0
+            return
+
+        if cellSize is None:
+            cellSize = numpy.median(numpy.maximum(self._xMax-self._xMin, self._yMax-self._yMin))
+
+        self._cellSize = cellSize
+        self._xOrigin = self._xMin.min()
+        self._yOrigin = self._yMin.min()
+        self._nx = int((self._xMax.max()-self._xOrigin)/self._cellSize) + 1
+        self._ny = int((self._yMax.max()-self._yOrigin)/self._cellSize) + 1
+
+        for ix, dd in enumerate(self._detectors):
+            xLow, xHigh, yLow, yHigh = self._cellRange(dd.xMinArcsec, dd.xMaxArcsec,
+                                                       dd.yMinArcsec, dd.yMaxArcsec)
+
+            for xCell in range(xLow, xHigh+1):
+                for yCell in range(yLow, yHigh+1):
+                    self._cells.setdefault((xCell, yCell), []).append(ix)
+
+        cellCounts = numpy.zeros(self._nx*self._ny, dtype=int)
+        for (xCell, yCell), members in self._cells.items():
+            cellCounts[xCell*self._ny + yCell] = len(members)
+
+        self._cellStart = numpy.concatenate(([0], numpy.cumsum(cellCounts)))
+        self._cellDetectors = numpy.zeros(self._cellStart[-1], dtype=int)
+        for (xCell, yCell), members in self._cells.items():
+            start = self._cellStart[xCell*self._ny + yCell]
+            self._cellDetectors[start:start+len(members)] = members
+
+
+    def _cellRange(self, xMin, xMax, yMin, yMax):
+        """
+        Find the range of grid cells overlapped by a rectangle in pupil coordinates
+        (clipped to the extent of the grid).
+
+        @param [in] xMin, xMax, yMin, yMax are the bounds of the rectangle in arcseconds
+
+        @param [out] xLow, xHigh, yLow, yHigh are the (inclusive) bounds of the
+        overlapped grid cells.  xLow will be greater than xHigh (or yLow greater than
+        yHigh) if the rectangle does not overlap the grid.
+        """
+
+        xLow = max(int(numpy.floor((xMin-self._xOrigin)/self._cellSize)), 0)
+        xHigh = min(int(numpy.floor((xMax-self._xOrigin)/self._cellSize)), self._nx-1)
+        yLow = max(int(numpy.floor((yMin-self._yOrigin)/self._cellSize)), 0)
+        yHigh = min(int(numpy.floor((yMax-self._yOrigin)/self._cellSize)), self._ny-1)
+
+        return xLow, xHigh, yLow, yHigh
+
+
+    def _findCandidates(self, xMin, xMax, yMin, yMax):
+        """
+        Return the indices (in self._detectors) of all of the detectors which share
+        a grid cell with a rectangle in pupil coordinates.
+
+        @param [in] xMin, xMax, yMin, yMax are the bounds of the rectangle in arcseconds
+        """
+
+        if self._nx == 0:
+            return numpy.array([], dtype=int)
+
+        xLow, xHigh, yLow, yHigh = self._cellRange(xMin, xMax, yMin, yMax)
+
+        candidates = set()
+        for xCell in range(xLow, xHigh+1):
+            for yCell in range(yLow, yHigh+1):
+                if (xCell, yCell) in self._cells:
+                    candidates.update(self._cells[(xCell, yCell)])
+
+        return numpy.array(sorted(candidates), dtype=int)
+
+
+    def findDetectors(self, xMin, xMax, yMin, yMax):
+        """
+        Find all of the detectors whose pupil coordinate domains overlap a rectangle.
+
+        @param [in] xMin is the minimum x pupil coordinate of the rectangle in arcseconds
+
+        @param [in] xMax is the maximum x pupil coordinate of the rectangle in arcseconds
+
+        @param [in] yMin is the minimum y pupil coordinate of the rectangle in arcseconds
+
+        @param [in] yMax is the maximum y pupil coordinate of the rectangle in arcseconds
+
+        @param [out] a list of GalSimDetectors (in the order in which they were passed
+        to the constructor)
+        """
+
+        candidates = self._findCandidates(xMin, xMax, yMin, yMax)
+
+        overlaps = numpy.where(numpy.logical_and(
+                               numpy.logical_and(self._xMax[candidates] > xMin, self._xMin[candidates] < xMax),
+                               numpy.logical_and(self._yMax[candidates] > yMin, self._yMin[candidates] < yMax)))
+
+        return [self._detectors[ix] for ix in candidates[overlaps]]
+
+
+    def findDetectorsInCircle(self, xCenter, yCenter, radius):
+        """
+        Find all of the detectors whose pupil coordinate domains overlap a circle.
+
+        @param [in] xCenter is the x pupil coordinate of the center of the circle in arcseconds
+
+        @param [in] yCenter is the y pupil coordinate of the center of the circle in arcseconds
+
+        @param [in] radius is the radius of the circle in arcseconds
+
+        @param [out] a list of GalSimDetectors (in the order in which they were passed
+        to the constructor)
+        """
+
+        candidates = self._findCandidates(xCenter-radius, xCenter+radius,
+                                          yCenter-radius, yCenter+radius)
+
+        #distance from the center of the circle to the nearest point in each detector
+        dx = numpy.maximum(numpy.maximum(self._xMin[candidates]-xCenter, xCenter-self._xMax[candidates]), 0.0)
+        dy = numpy.maximum(numpy.maximum(self._yMin[candidates]-yCenter, yCenter-self._yMax[candidates]), 0.0)
+
+        overlaps = numpy.where(dx*dx + dy*dy < radius*radius)
+
+        return [self._detectors[ix] for ix in candidates[overlaps]]
+
+
+    def circleMembership(self, xCenter, yCenter, radius):
+        """
+        Find the detectors overlapped by each of a set of circles.  Candidate detectors
+        are found through the grid cells covered by each circle (as in findDetectorsInCircle),
+        so that the exact test is only applied to (circle, detector) pairs sharing a cell.
+
+        @param [in] xCenter is a numpy array of the x pupil coordinates of the centers
+        of the circles in arcseconds
+
+        @param [in] yCenter is a numpy array of the y pupil coordinates of the centers
+        of the circles in arcseconds
+
+        @param [in] radius is a numpy array of the radii of the circles in arcseconds
+
+        @param [out] membership is a numpy array of booleans with shape
+        (len(xCenter), number of detectors).  membership[i][j] is True if circle i
+        overlaps the jth detector passed to the constructor.
+        """
+
+        xx = numpy.asarray(xCenter, dtype=float)
+        yy = numpy.asarray(yCenter, dtype=float)
+        rr = numpy.asarray(radius, dtype=float)
+
+        membership = numpy.zeros((len(xx), len(self._detectors)), dtype=bool)
+
+        if self._nx == 0 or len(xx) == 0:
+            return membership
+
+        #the range of grid cells covered by the bounding box of each circle (see _cellRange)
+        xLow = numpy.maximum(numpy.floor((xx-rr-self._xOrigin)/self._cellSize).astype(int), 0)
+        xHigh = numpy.minimum(numpy.floor((xx+rr-self._xOrigin)/self._cellSize).astype(int), self._nx-1)
+        yLow = numpy.maximum(numpy.floor((yy-rr-self._yOrigin)/self._cellSize).astype(int), 0)
+        yHigh = numpy.minimum(numpy.floor((yy+rr-self._yOrigin)/self._cellSize).astype(int), self._ny-1)
+
+        nyCells = numpy.maximum(yHigh-yLow+1, 0)
+        nCells = numpy.maximum(xHigh-xLow+1, 0)*nyCells
+
+        #one entry for each (circle, grid cell) pair
+        circles = numpy.repeat(numpy.arange(len(xx)), nCells)
+        cellOffset = numpy.arange(len(circles)) - numpy.repeat(numpy.cumsum(nCells)-nCells, nCells)
+        cells = (xLow[circles] + cellOffset//nyCells[circles])*self._ny + \
+                yLow[circles] + cellOffset%nyCells[circles]
+
+        #one entry for each (circle, candidate detector) pair; a detector covering several
+        #of a circle's cells appears more than once, which does not affect the result
+        nCandidates = self._cellStart[cells+1] - self._cellStart[cells]
+        pairCircles = numpy.repeat(circles, nCandidates)
+        candidateOffset = numpy.arange(len(pairCircles)) - numpy.repeat(numpy.cumsum(nCandidates)-nCandidates,
+                                                                        nCandidates)
+        pairDetectors = self._cellDetectors[numpy.repeat(self._cellStart[cells], nCandidates) + candidateOffset]
+
+        #distance from the center of each circle to the nearest point in each candidate detector
+        px = xx[pairCircles]
+        py = yy[pairCircles]
+        dx = numpy.maximum(numpy.maximum(self._xMin[pairDetectors]-px, px-self._xMax[pairDetectors]), 0.0)
+        dy = numpy.maximum(numpy.maximum(self._yMin[pairDetectors]-py, py-self._yMax[pairDetectors]), 0.0)
+
+        overlaps = numpy.where(dx*dx + dy*dy < rr[pairCircles]*rr[pairCircles])
+        membership[pairCircles[overlaps], pairDetectors[overlaps]] = True
+
+        return membership
@@ -9,21 +9,200 @@ GalSimInterpreter expects.
 """
 
 import os
+import math
+import warnings
 import numpy
 import galsim
+from collections import OrderedDict
 from lsst.sims.utils import radiansFromArcsec
-from lsst.sims.coordUtils import pixelCoordsFromPupilCoords
+from lsst.sims.photUtils import PhotometricParameters
+from lsst.sims.GalSimInterface.galSimDetector import GalSimDetectorIndex
+from lsst.sims.GalSimInterface.galSimCelestialObject import GalSimCelestialObject, GalSimObjectBatch
 
 __all__ = ["GalSimInterpreter"]
 
 
+class _LRUCache(object):
+    """
+    A cache which holds at most a fixed number of entries, discarding the
+    least recently used entry to make room for new ones.  It keeps track
+    of the number of successful and unsuccessful look-ups.
+    """
+
+    def __init__(self, maxSize):
+        """
+        @param [in] maxSize is the maximum number of entries to store
+        """
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, count=1):
+        """
+        Return the value stored for key (or None if there is no such value)
+
+        @param [in] count is the number of look-ups this call stands in for, when a value
+        is needed for several entries sharing a key.  If the value is not found, the caller
+        is expected to store it, so that only the first of them is recorded as a miss.
+        """
+        if key in self._data:
+            value = self._data.pop(key)
+            self._data[key] = value
+            self.hits += count
+            return value
+
+        self.misses += 1
+        self.hits += count - 1
+        return None
+
+    def set(self, key, value):
+        """
+        Store value for key, discarding the least recently used entry if the cache is full
+        """
+        if self.maxSize <= 0:
+            return
+
+        if key in self._data:
+            self._data.pop(key)
+        elif len(self._data) >= self.maxSize:
+            self._data.popitem(last=False)
+
+        self._data[key] = value
+
+    def clear(self):
+        """
+        Discard all of the entries in the cache
+        """
+        self._data.clear()
+
+
+#a cache of the radii calculated by _sersicEnclosingRadius
+_sersicRadiusCache = {}
+
+def _sersicFractionOutside(n, x):
+    """
+    Return the fraction of the flux of a Sersic profile which falls outside of a given radius.
+
+    @param [in] n is the Sersic index
+
+    @param [in] x is b_n*(r/r_e)**(1/n), where r is the radius and r_e is the half light radius
+
+    @param [out] the fraction of the flux falling outside of r (this is the regularized
+    upper incomplete gamma function Q(2n, x), evaluated from its series expansion)
+    """
+
+    if x <= 0.0:
+        return 1.0
+
+    a = 2.0*n
+    term = 1.0/a
+    total = term
+    k = 1
+    while term > 1.0e-14*total:
+        term *= x/(a+k)
+        total += term
+        k += 1
+
+    return max(0.0, 1.0 - total*numpy.exp(a*numpy.log(x) - x - math.lgamma(a)))
+
+
+def _solveSersicFractionOutside(n, fraction):
+    """
+    Find the value of x = b_n*(r/r_e)**(1/n) outside of which a given fraction
+    of the flux of a Sersic profile falls (see _sersicFractionOutside)
+    """
+
+    xMin = 0.0
+    xMax = 1.0
+    while _sersicFractionOutside(n, xMax) > fraction:
+        xMin = xMax
+        xMax *= 2.0
+
+    for ii in range(60):
+        xMid = 0.5*(xMin + xMax)
+        if _sersicFractionOutside(n, xMid) > fraction:
+            xMin = xMid
+        else:
+            xMax = xMid
+
+    return xMax
+
+
+def _sersicEnclosingRadius(n, fraction):
+    """
+    Return the radius (in units of the half light radius) outside of which
+    a given fraction of the flux of a Sersic profile falls.
+
+    @param [in] n is the Sersic index
+
+    @param [in] fraction is the fraction of the flux allowed outside of the radius
+    """
+
+    key = (n, fraction)
+    if key not in _sersicRadiusCache:
+        bn = _solveSersicFractionOutside(n, 0.5)
+        _sersicRadiusCache[key] = numpy.power(_solveSersicFractionOutside(n, fraction)/bn, n)
+
+    return _sersicRadiusCache[key]
+
+
+#the largest Sersic index of galaxies drawn as a broadened PSF (see _drawBroadenedPSF)
+_maxBroadenedSersicIndex = 1.5
+
+#a cache of the factors calculated by _sersicSecondMomentFactor
+_sersicMomentCache = {}
+
+def _sersicSecondMomentFactor(n):
+    """
+    Return the second moment <r**2> of a Sersic profile divided by that of a Gaussian with
+    the same half light radius, i.e. ln(2)*Gamma(4n)/(Gamma(2n)*b_n**(2n)).  This is 1 for
+    n=0.5, about 1.5 for n=1 and 15 for n=4.
+
+    @param [in] n is the Sersic index
+    """
+
+    key = float(n)
+    if key not in _sersicMomentCache:
+        bn = _solveSersicFractionOutside(key, 0.5)
+        _sersicMomentCache[key] = numpy.log(2.0)*numpy.exp(math.lgamma(4.0*key) - math.lgamma(2.0*key)
+                                                           - 2.0*key*numpy.log(bn))
+
+    return _sersicMomentCache[key]
+
+
+def _erf(x):
+    """
+    Return the error function of a numpy array, evaluated with the rational approximation
+    of Abramowitz and Stegun (equation 7.1.26), whose absolute error is less than 1.5e-7
+    """
+
+    t = 1.0/(1.0 + 0.3275911*numpy.abs(x))
+    poly = t*(0.254829592 + t*(-0.284496736 + t*(1.421413741 + t*(-1.453152027 + t*1.061405429))))
+    return numpy.sign(x)*(1.0 - poly*numpy.exp(-x*x))
+
+
 class GalSimInterpreter(object):
     """
     This is the class which actually takes the objects contained in the GalSim Instance Catalog and converts them
     into FITS images.
     """
 
-    def __init__(self, obs_metadata=None, detectors=None, bandpassDict=None, noiseWrapper=None, epoch=None, seed=None):
+    def __init__(self, obs_metadata=None, detectors=None, bandpassDict=None, noiseWrapper=None, epoch=None, seed=None,
+                 useStamps=True, exactFootprint=False, footprintCacheSize=10000, footprintCacheTolerance=0.05,
+                 skyLimitedFootprint=False, singleFootprintPass=False, pixelDtype=numpy.float32,
+                 achromaticFastPath=False, sharedPhotons=False,
+                 drawMethod='phot', fftFluxThreshold=1.0e6, fftPhotonsPerPixel=20.0, fftMaxStampSize=1024,
+                 maxPhotons=None, photonNoiseFraction=0.1, snrFloor=None,
+                 faintBackground=False, faintBackgroundCellSize=32,
+                 sersicCacheSize=100, sersicIndexStep=None, templateBank=None, spectrumCacheSize=1000,
+                 shootStraddlersOnce=False, batchPointSources=False, pointSourcePhotonBatchSize=1000000,
+                 psfStampFluxThreshold=None, psfStampOversampling=4, psfStampPositionStep=60.0,
+                 analyticPointSources=False, unresolvedRadiusRatio=None, pointSourceRadiusRatio=None,
+                 psfRadiusPositionStep=60.0):
 
         """
         @param [in] obs_metadata is an instantiation of the ObservationMetaData class which
@@ -43,23 +222,283 @@ class GalSimInterpreter(object):
         @param [in] seed is an integer that will use to seed the random number generator
         used when drawing images (if None, GalSim will automatically create a random number
         generator seeded with the system clock)
+
+        @param [in] useStamps is a boolean.  If True, each object is drawn onto a postage stamp
+        just large enough to contain it, which is then added into the corresponding sub-region
+        of the detector image.  If False, each object is drawn onto a blank image the size of
+        the whole detector (this is much slower, but is kept for comparison).
+
+        @param [in] exactFootprint is a boolean.  If False, the detectors illumined by each
+        object are found by estimating the extent of the object from its GalSim profile.
+        If True, they are found by drawing a photon-shot test image of each object
+        (this is much slower).
+
+        @param [in] footprintCacheSize is the maximum number of object footprints to cache
+        (see _getFootprint).  Objects with similar shapes share footprints, so that
+        all point sources and most galaxies do not need to have their footprints calculated.
+        Set to zero to disable the cache.
+
+        @param [in] footprintCacheTolerance is the fractional tolerance to which half light
+        radius, Sersic index, and axis ratio must agree for two galaxies to share a footprint
+
+        @param [in] skyLimitedFootprint is a boolean.  If True (and if noiseWrapper adds noise
+        to the images), the footprint of each object is scaled so that the light falling outside
+        of it is comparable to the sky noise in a single pixel (see _scaleFootprintToSky).
+        Bright objects then get larger footprints and postage stamps.  Faint objects do not get
+        smaller ones: the footprint sets the size of the postage stamp, and photons falling off
+        the stamp are lost, so shrinking the footprints of faint objects would systematically
+        remove up to the fraction of their flux falling outside of them.  Footprints are therefore
+        never made smaller than GalSim's default, and no more than the profile's folding_threshold
+        of any object's flux falls off its postage stamp.  This changes the images of bright
+        objects, so it is False by default.
+
+        @param [in] singleFootprintPass is a boolean.  If True and the PSF is wavelength dependent,
+        the footprint of each object is only evaluated once, in the bandpass with the widest PSF
+        (see _getFootprintBandpass), and re-used for all of the other bandpasses.  If False, the
+        footprint is evaluated separately in each bandpass.
+
+        @param [in] pixelDtype is the numpy type in which the pixels of the detector images are
+        stored (numpy.float32, numpy.float64, or numpy.int32).  Floating point images are in ADU.
+        Integer images are in electrons (i.e. they have not been divided by the gain), so that
+        photon shooting deposits whole counts in each pixel.
+
+        @param [in] achromaticFastPath is a boolean.  If True and the PSF is not wavelength dependent,
+        the flux of each object in each bandpass is calculated directly from its Sed (see _getBandFlux)
+        and the achromatic profile of the object is drawn with that flux, rather than having GalSim
+        integrate the profile times its SED over the bandpass.  This changes the realization
+        (though not the expected counts) of each image, so it is False by default.
+
+        @param [in] sharedPhotons is a boolean.  If True, and if objects are being drawn by the
+        achromatic fast path, the photons of each object are shot once for all of the bandpasses
+        and then divided among the bandpasses in proportion to the object's flux in each
+        (see _drawSharedPhotons).  Each bandpass still receives a Poisson-distributed number
+        of photons, but the images in different bandpasses are no longer independent.
+
+        @param [in] drawMethod is the method by which objects are drawn onto postage stamps:
+        'phot' (photon shooting), 'fft' (Fourier transform, followed by Poisson noise so that the
+        images have the same statistics as photon-shot images), or 'auto' to choose between the two
+        for each object (see _chooseDrawMethod).  Objects drawn onto full detector images
+        (i.e. if useStamps is False) are always photon shot.  Defaults to 'phot', so that
+        images are drawn as they always have been unless FFTs are asked for.
+
+        @param [in] fftFluxThreshold is the number of electrons above which drawMethod='auto'
+        will consider drawing an object with an FFT.  The cost of photon shooting grows with the
+        number of photons; the cost of an FFT does not.
+
+        @param [in] fftPhotonsPerPixel is the minimum number of electrons per pixel of the postage
+        stamp for which drawMethod='auto' will draw an object with an FFT
+
+        @param [in] fftMaxStampSize is the largest postage stamp (in pixels on a side) which
+        drawMethod='auto' will draw with an FFT
+
+        @param [in] maxPhotons is the maximum number of photons to shoot for an object in one
+        bandpass on one detector (None for no limit).  Brighter objects are drawn with fewer photons,
+        each carrying more than one electron, which adds noise to their images (see _getPhotonWeight).
+        It is ignored if pixelDtype is an integer type.
+
+        @param [in] photonNoiseFraction limits the extra noise due to maxPhotons: the extra variance
+        in the brightest pixel of an object may not exceed this fraction of the variance that pixel
+        would otherwise have (the Poisson variance of the object's own electrons plus that of the
+        sky, if noiseWrapper adds noise to the images).  Objects are shot with more than maxPhotons
+        photons if that is necessary to satisfy this limit.
+
+        @param [in] snrFloor is the signal to noise ratio below which an object is not drawn
+        in a bandpass (None to draw all objects).  The signal to noise ratio is predicted from
+        the object's flux and the sky noise (see _getSignalToNoise).  Objects which are not
+        drawn in any bandpass are not assigned to any detectors.  (This only applies if
+        noiseWrapper adds noise to the images.)
+
+        @param [in] faintBackground is a boolean.  If True, the flux of objects which are too faint
+        to be drawn in a bandpass (see snrFloor) is not discarded, but is added to a coarse grid
+        laid over the detector on which the object falls.  The grids are interpolated onto the
+        detector images (with Poisson noise) when the images are written (see _applyFaintBackground).
+        This preserves the total flux and the large scale structure of the faint objects.
+
+        @param [in] faintBackgroundCellSize is the side length in pixels of the cells of the
+        grids used by faintBackground
+
+        @param [in] sersicCacheSize is the maximum number of Sersic profiles of unit half light
+        radius to cache, keyed on their Sersic indices (see drawSersic).  Galaxies with the same
+        Sersic index are made by dilating and shearing the same cached profile, so that GalSim
+        does not rebuild the lookup tables of the profile for each galaxy.  Set to zero to
+        disable the cache.
+
+        @param [in] sersicIndexStep is the spacing of a grid onto which Sersic indices are
+        rounded before they are drawn (None to draw the exact indices).  Catalogs with
+        continuously distributed Sersic indices need this to benefit from sersicCacheSize.
+
+        @param [in] spectrumCacheSize is the maximum number of galsim.SEDs to cache, keyed on the
+        SED file, redshift, and dust parameters of the objects (see _getSpectrum).  Objects sharing
+        those are drawn with the same cached galsim.SED, scaled by their own normalizations.
+        Set to zero to disable the cache.
+
+        @param [in] templateBank is an instantiation of GalSimTemplateBank (or None).  If it is
+        not None, and if the PSF depends on neither position nor wavelength, galaxies are drawn
+        as interpolated images of pre-rendered, PSF-convolved templates rather than as Sersic
+        profiles convolved with the PSF (see drawSersic).  This is faster but approximate.
+
+        @param [in] shootStraddlersOnce is a boolean.  If True, and if objects are being drawn by
+        the achromatic fast path, the photons of an object which illumines more than one detector
+        are shot once per bandpass and binned into whichever detector each of them lands on
+        (see _binPhotonsOnDetectors), rather than being shot separately for each detector.
+        The cost of drawing such objects then does not grow with the number of detectors they
+        touch, and their flux is conserved across the gaps between detectors.
+
+        @param [in] batchPointSources is a boolean.  If True, and if objects are being drawn by the
+        achromatic fast path (i.e. if achromaticFastPath is also True and the PSF depends on neither
+        position nor wavelength), the point sources passed to drawObjectList are drawn together:
+        the photons of all of them are shot from the PSF at once and binned into the detector
+        images with numpy (see _drawPointSourceBatch), rather than each point source being
+        drawn by GalSim separately.  A warning is issued if achromaticFastPath is False.
+
+        @param [in] pointSourcePhotonBatchSize is the maximum number of photons _drawPointSourceBatch
+        shoots and bins at once, which bounds the memory it uses however bright the point sources are.
+
+        @param [in] psfStampFluxThreshold is the number of electrons below which a point source
+        is drawn by adding a copy of a pre-rendered image of the PSF, scaled by the flux of the
+        point source and shifted to its position, followed by Poisson noise (see _drawPSFStamp),
+        rather than by photon shooting.  None (the default) draws all point sources with GalSim.
+
+        @param [in] psfStampOversampling is the number of samples per pixel (along each axis)
+        of the pre-rendered images of the PSF
+
+        @param [in] psfStampPositionStep is the spacing in arcseconds of the grid of pupil
+        coordinates at which the PSF is pre-rendered, if the PSF is position dependent
+
+        @param [in] analyticPointSources is a boolean.  If True, and if objects are being drawn by the
+        achromatic fast path (i.e. if achromaticFastPath is also True), and if the PSF is a sum of
+        circular Gaussians which depends on neither position nor wavelength (see
+        PSFbase.getGaussianComponents), the point sources passed to drawObjectList are drawn by
+        evaluating the integral of the PSF over each pixel in closed form (see
+        _drawGaussianPointSources).  Poisson noise is added to the expected counts of each point
+        source's stamp.  A warning is issued if achromaticFastPath is False.
+
+        @param [in] unresolvedRadiusRatio is the ratio of galaxy half light radius to PSF half light
+        radius below which galaxies are drawn as the PSF, dilated and sheared so that its second
+        moments match those of the galaxy convolved with the PSF, rather than as Sersic profiles
+        convolved with the PSF (see _drawBroadenedPSF).  Only galaxies with Sersic index of at most
+        1.5 are drawn this way: the second moment of steeper profiles is dominated by their wings,
+        so matching it (e.g. about 15 times that of a Gaussian of the same half light radius for
+        n=4) spreads the core of the image far too much.  For the SNR document PSF and ratios of
+        0.2-0.3 the pixel values of the approximation differ from those of a full Sersic profile
+        convolved with the PSF by about 0.5-2% of the peak.  None (the default) draws every
+        galaxy as a Sersic profile.
+
+        @param [in] pointSourceRadiusRatio is the ratio of galaxy half light radius to PSF half light
+        radius below which galaxies are drawn as point sources (see _demoteUnresolvedGalaxy), so
+        that they can be drawn by the point source fast paths (batchPointSources,
+        psfStampFluxThreshold, analyticPointSources).  For Gaussian-like profiles this
+        underestimates the half light radius of the image by a fraction sqrt(1+ratio**2)-1,
+        i.e. about ratio**2/2, and discards the ellipticity of the galaxy.  None (the default)
+        never draws galaxies as point sources.
+
+        @param [in] psfRadiusPositionStep is the spacing in arcseconds of the grid of pupil
+        coordinates at which the half light radius of the PSF is evaluated for unresolvedRadiusRatio
+        and pointSourceRadiusRatio, if the PSF is position dependent (see _getPSFHalfLightRadius)
         """
 
         self.obs_metadata = obs_metadata
         self.epoch = epoch
         self.PSF = None
         self.noiseWrapper = noiseWrapper
+        self.useStamps = useStamps
+        self.exactFootprint = exactFootprint
+        self.footprintCacheTolerance = footprintCacheTolerance
+        self._footprintCache = _LRUCache(footprintCacheSize)
+        self.skyLimitedFootprint = skyLimitedFootprint
+        self.singleFootprintPass = singleFootprintPass
+        self._footprintBandpassName = None #the bandpass with the widest PSF (see _getFootprintBandpass)
+
+        self.pixelDtype = numpy.dtype(pixelDtype).type
+        if self.pixelDtype not in (numpy.float32, numpy.float64, numpy.int32):
+            raise RuntimeError("GalSimInterpreter cannot store pixels as %s; " % str(pixelDtype) \
+                               + "use numpy.float32, numpy.float64, or numpy.int32")
+
+        #integer images store electrons rather than ADU
+        self._countElectrons = issubclass(self.pixelDtype, numpy.integer)
+
+        self.achromaticFastPath = achromaticFastPath
+        self.sharedPhotons = sharedPhotons
+
+        if drawMethod not in ('auto', 'phot', 'fft'):
+            raise RuntimeError("GalSimInterpreter does not know the drawMethod %s; " % str(drawMethod) \
+                               + "use 'auto', 'phot', or 'fft'")
+
+        self.drawMethod = drawMethod
+        self.fftFluxThreshold = fftFluxThreshold
+        self.fftPhotonsPerPixel = fftPhotonsPerPixel
+        self.fftMaxStampSize = fftMaxStampSize
+        self._drawCounts = {'phot':0, 'fft':0} #the number of images drawn with each method
+
+        self.maxPhotons = maxPhotons
+        self.photonNoiseFraction = photonNoiseFraction
+        self._weightedPhotonDraws = 0 #the number of images drawn with photons carrying more than one electron
+        self._bandFluxCalculations = 0 #the number of times _getBandFlux integrated an Sed over a bandpass
+
+        self.snrFloor = snrFloor
+        self._culledObjects = 0 #the number of objects not drawn in any bandpass (see _getVisibleBandpasses)
+        self._culledBandpasses = 0 #the number of object/bandpass combinations not drawn
+
+        self.faintBackground = faintBackground
+        self.faintBackgroundCellSize = faintBackgroundCellSize
+        self._faintBackgroundGrids = {} #coarse grids of faint flux in electrons, keyed like self.detectorImages
+        self._aggregatedBandpasses = 0 #the number of object/bandpass combinations added to the grids
+
+        self._sersicCache = _LRUCache(sersicCacheSize)
+        self._spectrumCache = _LRUCache(spectrumCacheSize) #unnormalized galsim.SEDs (see _getSpectrum)
+        self.sersicIndexStep = sersicIndexStep
+        self.templateBank = templateBank
+
+        self.shootStraddlersOnce = shootStraddlersOnce
+        self._straddlerDraws = 0 #the number of images shot once for several detectors
+
+        self.batchPointSources = batchPointSources
+        self.pointSourcePhotonBatchSize = pointSourcePhotonBatchSize
+        self._batchedPointSources = 0 #the number of point sources drawn by _drawPointSourceBatch
+
+        self.psfStampFluxThreshold = psfStampFluxThreshold
+        self.psfStampOversampling = psfStampOversampling
+        self.psfStampPositionStep = psfStampPositionStep
+        self._psfStampCache = {} #the pre-rendered PSFs (see _getPSFStamp)
+        self._psfStampDraws = 0 #the number of images drawn by _drawPSFStamp
+
+        self.analyticPointSources = analyticPointSources
+        self._analyticPointSources = 0 #the number of point sources drawn by _drawGaussianPointSources
+
+        #the point source batch draws each point source with its band fluxes (see _canBatchPointSources)
+        for flagName, flag in [('batchPointSources', batchPointSources),
+                               ('analyticPointSources', analyticPointSources)]:
+            if flag and not achromaticFastPath:
+                warnings.warn("GalSimInterpreter ignores %s unless achromaticFastPath is also True" % flagName)
+
+        self.unresolvedRadiusRatio = unresolvedRadiusRatio
+        self.pointSourceRadiusRatio = pointSourceRadiusRatio
+        self.psfRadiusPositionStep = psfRadiusPositionStep
+        self._psfHalfLightRadii = {} #the half light radii of the PSF (see _getPSFHalfLightRadius)
+        self._broadenedGalaxies = 0 #the number of galaxies drawn as a broadened PSF
+        self._pointSourceGalaxies = 0 #the number of galaxies drawn as point sources
+
+        #used to calculate the number of electrons (rather than ADU) deposited by an object;
+        #the exposure time and effective area are already folded into the objects' Seds
+        #(see GalSimBase._calculateGalSimSeds)
+        self._unitPhotParams = PhotometricParameters(exptime=1.0, nexp=1, effarea=1.0, gain=1.0)
 
         if seed is not None:
             self._rng = galsim.UniformDeviate(seed)
+            self._numpyRng = numpy.random.RandomState(seed)
         else:
             self._rng = None
+            self._numpyRng = numpy.random.RandomState()
 
         if detectors is None:
             raise RuntimeError("Will not create images; you passed no detectors to the GalSimInterpreter")
 
         self.detectors = detectors
 
+        #a grid over the focal plane used to quickly find the detectors
+        #overlapping an object's footprint
+        self._detectorIndex = GalSimDetectorIndex(self.detectors)
+
         self.detectorImages = {} #this dict will contain the FITS images (as GalSim images)
         self.bandpasses = {} #this dict will contain the GalSim bandpass instantiations corresponding to the input bandpasses
         self.catSimBandpasses = None
@@ -83,6 +522,18 @@ class GalSimInterpreter(object):
         """
 
         self.catSimBandpasses = bandpassDict
+        self._noiseLevelCache = {} #the sky noise in each bandpass (see _getNoiseLevel)
+        self._psfStampCache = {}
+        self._footprintBandpassName = None
+        self._lastSpectrum = None #the most recently converted SED (see _getSpectrum)
+        self._spectrumCache.clear() #the cached SEDs are only defined over the old bandpasses
+        self._lastBandFluxes = None #the band fluxes of the most recent Sed (see _getBandFlux)
+        self._chunkBandFluxes = None #the band fluxes of the Seds in the chunk being drawn by drawObjectList
+
+        #the range of wavelengths over which SEDs must be defined
+        self._minWavelength = None
+        self._maxWavelength = None
+
         for bpname in bandpassDict:
 
             # 14 April 2015
@@ -94,6 +545,11 @@ class GalSimInterpreter(object):
 
             self.bandpasses[bpname] = bptest
 
+            if self._minWavelength is None or bptest.blue_limit < self._minWavelength:
+                self._minWavelength = bptest.blue_limit
+            if self._maxWavelength is None or bptest.red_limit > self._maxWavelength:
+                self._maxWavelength = bptest.red_limit
+
     def setPSF(self, PSF=None):
         """
         Set the PSF wrapper for this GalSimInterpreter
@@ -102,6 +558,95 @@ class GalSimInterpreter(object):
         """
         self.PSF=PSF
 
+        #cached footprints are only valid for the PSF with which they were calculated
+        self._footprintCache.clear()
+        self._psfStampCache = {}
+        self._psfHalfLightRadii = {}
+        self._footprintBandpassName = None
+
+    def getStatistics(self):
+        """
+        Return a dict of statistics describing the work done by this GalSimInterpreter, i.e.
+
+        footprintCacheHits -- the number of objects whose footprints were found in the footprint cache
+
+        footprintCacheMisses -- the number of objects whose footprints had to be calculated
+
+        photDraws -- the number of images (one per object per detector per bandpass, or one per
+        object if sharedPhotons is True) drawn by photon shooting
+
+        fftDraws -- the number of images drawn with an FFT (see drawMethod in __init__)
+
+        weightedPhotonDraws -- the number of photon-shot images whose photons carried more
+        than one electron each (see maxPhotons in __init__)
+
+        bandFluxCalculations -- the number of times the Sed of an object was integrated over
+        a bandpass to find its flux (see _getBandFlux)
+
+        culledObjects -- the number of objects which were too faint to be drawn in any
+        bandpass (see snrFloor in __init__)
+
+        culledBandpasses -- the number of object/bandpass combinations which were too faint
+        to be drawn (including those of the culledObjects)
+
+        aggregatedBandpasses -- the number of culled object/bandpass combinations whose flux
+        was added to the faint background (see faintBackground in __init__)
+
+        sersicCacheHits -- the number of Sersic profiles found in the Sersic profile cache
+
+        sersicCacheMisses -- the number of Sersic profiles which had to be built by GalSim
+
+        spectrumCacheHits -- the number of SEDs found in the SED cache (see spectrumCacheSize in __init__)
+
+        spectrumCacheMisses -- the number of SEDs which had to be converted into galsim.SEDs
+
+        templateBankHits -- the number of galaxies drawn from templates which had already been
+        rendered (see templateBank in __init__)
+
+        templateBankMisses -- the number of templates which had to be rendered
+
+        straddlerDraws -- the number of images of objects illumining several detectors whose
+        photons were shot once for all of the detectors (see shootStraddlersOnce in __init__)
+
+        batchedPointSources -- the number of point sources drawn together with other point
+        sources (see batchPointSources in __init__)
+
+        psfStampDraws -- the number of images of point sources drawn from pre-rendered images
+        of the PSF (see psfStampFluxThreshold in __init__)
+
+        analyticPointSources -- the number of point sources drawn by integrating a Gaussian PSF
+        over pixels analytically (see analyticPointSources in __init__)
+
+        broadenedGalaxies -- the number of galaxies drawn as a broadened PSF because they are
+        much smaller than the PSF (see unresolvedRadiusRatio in __init__)
+
+        pointSourceGalaxies -- the number of galaxies drawn as point sources because they are
+        much smaller than the PSF (see pointSourceRadiusRatio in __init__)
+        """
+        statistics = {}
+        statistics['footprintCacheHits'] = self._footprintCache.hits
+        statistics['footprintCacheMisses'] = self._footprintCache.misses
+        statistics['photDraws'] = self._drawCounts['phot']
+        statistics['fftDraws'] = self._drawCounts['fft']
+        statistics['weightedPhotonDraws'] = self._weightedPhotonDraws
+        statistics['bandFluxCalculations'] = self._bandFluxCalculations
+        statistics['culledObjects'] = self._culledObjects
+        statistics['culledBandpasses'] = self._culledBandpasses
+        statistics['aggregatedBandpasses'] = self._aggregatedBandpasses
+        statistics['sersicCacheHits'] = self._sersicCache.hits
+        statistics['sersicCacheMisses'] = self._sersicCache.misses
+        statistics['spectrumCacheHits'] = self._spectrumCache.hits
+        statistics['spectrumCacheMisses'] = self._spectrumCache.misses
+        statistics['templateBankHits'] = self.templateBank.hits if self.templateBank is not None else 0
+        statistics['templateBankMisses'] = self.templateBank.misses if self.templateBank is not None else 0
+        statistics['straddlerDraws'] = self._straddlerDraws
+        statistics['batchedPointSources'] = self._batchedPointSources
+        statistics['psfStampDraws'] = self._psfStampDraws
+        statistics['analyticPointSources'] = self._analyticPointSources
+        statistics['broadenedGalaxies'] = self._broadenedGalaxies
+        statistics['pointSourceGalaxies'] = self._pointSourceGalaxies
+        return statistics
+
     def _getFileName(self, detector=None, bandpassName=None):
         """
         Given a detector and a bandpass name, return the name of the FITS file to be written
@@ -147,15 +692,12 @@ class GalSimInterpreter(object):
         if detector is None:
             return False
 
-        xPupilList = radiansFromArcsec(numpy.array([xPupil + ix*imgScale for ix in nonZeroPixels[0]]))
-        yPupilList = radiansFromArcsec(numpy.array([yPupil + iy*imgScale for iy in nonZeroPixels[1]]))
+        xPupilList = radiansFromArcsec(xPupil + imgScale*numpy.asarray(nonZeroPixels[0], dtype=float))
+        yPupilList = radiansFromArcsec(yPupil + imgScale*numpy.asarray(nonZeroPixels[1], dtype=float))
 
         answer = detector.containsPupilCoordinates(xPupilList, yPupilList)
 
-        if True in answer:
-            return True
-        else:
-            return False
+        return bool(answer.any())
 
 
     def findAllDetectors(self, gsObject):
@@ -163,10 +705,15 @@ class GalSimInterpreter(object):
         """
         Find all of the detectors on which a given astronomical object casts light.
 
-        This method works by drawing a test image of the astronomical object and comparing
-        the pixels in that image with flux above a certain threshold value to the pixel
-        domains of the detectors in the camera.  Any detectors which overlap these
-        'active' pixels are considered illumined by the object.
+        By default, this method works by estimating the radius of the object's footprint
+        from the GalSim profile itself (see _getFootprintRadius) and finding all of the
+        detectors whose pupil coordinate domains overlap a circle of that radius centered
+        on the object.  No image of the object is drawn.
+
+        If self.exactFootprint is True, this method instead draws a test image of the
+        astronomical object and compares the pixels in that image with flux above a certain
+        threshold value to the pixel domains of the detectors in the camera.  Any detectors
+        which overlap these 'active' pixels are considered illumined by the object.
 
         @param [in] gsObject is an instantiation of the GalSimCelestialObject class
         carrying information about the object whose image is to be drawn
@@ -186,11 +733,118 @@ class GalSimInterpreter(object):
         pointSources, etc.
         """
 
-        outputString = ''
-        outputList = []
+        outputString, \
+        outputList, \
+        centeredObjDict, \
+        footprintDict = self._findAllDetectors(gsObject)
+
+        return outputString, outputList, centeredObjDict
+
+
+    def _findAllDetectors(self, gsObject):
+        """
+        Do the work of findAllDetectors.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+        carrying information about the object whose image is to be drawn
+
+        @param [out] outputString, outputList, and centeredObjDict are as in findAllDetectors
+
+        @param [out] footprintDict is a dict of footprint radii in arcseconds keyed on
+        the names of the bandpasses (see _getFootprintRadius).  It is used by drawObject
+        to size the postage stamps onto which the object is drawn.
+        """
+
+        centeredObjDict, footprintDict = self._createCenteredObjects(gsObject)
+
+        if len(footprintDict) == 0:
+            return None, [], centeredObjDict, footprintDict
+
+        if self.exactFootprint:
+            outputList = self._findDetectorsFromTestImage(gsObject, centeredObjDict)
+        else:
+            outputList = self._findDetectorsFromFootprint(gsObject, footprintDict)
+
+        if len(outputList) == 0:
+            outputString = None
+        else:
+            outputString = '//'.join([dd.name for dd in outputList])
+
+        return outputString, outputList, centeredObjDict, footprintDict
+
+
+    def _createCenteredObjects(self, gsObject):
+        """
+        Create the centered GalSim objects (see createCenteredObject) for each bandpass
+        and estimate their footprints.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+        carrying information about the object whose image is to be drawn
+
+        @param [out] centeredObjDict is a dict of GalSim Objects centered on the chip keyed
+        on the names of the bandpasses (see findAllDetectors)
+
+        @param [out] footprintDict is a dict of footprint radii in arcseconds keyed on
+        the names of the bandpasses.  Bandpasses in which the object is too faint to be
+        drawn (see _getVisibleBandpasses) are omitted.  This will be empty if GalSimInterpreter
+        does not know how to draw the object or if the object is too faint to be drawn at all.
+        """
+
+        visibleBandpassNames = self._getVisibleBandpasses(gsObject)
+        if len(visibleBandpassNames) == 0:
+            return {}, {}
+
+        centeredObjDict = self._createCenteredObjectDict(gsObject)
+
+        #if this is not None, the footprint is only evaluated in this bandpass
+        footprintBandpassName = self._getFootprintBandpass()
+
+        footprintDict = {}
+        radius = None
+        for bandpassName in self.bandpasses:
+            if centeredObjDict[bandpassName] is None:
+                return centeredObjDict, {}
+
+            if bandpassName not in visibleBandpassNames:
+                continue
+
+            #the object's flux is only needed if the footprint is limited by the sky noise
+            flux = None
+            if self.skyLimitedFootprint and gsObject.sed is not None and \
+               self._getNoiseLevel(bandpassName) is not None:
+
+                flux = self._getBandFlux(gsObject, bandpassName)
+
+            if footprintBandpassName is None:
+                footprintDict[bandpassName] = self._getFootprint(gsObject, bandpassName,
+                                                                 centeredObjDict[bandpassName],
+                                                                 flux=flux)
+            else:
+                if radius is None:
+                    radius = self._getUnscaledFootprint(gsObject, footprintBandpassName,
+                                                        centeredObjDict[footprintBandpassName])
+
+                if flux is None:
+                    footprintDict[bandpassName] = radius
+                else:
+                    footprintDict[bandpassName] = self._scaleFootprintToSky(gsObject, bandpassName,
+                                                                            radius, flux)
+
+        return centeredObjDict, footprintDict
+
+
+    def _createCenteredObjectDict(self, gsObject):
+        """
+        Create the centered GalSim objects (see createCenteredObject) for each bandpass
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+
+        @param [out] centeredObjDict is a dict of GalSim Objects centered on the chip keyed
+        on the names of the bandpasses (see findAllDetectors)
+        """
+
         centeredObjDict = {}
         centeredObj = None
-        testScale = 0.1
 
         for bandpassName in self.bandpasses:
             if centeredObj is None or (self.PSF is not None and self.PSF.wavelength_dependent):
@@ -202,234 +856,2471 @@ class GalSimInterpreter(object):
             #for output; to be used by self.drawObject()
             centeredObjDict[bandpassName] = centeredObj
 
-        nTests = 0
-        for bandpassName in self.bandpasses:
-            goOn = False
-            if nTests==0 or (self.PSF is not None and self.PSF.wavelength_dependent):
+        return centeredObjDict
 
-                #if we have already decided that the object illumines all detectors,
-                #there is no point in going on
-                for dd in self.detectors:
-                    if dd not in outputList:
-                        goOn = True
-                        break
 
-            nTests += 1
-            if goOn:
-                centeredObj = centeredObjDict[bandpassName]
+    def findAllDetectorsBatch(self, xPupil, yPupil, radius):
+        """
+        Find all of the detectors illumined by each of a set of astronomical objects
+        in a single vectorized pass.
 
-                if centeredObj is None:
-                    return
+        @param [in] xPupil is a numpy array of the objects' x pupil coordinates in arcseconds
 
-                #4 March 2015
-                #create a test image of the object to compare against the pixel
-                #domains of each detector.  Use photon shooting rather than real space integration
-                #for reasons of speed.  A flux of 1000 photons ought to be enough to plot the true
-                #extent of the object, but this is just a guess.
-                centeredImage = centeredObj.drawImage(scale=testScale, method='phot', n_photons=1000, rng=self._rng)
-                xmax = testScale * (centeredImage.getXMax()/2) + gsObject.xPupilArcsec
-                xmin = testScale * (-1*centeredImage.getXMax()/2) + gsObject.xPupilArcsec
-                ymax = testScale * (centeredImage.getYMax()/2) + gsObject.yPupilArcsec
-                ymin = testScale *(-1*centeredImage.getYMin()/2) + gsObject.yPupilArcsec
+        @param [in] yPupil is a numpy array of the objects' y pupil coordinates in arcseconds
 
-                #first assemble a list of detectors which have any hope
-                #of overlapping the test image
-                viableDetectors = []
-                for dd in self.detectors:
-                    xOverLaps = False
-                    if xmax > dd.xMinArcsec and xmax < dd.xMaxArcsec:
-                        xOverLaps = True
-                    elif xmin > dd.xMinArcsec and xmin < dd.xMaxArcsec:
-                        xOverLaps = True
-                    elif xmin < dd.xMinArcsec and xmax > dd.xMaxArcsec:
-                        xOverLaps = True
-
-                    yOverLaps = False
-                    if ymax > dd.yMinArcsec and ymax < dd.yMaxArcsec:
-                        yOverLaps = True
-                    elif ymin > dd.yMinArcsec and ymin < dd.yMaxArcsec:
-                        yOverLaps = True
-                    elif ymin < dd.yMinArcsec and ymax > dd.yMaxArcsec:
-                        yOverLaps = True
-
-                    if xOverLaps and yOverLaps and dd not in outputList:
-                        viableDetectors.append(dd)
+        @param [in] radius is a numpy array of the radii of the objects' footprints in arcseconds
+        (see _getFootprintRadius).  Objects with a radius of zero will not be assigned to any detectors.
 
+        @param [out] membership is a numpy array of booleans with shape
+        (len(xPupil), len(self.detectors)).  membership[i][j] is True if
+        object i illumines self.detectors[j].
+        """
 
-                if len(viableDetectors)>0:
+        return self._detectorIndex.circleMembership(xPupil, yPupil, radius)
 
-                    #Find the pixels that have a flux greater than 0.001 times the flux of
-                    #the central pixel (remember that the object is centered on the test image)
-                    maxPixel = centeredImage(centeredImage.getXMax()/2, centeredImage.getYMax()/2)
-                    activePixels = numpy.where(centeredImage.array>maxPixel*0.001)
 
-                    #Find the bounds of those active pixels in pixel coordinates
-                    xmin = testScale * (activePixels[0].min() - centeredImage.getXMax()/2) + gsObject.xPupilArcsec
-                    xmax = testScale * (activePixels[0].max() - centeredImage.getXMax()/2) + gsObject.xPupilArcsec
-                    ymin = testScale * (activePixels[1].min() - centeredImage.getYMax()/2) + gsObject.yPupilArcsec
-                    ymax = testScale * (activePixels[1].max() - centeredImage.getYMax()/2) + gsObject.yPupilArcsec
+    def _footprintCacheKey(self, gsObject, bandpassName):
+        """
+        Return the key under which the footprint of an object is stored in the footprint cache.
+        Galaxies whose half light radii, Sersic indices, and axis ratios agree to within a
+        fraction self.footprintCacheTolerance share a key.  All point sources share a key.
+        Galaxies whose half light radius, Sersic index, or axis ratio is not positive
+        (or not finite) are not cached.
 
-                    #find all of the detectors that overlap with the bounds of the active pixels.
-                    for dd in viableDetectors:
-                        xOverLaps = False
-                        if xmax > dd.xMinArcsec and xmax < dd.xMaxArcsec:
-                            xOverLaps = True
-                        elif xmin > dd.xMinArcsec and xmin < dd.xMaxArcsec:
-                            xOverLaps = True
-                        elif xmin < dd.xMinArcsec and xmax > dd.xMaxArcsec:
-                            xOverLaps = True
-
-                        yOverLaps = False
-                        if ymax > dd.yMinArcsec and ymax < dd.yMaxArcsec:
-                            yOverLaps = True
-                        elif ymin > dd.yMinArcsec and ymin < dd.yMaxArcsec:
-                            yOverLaps = True
-                        elif ymin < dd.yMinArcsec and ymax > dd.yMaxArcsec:
-                            yOverLaps = True
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
 
-                        #specifically test that these overlapping detectors do contain active pixels
-                        if xOverLaps and yOverLaps:
-                            if self._doesObjectImpingeOnDetector(xPupil=gsObject.xPupilArcsec - centeredImage.getXMax()*testScale/2.0,
-                                                                 yPupil=gsObject.yPupilArcsec - centeredImage.getYMax()*testScale/2.0,
-                                                                 detector=dd, imgScale=centeredImage.scale,
-                                                                 nonZeroPixels=activePixels):
+        @param [in] bandpassName is the name of the bandpass being drawn
 
-                                if outputString != '':
-                                    outputString += '//'
-                                outputString += dd.name
-                                outputList.append(dd)
+        @param [out] the key (None if the footprint cannot be cached)
+        """
 
-        if outputString == '':
-            outputString = None
+        keys = self._footprintCacheKeys(numpy.array([gsObject.galSimType]),
+                                        numpy.array([gsObject.halfLightRadiusArcsec]),
+                                        numpy.array([gsObject.sindex]),
+                                        numpy.array([gsObject.minorAxisRadians]),
+                                        numpy.array([gsObject.majorAxisRadians]), bandpassName)
 
-        return outputString, outputList, centeredObjDict
+        if keys is None:
+            return None
 
+        return keys[0]
 
-    def blankImage(self, detector=None):
-        """
-        Draw a blank image associated with a specific detector.  The image will have the correct size
-        for the given detector.
 
-        param [in] detector is an instantiation of GalSimDetector
+    def _footprintCacheKeys(self, galSimType, halfLightRadiusArcsec, sindex, minorAxis, majorAxis,
+                            bandpassName):
         """
+        Return the keys under which the footprints of a set of objects are stored in the
+        footprint cache (see _footprintCacheKey).
 
-        #in order to speed up the code (by a factor of ~2), this method
-        #only draws a new blank image the first time it is called on a
-        #given detector.  It then caches the blank images it has drawn and
-        #uses GalSim's copy() method to return copies of cached blank images
-        #whenever they are called for again.
+        @param [in] galSimType is a numpy array of the types of the objects
 
-        if detector.name in self.blankImageCache:
-            return self.blankImageCache[detector.name].copy()
-        else:
-            image = galsim.Image(detector.xMaxPix-detector.xMinPix+1, detector.yMaxPix-detector.yMinPix+1, \
-                                 wcs=detector.wcs)
+        @param [in] halfLightRadiusArcsec is a numpy array of the half light radii of the objects in arcseconds
 
-            self.blankImageCache[detector.name] = image
-            return image.copy()
+        @param [in] sindex is a numpy array of the Sersic indices of the objects
 
-    def drawObject(self, gsObject):
-        """
-        Draw an astronomical object on all of the relevant FITS files.
+        @param [in] minorAxis is a numpy array of the semi-minor axes of the objects
 
-        @param [in] gsObject is an instantiation of the GalSimCelestialObject
-        class carrying all of the information for the object whose image
-        is to be drawn
+        @param [in] majorAxis is a numpy array of the semi-major axes of the objects
 
-        @param [out] outputString is a string denoting which detectors the astronomical
-        object illumines, suitable for output in the GalSim InstanceCatalog
+        @param [in] bandpassName is the name of the bandpass being drawn
+
+        @param [out] a list of the keys, one per object (None if the footprints cannot be cached;
+        the key of an individual object is None if its footprint cannot be cached)
         """
 
-        #find the detectors which the astronomical object illumines
-        outputString, \
-        detectorList, \
-        centeredObjDict = self.findAllDetectors(gsObject)
+        if self.PSF is not None and self.PSF.position_dependent:
+            #the footprint depends on where the object is
+            return None
 
-        if gsObject.sed is None or len(detectorList) == 0:
-            #there is nothing to draw
-            return outputString
+        isSersic = galSimType == 'sersic'
 
-        #go through the list of detector/bandpass combinations and initialize
-        #all of the FITS files we will need (if they have not already been initialized)
-        for detector in detectorList:
-            for bandpassName in self.bandpasses:
-                name = self._getFileName(detector=detector, bandpassName=bandpassName)
-                if name not in self.detectorImages:
-                    self.detectorImages[name] = self.blankImage(detector=detector)
-                    if self.noiseWrapper is not None:
-                        #Add sky background and noise to the image
-                        self.detectorImages[name] = self.noiseWrapper.addNoiseAndBackground(self.detectorImages[name],
-                                                                              bandpass=self.catSimBandpasses[bandpassName],
-                                                                              m5=self.obs_metadata.m5[bandpassName],
-                                                                              seeing=self.obs_metadata.seeing[bandpassName],
-                                                                              photParams=detector.photParams)
-
-        spectrum = galsim.SED(spec = lambda ll: numpy.interp(ll, gsObject.sed.wavelen, gsObject.sed.flambda),
-                              flux_type='flambda')
+        #only the shapes of galaxies are used, so that point sources (whose radii and
+        #axes are zero) need not be passed through the logarithm
+        shape = numpy.zeros((len(galSimType), 3))
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            shape[isSersic] = numpy.array([halfLightRadiusArcsec[isSersic], sindex[isSersic],
+                                           minorAxis[isSersic]/majorAxis[isSersic]]).transpose()
 
-        for bandpassName in self.bandpasses:
+        #the logarithm of a shape parameter which is not positive would map unrelated
+        #galaxies onto the same (meaningless) key
+        cacheable = numpy.logical_or(numpy.logical_not(isSersic),
+                                     numpy.logical_and(numpy.isfinite(shape), shape > 0.0).all(axis=1))
+        shape[numpy.logical_not(cacheable)] = 1.0
 
-            #create a new object if one has not already been created or if the PSF is wavelength
-            #dependent (in which case, each filter is going to need its own initialized object)
-            centeredObj = centeredObjDict[bandpassName]
-            if centeredObj is None:
-                return outputString
+        if self.footprintCacheTolerance > 0.0:
+            shape[isSersic] = numpy.round(numpy.log(shape[isSersic])/self.footprintCacheTolerance)
+            shape = shape.astype(int)
 
-            for detector in detectorList:
+        psfId = id(self.PSF)
+        return [(objType, tuple(objShape) if objIsSersic else (), psfId, bandpassName) if objIsCacheable else None
+                for objType, objShape, objIsSersic, objIsCacheable in
+                zip(galSimType.tolist(), shape.tolist(), isSersic.tolist(), cacheable.tolist())]
 
-                name = self._getFileName(detector=detector, bandpassName=bandpassName)
 
-                xPix, yPix = pixelCoordsFromPupilCoords(numpy.array([gsObject.xPupilRadians]),
-                                                        numpy.array([gsObject.yPupilRadians]),
-                                                        chipNames=[detector.name],
-                                                        camera=detector.afwCamera)
+    def _getFootprint(self, gsObject, bandpassName, centeredObj, flux=None):
+        """
+        Return the radius of an object's footprint, either from the footprint cache, or
+        by calculating it (see _getFootprintRadius).  If the flux of the object is known,
+        the footprint is then scaled to the level of the sky noise (see _scaleFootprintToSky).
 
-                obj = centeredObj.copy()
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
 
-                #convolve the object's shape profile with the spectrum
-                obj = obj*spectrum
-                localImage = self.blankImage(detector=detector)
-                localImage = obj.drawImage(bandpass=self.bandpasses[bandpassName], wcs=detector.wcs,
-                                           method='phot', gain=detector.photParams.gain, image=localImage,
-                                           offset=galsim.PositionD(xPix[0]-detector.xCenterPix, yPix[0]-detector.yCenterPix),
-                                           rng=self._rng)
+        @param [in] bandpassName is the name of the bandpass being drawn
 
-                self.detectorImages[name] += localImage
+        @param [in] centeredObj is the GalSim object whose footprint is desired
+        (see createCenteredObject)
 
-        return outputString
+        @param [in] flux is the number of electrons the object deposits in the bandpass
+        (None if the footprint is not to be scaled to the sky noise)
 
-    def drawPointSource(self, gsObject, bandpass=None):
+        @param [out] the radius of the object's footprint in arcseconds
         """
-        Draw an image of a point source.
 
-        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
-        carrying information about the object whose image is to be drawn
+        radius = self._getUnscaledFootprint(gsObject, bandpassName, centeredObj)
 
-        @param [in] bandpass is an instantiation of the galsim.Bandpass class characterizing
-        the bandpass over which we are integrating (in case the PSF is wavelength dependent)
-        """
+        if flux is None:
+            return radius
 
-        if self.PSF is None:
-            raise RuntimeError("Cannot draw a point source in GalSim without a PSF")
+        return self._scaleFootprintToSky(gsObject, bandpassName, radius, flux)
 
-        return self.PSF.applyPSF(xPupil=gsObject.xPupilArcsec, yPupil=gsObject.yPupilArcsec, bandpass=bandpass)
 
-    def drawSersic(self, gsObject, bandpass=None):
+    def _getUnscaledFootprint(self, gsObject, bandpassName, centeredObj):
         """
-        Draw the image of a Sersic profile.
+        Return the radius of an object's footprint at GalSim's default folding_threshold, either
+        from the footprint cache, or by calculating it (see _getFootprintRadius).
 
         @param [in] gsObject is an instantiation of the GalSimCelestialObject class
-        carrying information about the object whose image is to be drawn
 
-        @param [in] bandpass is an instantiation of the galsim.Bandpass class characterizing
-        the bandpass over which we are integrating (in case the PSF is wavelength dependent)
+        @param [in] bandpassName is the name of the bandpass being drawn
+
+        @param [in] centeredObj is the GalSim object whose footprint is desired
+        (see createCenteredObject)
+
+        @param [out] the radius of the object's footprint in arcseconds
         """
 
-        #create a Sersic profile
-        centeredObj = galsim.Sersic(n=float(gsObject.sindex), half_light_radius=float(gsObject.halfLightRadiusArcsec))
+        key = self._footprintCacheKey(gsObject, bandpassName)
 
-        # Turn the Sersic profile into an ellipse
-        # Subtract pi/2 from the position angle, because GalSim sets position angle=0
+        if key is None:
+            return self._getFootprintRadius(centeredObj)
+
+        radius = self._footprintCache.get(key)
+        if radius is None:
+            radius = self._getFootprintRadius(centeredObj)
+            self._footprintCache.set(key, radius)
+
+        #objects sharing a key can differ in size by a factor of exp(footprintCacheTolerance);
+        #pad the radius so that the footprint remains conservative
+        return radius*numpy.exp(self.footprintCacheTolerance)
+
+
+    def _getFootprintBandpass(self):
+        """
+        Return the name of the bandpass in which footprints are evaluated when
+        self.singleFootprintPass is True.  This is the bandpass in which the PSF
+        is widest (as measured by its stepK at the center of the field of view),
+        so that the footprint evaluated there is conservative in all bandpasses.
+
+        @param [out] the name of the bandpass (None if footprints are to be
+        evaluated separately in each bandpass)
+        """
+
+        if not self.singleFootprintPass or self.PSF is None or not self.PSF.wavelength_dependent:
+            return None
+
+        if self._footprintBandpassName is None:
+            minStepK = None
+            for bandpassName in self.bandpasses:
+                psf = self.PSF._getPSF(xPupil=0.0, yPupil=0.0, bandpass=self.bandpasses[bandpassName])
+                stepK = psf.stepK()
+                if minStepK is None or stepK < minStepK:
+                    minStepK = stepK
+                    self._footprintBandpassName = bandpassName
+
+        return self._footprintBandpassName
+
+
+    def _getFootprintRadius(self, centeredObj):
+        """
+        Estimate the radius outside of which an object casts a negligible amount of light.
+
+        GalSim chooses the stepK of a profile such that an image 2*pi/stepK on a side
+        contains all but a small fraction (the folding_threshold of the profile's GSParams)
+        of the profile's flux.  Because stepK is calculated from the profile itself, it
+        accounts for the half light radius, Sersic index, and axis ratio of the object, as well as
+        for the size of any PSF with which the object has been convolved.
+
+        @param [in] centeredObj is the GalSim object whose footprint is desired
+        (see createCenteredObject)
+
+        @param [out] the radius of the object's footprint in arcseconds
+        """
+        return numpy.pi/centeredObj.stepK()
+
+
+    def _scaleFootprintToSky(self, gsObject, bandpassName, radius, flux):
+        """
+        Rescale the radius of an object's footprint so that the fraction of the object's flux
+        falling outside of it is the ratio of the sky noise in a single pixel to the object's
+        total flux, rather than GalSim's default folding_threshold (see _getFootprintRadius).
+        The fraction is never allowed to exceed the folding_threshold, since photons falling
+        outside of the footprint are lost from the postage stamp.  Footprints therefore only
+        grow: faint objects keep GalSim's default footprint rather than a smaller, sky-limited
+        one, which would bias their photometry.
+
+        The light of a point source is dominated by the core of the PSF, so its radius is
+        scaled as for a Gaussian.  The radius of a galaxy is split into the radius of the
+        Sersic profile itself (calculated analytically, see _sersicEnclosingRadius) and
+        the remainder, which is attributed to the PSF and scaled as for a Gaussian.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+
+        @param [in] bandpassName is the name of the bandpass being drawn
+
+        @param [in] radius is the radius of the footprint at GalSim's default folding_threshold
+        in arcseconds
+
+        @param [in] flux is the number of electrons the object deposits in the bandpass
+
+        @param [out] the rescaled radius in arcseconds
+        """
+
+        if flux <= 0.0:
+            return radius
+
+        return self._scaleFootprintsToSky(bandpassName, numpy.array([radius]), numpy.array([flux]),
+                                          numpy.array([gsObject.galSimType]),
+                                          numpy.array([gsObject.halfLightRadiusArcsec]),
+                                          numpy.array([gsObject.sindex]),
+                                          numpy.array([gsObject.minorAxisRadians]),
+                                          numpy.array([gsObject.majorAxisRadians]))[0]
+
+
+    def _scaleFootprintsToSky(self, bandpassName, radius, flux, galSimType, halfLightRadiusArcsec,
+                              sindex, minorAxis, majorAxis):
+        """
+        Rescale the radii of the footprints of a set of objects to the level of the sky noise
+        (see _scaleFootprintToSky).
+
+        @param [in] bandpassName is the name of the bandpass being drawn
+
+        @param [in] radius is a numpy array of the radii of the footprints at GalSim's default
+        folding_threshold in arcseconds
+
+        @param [in] flux is a numpy array of the numbers of electrons the objects deposit in the bandpass
+
+        @param [in] galSimType, halfLightRadiusArcsec, sindex, minorAxis, and majorAxis are
+        numpy arrays of the shapes of the objects (see _footprintCacheKeys)
+
+        @param [out] a numpy array of the rescaled radii in arcseconds
+        """
+
+        radius = numpy.array(radius, dtype=float)
+
+        noiseLevel = self._getNoiseLevel(bandpassName)
+        if noiseLevel is None:
+            return radius
+
+        toScale = numpy.where(flux > 0.0)[0]
+        if len(toScale) == 0:
+            return radius
+
+        defaultFraction = galsim.GSParams().folding_threshold
+
+        #the footprint sets the size of the postage stamp, so never allow more of the flux
+        #than GalSim's default to fall outside of it
+        fraction = numpy.clip(noiseLevel/flux[toScale], 1.0e-10, defaultFraction)
+
+        #round the fraction down to one of a discrete set of values so that
+        #_sersicEnclosingRadius can cache its results
+        fraction = numpy.power(10.0, 0.1*numpy.floor(10.0*numpy.log10(fraction)))
+
+        psfScale = numpy.sqrt(numpy.log(fraction)/numpy.log(defaultFraction))
+
+        scaled = radius[toScale]*psfScale
+
+        isSersic = numpy.where(galSimType[toScale] == 'sersic')[0]
+        if len(isSersic) > 0:
+            galaxies = toScale[isSersic]
+
+            #drawSersic shears the profile while preserving its area, so the half light radius
+            #along the major axis is larger than gsObject.halfLightRadiusArcsec
+            roundedIndex = numpy.ceil(20.0*sindex[galaxies])/20.0
+            majorRadius = halfLightRadiusArcsec[galaxies]*numpy.sqrt(majorAxis[galaxies]/minorAxis[galaxies])
+
+            #the Sersic indices and fractions both take discrete values, so
+            #_sersicEnclosingRadius is only called once for each distinct value
+            enclosing = numpy.zeros(len(galaxies))
+            uniqueIndex, indexInverse = numpy.unique(roundedIndex, return_inverse=True)
+            defaultEnclosing = numpy.array([_sersicEnclosingRadius(nn, defaultFraction)
+                                            for nn in uniqueIndex])[indexInverse]
+
+            galaxyFraction = fraction[isSersic]
+            for ff in numpy.unique(galaxyFraction):
+                match = numpy.where(galaxyFraction == ff)[0]
+                matchIndex, matchInverse = numpy.unique(roundedIndex[match], return_inverse=True)
+                enclosing[match] = numpy.array([_sersicEnclosingRadius(nn, ff)
+                                                for nn in matchIndex])[matchInverse]
+
+            defaultGalaxyRadius = majorRadius*defaultEnclosing
+            galaxyRadius = majorRadius*enclosing
+            psfRadiusSquared = numpy.maximum(radius[galaxies]*radius[galaxies] -
+                                             defaultGalaxyRadius*defaultGalaxyRadius, 0.0)
+
+            galaxyScale = psfScale[isSersic]
+            scaled[isSersic] = numpy.sqrt(galaxyRadius*galaxyRadius +
+                                          psfRadiusSquared*galaxyScale*galaxyScale)
+
+        radius[toScale] = scaled
+        return radius
+
+
+    def _getNoiseLevel(self, bandpassName, detector=None):
+        """
+        Return the standard deviation of the sky noise in a single pixel (see
+        NoiseAndBackgroundBase.getNoiseLevel).  The sky level is assumed to be
+        the same on all of the detectors.
+
+        Footprints, culling, and the other estimates made before an object has been
+        assigned to detectors pass detector=None, and so use the gain and read noise of
+        the first detector; they assume that all of the detectors share one gain and
+        read noise (as the detectors made by GalSimBase do).
+
+        @param [in] bandpassName is the name of the bandpass being drawn
+
+        @param [in] detector is the GalSimDetector being drawn on (None to use the
+        first of self.detectors)
+
+        @param [out] the noise in electrons per pixel (None if no noise is being
+        added to the images)
+        """
+
+        if self.noiseWrapper is None:
+            return None
+
+        if detector is None:
+            detector = self.detectors[0]
+
+        key = (bandpassName, detector.name)
+        if key not in self._noiseLevelCache:
+            noiseLevel = self.noiseWrapper.getNoiseLevel(bandpass=self.catSimBandpasses[bandpassName],
+                                                         m5=self.obs_metadata.m5[bandpassName],
+                                                         seeing=self.obs_metadata.seeing[bandpassName],
+                                                         photParams=detector.photParams)
+
+            if noiseLevel <= 0.0:
+                noiseLevel = None
+
+            self._noiseLevelCache[key] = noiseLevel
+
+        return self._noiseLevelCache[key]
+
+
+    def _getSignalToNoise(self, gsObject, bandpassName):
+        """
+        Predict the signal to noise ratio of an object in a bandpass from its flux and the sky
+        noise, i.e. S/N = flux/sqrt(flux + nEff*noise**2), where nEff = 2.266*(FWHM/platescale)**2
+        is the effective number of pixels covered by the seeing disk.  Extended objects cover
+        more pixels than this, so this is an upper limit on their signal to noise ratio.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+
+        @param [in] bandpassName is the name of the bandpass
+
+        @param [out] the signal to noise ratio (None if no noise is being added to the images)
+        """
+
+        if self._getNoiseLevel(bandpassName) is None:
+            return None
+
+        return self._signalToNoiseFromFlux(self._getBandFlux(gsObject, bandpassName), bandpassName)
+
+
+    def _signalToNoiseFromFlux(self, flux, bandpassName):
+        """
+        Predict the signal to noise ratio of objects of a given flux (see _getSignalToNoise)
+
+        @param [in] flux is the number of electrons the object deposits in the bandpass
+        (either a float or a numpy array of floats)
+
+        @param [in] bandpassName is the name of the bandpass
+
+        @param [out] the signal to noise ratio (None if no noise is being added to the images)
+        """
+
+        noiseLevel = self._getNoiseLevel(bandpassName)
+        if noiseLevel is None:
+            return None
+
+        flux = numpy.maximum(flux, 0.0)
+        nEff = 2.266*numpy.power(self.obs_metadata.seeing[bandpassName]/self.detectors[0].photParams.platescale, 2)
+
+        return flux/numpy.sqrt(flux + nEff*noiseLevel*noiseLevel)
+
+
+    def _getFaintBandpasses(self, gsObject):
+        """
+        Find the bandpasses in which an object's predicted signal to noise ratio
+        (see _getSignalToNoise) is below self.snrFloor
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+
+        @param [out] a list of the names of the bandpasses in which the object is too faint to be drawn
+        """
+
+        if self.snrFloor is None or gsObject.sed is None:
+            return []
+
+        faintBandpassNames = []
+        for bandpassName in self.bandpasses:
+            snr = self._getSignalToNoise(gsObject, bandpassName)
+            if snr is not None and snr < self.snrFloor:
+                faintBandpassNames.append(bandpassName)
+
+        return faintBandpassNames
+
+
+    def _getVisibleBandpasses(self, gsObject):
+        """
+        Find the bandpasses in which an object is bright enough to be drawn, i.e. those in
+        which its predicted signal to noise ratio (see _getSignalToNoise) is at least
+        self.snrFloor.  The numbers of culled objects and bandpasses are recorded
+        (see getStatistics).
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+
+        @param [out] a list of the names of the bandpasses in which the object will be drawn
+        """
+
+        faintBandpassNames = self._getFaintBandpasses(gsObject)
+        if len(faintBandpassNames) == 0:
+            return list(self.bandpasses.keys())
+
+        visibleBandpassNames = [bandpassName for bandpassName in self.bandpasses
+                                if bandpassName not in faintBandpassNames]
+
+        self._culledBandpasses += len(self.bandpasses) - len(visibleBandpassNames)
+        if len(visibleBandpassNames) == 0:
+            self._culledObjects += 1
+
+        return visibleBandpassNames
+
+
+    def _getSpectrum(self, gsObject):
+        """
+        Convert the SED of an astronomical object into a galsim.SED
+
+        Seds made by GalSimBase._calculateGalSimSeds carry the key of the template they were
+        made from (galSimTemplate: the SED file, redshift, and dust parameters) and the factor
+        by which that template was normalized (galSimNormalization).  The galsim.SED of each
+        template is built once and cached (see spectrumCacheSize in __init__); each object
+        only scales it by its own normalization.  Other Seds are converted one at a time.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+
+        @param [out] a galsim.SED
+        """
+
+        #the same object's SED is usually requested several times in a row
+        #(to find its footprint and then to draw it)
+        if self._lastSpectrum is not None and self._lastSpectrum[0] is gsObject.sed:
+            return self._lastSpectrum[1]
+
+        templateKey = getattr(gsObject.sed, 'galSimTemplate', None)
+        if templateKey is None:
+            spectrum = self._buildSpectrum(gsObject.sed.wavelen, gsObject.sed.flambda)
+        else:
+            normalization = gsObject.sed.galSimNormalization
+            template = self._spectrumCache.get(templateKey)
+            if template is None:
+                template = self._buildSpectrum(gsObject.sed.wavelen, gsObject.sed.flambda/normalization)
+                self._spectrumCache.set(templateKey, template)
+
+            spectrum = template*normalization
+
+        self._lastSpectrum = (gsObject.sed, spectrum)
+        return spectrum
+
+
+    def _buildSpectrum(self, wavelen, flambda):
+        """
+        Build a galsim.SED on a galsim.LookupTable (see _getSpectrum)
+
+        @param [in] wavelen is a numpy array of wavelengths in nanometers
+
+        @param [in] flambda is a numpy array of the flux density of the SED in ergs/cm^2/s/nm
+
+        @param [out] a galsim.SED
+        """
+
+        #galsim.LookupTable will not extrapolate; extend the SED to cover all of the
+        #bandpasses by holding its end values constant (as numpy.interp would)
+        if wavelen[0] > self._minWavelength:
+            wavelen = numpy.append(self._minWavelength, wavelen)
+            flambda = numpy.append(flambda[0], flambda)
+        if wavelen[-1] < self._maxWavelength:
+            wavelen = numpy.append(wavelen, self._maxWavelength)
+            flambda = numpy.append(flambda, flambda[-1])
+
+        #As with the bandpasses (see setBandpasses), building the SED on a galsim.LookupTable
+        #rather than a lambda function means that GalSim can evaluate it without calling back
+        #into numpy.interp at every wavelength.  Linear interpolation gives the same values
+        #as numpy.interp.
+        return galsim.SED(spec=galsim.LookupTable(x=wavelen, f=flambda, interpolant='linear'),
+                          flux_type='flambda')
+
+
+    def _getBandFlux(self, gsObject, bandpassName):
+        """
+        Return the number of electrons an object deposits on the detectors in a bandpass.
+        This is calculated from the object's Sed and the CatSim bandpass, which already
+        include the exposure time, effective area, and throughput of the telescope.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+
+        @param [in] bandpassName is the name of the bandpass
+        """
+
+        return self._getSedBandFlux(gsObject.sed, bandpassName)
+
+
+    def _getSedBandFlux(self, sed, bandpassName):
+        """
+        Return the number of electrons an object with a given Sed deposits on the detectors
+        in a bandpass (see _getBandFlux).
+
+        @param [in] sed is an instantiation of the Sed class
+
+        @param [in] bandpassName is the name of the bandpass
+        """
+
+        if self._chunkBandFluxes is not None:
+            #drawObjectList asks for the fluxes of every object in its chunk several times
+            #(to cull it, to find its footprint, and to draw it), with other objects in
+            #between; remember them all until the chunk has been drawn.  The Sed is kept
+            #alongside its fluxes so that its id cannot be re-used within the chunk.
+            key = id(sed)
+            if key not in self._chunkBandFluxes:
+                self._chunkBandFluxes[key] = (sed, {})
+
+            fluxes = self._chunkBandFluxes[key][1]
+        else:
+            #the same object's fluxes are usually requested several times in a row
+            #(to find its footprint and then to draw it)
+            if self._lastBandFluxes is None or self._lastBandFluxes[0] is not sed:
+                self._lastBandFluxes = (sed, {})
+
+            fluxes = self._lastBandFluxes[1]
+
+        if bandpassName not in fluxes:
+            self._bandFluxCalculations += 1
+            fluxes[bandpassName] = sed.calcADU(self.catSimBandpasses[bandpassName],
+                                                        photParams=self._unitPhotParams)
+
+        return fluxes[bandpassName]
+
+
+    def _findDetectorsFromFootprint(self, gsObject, footprintDict):
+        """
+        Find all of the detectors which overlap the footprint of an object.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+        carrying information about the object whose image is to be drawn
+
+        @param [in] footprintDict is a dict of footprint radii in arcseconds keyed on the
+        names of the bandpasses
+
+        @param [out] outputList is a list of the GalSimDetectors illumined by the object
+        """
+
+        #the footprints in all of the bandpasses have the same center, so
+        #their union is just the largest of them
+        return self._detectorIndex.findDetectorsInCircle(gsObject.xPupilArcsec, gsObject.yPupilArcsec,
+                                                         max(footprintDict.values()))
+
+
+    def _findDetectorsFromTestImage(self, gsObject, centeredObjDict):
+        """
+        Find all of the detectors illumined by an object by drawing a test image of the object
+        using photon shooting and comparing the active pixels of that image with the domains of the
+        detectors.  This is more exact than _findDetectorsFromFootprint, but much slower.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+        carrying information about the object whose image is to be drawn
+
+        @param [in] centeredObjDict is a dict of GalSim objects centered on the chip, keyed on
+        the names of the bandpasses (see findAllDetectors)
+
+        @param [out] outputList is a list of the GalSimDetectors illumined by the object
+        """
+
+        outputList = []
+        testScale = 0.1
+
+        #if this is not None, only draw a test image in this bandpass
+        footprintBandpassName = self._getFootprintBandpass()
+
+        nTests = 0
+        for bandpassName in self.bandpasses:
+            if footprintBandpassName is not None and bandpassName != footprintBandpassName:
+                continue
+
+            goOn = False
+            if nTests==0 or (self.PSF is not None and self.PSF.wavelength_dependent):
+
+                #if we have already decided that the object illumines all detectors,
+                #there is no point in going on
+                for dd in self.detectors:
+                    if dd not in outputList:
+                        goOn = True
+                        break
+
+            nTests += 1
+            if goOn:
+                centeredObj = centeredObjDict[bandpassName]
+
+                #4 March 2015
+                #create a test image of the object to compare against the pixel
+                #domains of each detector.  Use photon shooting rather than real space integration
+                #for reasons of speed.  A flux of 1000 photons ought to be enough to plot the true
+                #extent of the object, but this is just a guess.
+                centeredImage = centeredObj.drawImage(scale=testScale, method='phot', n_photons=1000, rng=self._rng)
+                xmax = testScale * (centeredImage.getXMax()/2) + gsObject.xPupilArcsec
+                xmin = testScale * (-1*centeredImage.getXMax()/2) + gsObject.xPupilArcsec
+                ymax = testScale * (centeredImage.getYMax()/2) + gsObject.yPupilArcsec
+                ymin = testScale * (-1*centeredImage.getYMax()/2) + gsObject.yPupilArcsec
+
+                #first assemble a list of detectors which have any hope
+                #of overlapping the test image
+                viableDetectors = [dd for dd in self._detectorIndex.findDetectors(xmin, xmax, ymin, ymax)
+                                   if dd not in outputList]
+
+                if len(viableDetectors)>0:
+
+                    #Find the pixels that have a flux greater than 0.001 times the flux of
+                    #the central pixel (remember that the object is centered on the test image)
+                    maxPixel = centeredImage(centeredImage.getXMax()/2, centeredImage.getYMax()/2)
+                    activePixels = numpy.where(centeredImage.array>maxPixel*0.001)
+
+                    #Find the bounds of those active pixels in pixel coordinates
+                    xmin = testScale * (activePixels[0].min() - centeredImage.getXMax()/2) + gsObject.xPupilArcsec
+                    xmax = testScale * (activePixels[0].max() - centeredImage.getXMax()/2) + gsObject.xPupilArcsec
+                    ymin = testScale * (activePixels[1].min() - centeredImage.getYMax()/2) + gsObject.yPupilArcsec
+                    ymax = testScale * (activePixels[1].max() - centeredImage.getYMax()/2) + gsObject.yPupilArcsec
+
+                    #find all of the detectors that overlap with the bounds of the active pixels.
+                    for dd in self._detectorIndex.findDetectors(xmin, xmax, ymin, ymax):
+                        #specifically test that these overlapping detectors do contain active pixels
+                        if dd in viableDetectors:
+                            if self._doesObjectImpingeOnDetector(xPupil=gsObject.xPupilArcsec - centeredImage.getXMax()*testScale/2.0,
+                                                                 yPupil=gsObject.yPupilArcsec - centeredImage.getYMax()*testScale/2.0,
+                                                                 detector=dd, imgScale=centeredImage.scale,
+                                                                 nonZeroPixels=activePixels):
+
+                                outputList.append(dd)
+
+        return outputList
+
+
+    def blankImage(self, detector=None, dtype=None):
+        """
+        Draw a blank image associated with a specific detector.  The image will have the correct size
+        for the given detector.
+
+        param [in] detector is an instantiation of GalSimDetector
+
+        param [in] dtype is the numpy type of the image's pixels (defaults to self.pixelDtype)
+        """
+
+        if dtype is None:
+            dtype = self.pixelDtype
+
+        #in order to speed up the code (by a factor of ~2), this method
+        #only draws a new blank image the first time it is called on a
+        #given detector.  It then caches the blank images it has drawn and
+        #uses GalSim's copy() method to return copies of cached blank images
+        #whenever they are called for again.
+
+        key = (detector.name, dtype)
+        if key in self.blankImageCache:
+            return self.blankImageCache[key].copy()
+        else:
+            image = galsim.Image(detector.xMaxPix-detector.xMinPix+1, detector.yMaxPix-detector.yMinPix+1, \
+                                 wcs=detector.wcs, dtype=dtype)
+
+            self.blankImageCache[key] = image
+            return image.copy()
+
+    def _initializeDetectorImage(self, detector, bandpassName):
+        """
+        Create the image of a detector in a bandpass, including the sky background
+        and noise (if self.noiseWrapper is not None).
+
+        @param [in] detector is an instantiation of GalSimDetector
+
+        @param [in] bandpassName is the name of the bandpass (i.e. 'u', 'g', etc.)
+
+        @param [out] a GalSim image of the detector
+        """
+
+        image = self.blankImage(detector=detector)
+
+        if self.noiseWrapper is None:
+            return image
+
+        if not self._countElectrons:
+            #Add sky background and noise to the image
+            return self.noiseWrapper.addNoiseAndBackground(image,
+                                                           bandpass=self.catSimBandpasses[bandpassName],
+                                                           m5=self.obs_metadata.m5[bandpassName],
+                                                           seeing=self.obs_metadata.seeing[bandpassName],
+                                                           photParams=detector.photParams)
+
+        #the noise wrapper works in ADU on floating point images; convert the
+        #result to electrons
+        noisyImage = self.noiseWrapper.addNoiseAndBackground(self.blankImage(detector=detector, dtype=numpy.float32),
+                                                             bandpass=self.catSimBandpasses[bandpassName],
+                                                             m5=self.obs_metadata.m5[bandpassName],
+                                                             seeing=self.obs_metadata.seeing[bandpassName],
+                                                             photParams=detector.photParams)
+
+        image.array[:,:] = numpy.round(noisyImage.array*detector.photParams.gain).astype(self.pixelDtype)
+        return image
+
+    def _addToDetectorImage(self, name, stamp):
+        """
+        Add a drawn image (either a postage stamp or an image the size of the whole detector)
+        to the region of a detector image which it covers.
+
+        @param [in] name is the key of the detector image in self.detectorImages
+
+        @param [in] stamp is a floating point GalSim image (in ADU if self.pixelDtype is a floating
+        point type; in electrons otherwise)
+        """
+
+        image = self.detectorImages[name][stamp.bounds]
+
+        if self._countElectrons:
+            image.array[:,:] += numpy.round(stamp.array).astype(self.pixelDtype)
+        else:
+            image += stamp
+
+    def _getDrawGain(self, detector):
+        """
+        Return the gain with which to draw objects on a detector: the gain of the detector if
+        the images are in ADU, or unity if they are in electrons (see pixelDtype in __init__)
+        """
+
+        if self._countElectrons:
+            return 1.0
+
+        return detector.photParams.gain
+
+    def _getImagePosition(self, detector, xPix, yPix):
+        """
+        Find the position of an object in the coordinate system of a detector image
+
+        @param [in] detector is an instantiation of GalSimDetector
+
+        @param [in] xPix is the x pixel coordinate of the object on the detector
+
+        @param [in] yPix is the y pixel coordinate of the object on the detector
+
+        @param [out] a galsim.PositionD
+        """
+
+        nx = detector.xMaxPix - detector.xMinPix + 1
+        ny = detector.yMaxPix - detector.yMinPix + 1
+
+        #drawObject places objects on a full-detector image by offsetting them from the
+        #true center of that image by (xPix-xCenterPix, yPix-yCenterPix); put the object
+        #at the same position here so that stamps and full images agree
+        return galsim.PositionD(0.5*(1+nx) + xPix - detector.xCenterPix,
+                                0.5*(1+ny) + yPix - detector.yCenterPix)
+
+    def _getStampBounds(self, detector, xPix, yPix, stampSize):
+        """
+        Find the bounds of a postage stamp centered on the pixel containing an object.
+
+        @param [in] detector is an instantiation of GalSimDetector
+
+        @param [in] xPix is the x pixel coordinate of the object on the detector
+
+        @param [in] yPix is the y pixel coordinate of the object on the detector
+
+        @param [in] stampSize is the number of pixels on a side of the postage stamp
+
+        @param [out] bounds is a galsim.BoundsI denoting the region of the detector image
+        covered by the postage stamp (clipped to the edges of the detector).  This will be
+        None if the stamp does not overlap the detector at all.
+
+        @param [out] imagePosition is a galsim.PositionD denoting the position of the object
+        in the coordinate system of the detector image
+        """
+
+        nx = detector.xMaxPix - detector.xMinPix + 1
+        ny = detector.yMaxPix - detector.yMinPix + 1
+
+        imagePosition = self._getImagePosition(detector, xPix, yPix)
+
+        #pixel centers lie at integer positions, so this is the pixel containing the object;
+        #stamps have an odd size (see _getStampSize) so that they are centered on that pixel
+        xLow = int(numpy.floor(imagePosition.x + 0.5)) - stampSize//2
+        yLow = int(numpy.floor(imagePosition.y + 0.5)) - stampSize//2
+
+        bounds = galsim.BoundsI(xLow, xLow+stampSize-1, yLow, yLow+stampSize-1)
+        bounds = bounds & galsim.BoundsI(1, nx, 1, ny)
+
+        if not bounds.isDefined():
+            return None, imagePosition
+
+        return bounds, imagePosition
+
+    def _drawStamp(self, obj, detector, bandpassName, xPix, yPix, stampSize, flux=None, photonWeight=1.0):
+        """
+        Draw an object onto a postage stamp and add that stamp to the appropriate
+        detector image.  The stamp is drawn either by photon shooting or with an
+        FFT (see _chooseDrawMethod).
+
+        @param [in] obj is the GalSim object to be drawn (already convolved with its SED)
+
+        @param [in] detector is an instantiation of GalSimDetector
+
+        @param [in] bandpassName is the name of the bandpass being drawn (i.e. 'u', 'g', etc.)
+
+        @param [in] xPix is the x pixel coordinate of the object on the detector
+
+        @param [in] yPix is the y pixel coordinate of the object on the detector
+
+        @param [in] stampSize is the number of pixels on a side of the postage stamp
+
+        @param [in] flux is the number of electrons the object deposits in the bandpass
+        (used to choose the drawing method)
+
+        @param [in] photonWeight is the number of electrons each photon should carry
+        if the stamp is photon shot (see _getPhotonWeight)
+        """
+
+        bounds, imagePosition = self._getStampBounds(detector, xPix, yPix, stampSize)
+
+        if bounds is None:
+            return
+
+        name = self._getFileName(detector=detector, bandpassName=bandpassName)
+
+        method = self._chooseDrawMethod(flux, stampSize)
+        self._drawCounts[method] += 1
+
+        stamp = galsim.Image(bounds=bounds, wcs=detector.wcs)
+
+        if method == 'phot':
+            stamp = self._drawImage(obj, bandpassName, wcs=detector.wcs,
+                                    gain=self._getDrawGain(detector), image=stamp,
+                                    offset=imagePosition-stamp.trueCenter(),
+                                    **self._getPhotonKwargs(flux, photonWeight))
+        else:
+            #draw the expected number of electrons in each pixel and then add the Poisson
+            #noise which photon shooting would have produced
+            stamp = self._drawImage(obj, bandpassName, method='fft', wcs=detector.wcs,
+                                    gain=1.0, image=stamp,
+                                    offset=imagePosition-stamp.trueCenter())
+
+            #FFTs can ring slightly below zero
+            stamp.array[stamp.array < 0.0] = 0.0
+
+            if self._rng is None:
+                stamp.addNoise(galsim.PoissonNoise())
+            else:
+                stamp.addNoise(galsim.PoissonNoise(rng=self._rng))
+
+            stamp /= self._getDrawGain(detector)
+
+        self._addToDetectorImage(name, stamp)
+
+    def _getPSFStamp(self, gsObject, detector, bandpassName):
+        """
+        Return a pre-rendered image of the PSF on a detector, in the pixel coordinates of that
+        detector and convolved with its pixels, sampled self.psfStampOversampling times per pixel.
+        The images are cached, keyed on the detector, the bandpass, and (if the PSF is position
+        dependent) the pupil coordinates of the object rounded onto a grid of spacing
+        self.psfStampPositionStep.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+
+        @param [in] detector is an instantiation of GalSimDetector
+
+        @param [in] bandpassName is the name of the bandpass
+
+        @param [out] image is a numpy array of the pre-rendered PSF.  Sample (j, i) is the fraction
+        of the PSF's flux falling in a pixel centered (i/oversampling - (size+1)/2,
+        j/oversampling - (size+1)/2) pixels from the center of the PSF.
+
+        @param [out] size is the (odd) number of pixels on a side of the stamps made from image
+        """
+
+        xPupil = 0.0
+        yPupil = 0.0
+        if self.PSF.position_dependent:
+            xPupil = numpy.round(gsObject.xPupilArcsec/self.psfStampPositionStep)*self.psfStampPositionStep
+            yPupil = numpy.round(gsObject.yPupilArcsec/self.psfStampPositionStep)*self.psfStampPositionStep
+
+        key = (detector.name, bandpassName, xPupil, yPupil)
+        if key in self._psfStampCache:
+            return self._psfStampCache[key]
+
+        psf = self.PSF.applyPSF(xPupil=xPupil, yPupil=yPupil, bandpass=self.bandpasses[bandpassName])
+
+        #transform the PSF into the pixel coordinates of the detector (using the WCS at the
+        #center of the detector) and convolve it with a pixel, so that sampling it at the
+        #center of a pixel gives the fraction of the flux falling in that pixel
+        nx = detector.xMaxPix - detector.xMinPix + 1
+        ny = detector.yMaxPix - detector.yMinPix + 1
+        localWcs = detector.wcs.local(image_pos=galsim.PositionD(0.5*(1+nx), 0.5*(1+ny)))
+        pixelPSF = galsim.Convolve(localWcs.toImage(psf), galsim.Pixel(scale=1.0))
+
+        size = 2*int(numpy.ceil(self._getFootprintRadius(pixelPSF))) + 1
+        oversampling = self.psfStampOversampling
+        nSamples = (size + 1)*oversampling + 1
+
+        image = pixelPSF.drawImage(nx=nSamples, ny=nSamples, scale=1.0/oversampling, method='no_pixel')
+
+        #drawImage gives the flux in each (small) sample; convert to the flux per detector pixel
+        self._psfStampCache[key] = (image.array*oversampling*oversampling, size)
+        return self._psfStampCache[key]
+
+    def _drawPSFStamp(self, gsObject, detector, bandpassName, xPix, yPix, flux):
+        """
+        Draw a point source by adding a copy of the pre-rendered PSF (see _getPSFStamp), scaled by the
+        flux of the point source and shifted to its position, to a detector image.  The shift by a
+        fraction of a pixel is done by linearly interpolating between the samples of the pre-rendered
+        PSF.  Poisson noise is then added to the copy.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+
+        @param [in] detector is an instantiation of GalSimDetector
+
+        @param [in] bandpassName is the name of the bandpass being drawn
+
+        @param [in] xPix is the x pixel coordinate of the object on the detector
+
+        @param [in] yPix is the y pixel coordinate of the object on the detector
+
+        @param [in] flux is the number of electrons the point source deposits in the bandpass
+        """
+
+        psfImage, size = self._getPSFStamp(gsObject, detector, bandpassName)
+        oversampling = self.psfStampOversampling
+        halfSize = (size - 1)//2
+
+        imagePosition = self._getImagePosition(detector, xPix, yPix)
+        xCenter = int(numpy.floor(imagePosition.x + 0.5))
+        yCenter = int(numpy.floor(imagePosition.y + 0.5))
+
+        #the samples of psfImage which fall at the centers of the pixels of the stamp
+        #lie between samples x0 + oversampling*i and x0 + oversampling*i + 1
+        xPhase = oversampling*(1.0 - (imagePosition.x - xCenter))
+        yPhase = oversampling*(1.0 - (imagePosition.y - yCenter))
+        x0 = int(numpy.floor(xPhase))
+        y0 = int(numpy.floor(yPhase))
+        xWeight = xPhase - x0
+        yWeight = yPhase - y0
+
+        xEnd = x0 + oversampling*size
+        yEnd = y0 + oversampling*size
+
+        stampArray = (1.0-yWeight)*((1.0-xWeight)*psfImage[y0:yEnd:oversampling, x0:xEnd:oversampling] +
+                                    xWeight*psfImage[y0:yEnd:oversampling, x0+1:xEnd+1:oversampling]) + \
+                     yWeight*((1.0-xWeight)*psfImage[y0+1:yEnd+1:oversampling, x0:xEnd:oversampling] +
+                              xWeight*psfImage[y0+1:yEnd+1:oversampling, x0+1:xEnd+1:oversampling])
+
+        #interpolation can not produce negative values, but the rendered PSF might
+        stampArray = numpy.maximum(stampArray*flux, 0.0)
+        stampArray = self._numpyRng.poisson(stampArray).astype(float)/self._getDrawGain(detector)
+
+        stamp = galsim.Image(stampArray, xmin=xCenter-halfSize, ymin=yCenter-halfSize)
+
+        nx = detector.xMaxPix - detector.xMinPix + 1
+        ny = detector.yMaxPix - detector.yMinPix + 1
+        bounds = stamp.bounds & galsim.BoundsI(1, nx, 1, ny)
+        if not bounds.isDefined():
+            return
+
+        self._psfStampDraws += 1
+        self._addToDetectorImage(self._getFileName(detector=detector, bandpassName=bandpassName),
+                                 stamp[bounds])
+
+    def _getPhotonWeight(self, flux, centeredObj, bandpassName, detector, nPhotonsAllowed=None,
+                         bandpassFlux=None):
+        """
+        Return the number of electrons which each photon shot for an object should carry
+        in order to respect self.maxPhotons.
+
+        Shooting photons that each carry w electrons, rather than one, increases the Poisson variance
+        of a pixel receiving I electrons from I to w*I.  The weight is therefore capped so that, in the
+        brightest pixel of the object, the extra variance (w-1)*I does not exceed
+        self.photonNoiseFraction times the variance the pixel would have if drawn with unit photons,
+        i.e. I plus the variance of the sky noise.  Weights within 1% of unity would save less than 1%
+        of the photons, so such objects are drawn with unit photons.
+
+        @param [in] flux is the number of electrons the object deposits in the bandpass
+
+        @param [in] centeredObj is the (achromatic) GalSim profile of the object, normalized to
+        unit flux (see createCenteredObject)
+
+        @param [in] bandpassName is the name of the bandpass being drawn
+
+        @param [in] detector is the GalSimDetector being drawn
+
+        @param [in] nPhotonsAllowed is the number of photons allowed (defaults to self.maxPhotons)
+
+        @param [in] bandpassFlux is the number of electrons the object deposits in bandpassName,
+        if the photons being shot are shared among several bandpasses (see _drawSharedPhotons).
+        Defaults to flux.
+
+        @param [out] the number of electrons per photon (at least 1)
+        """
+
+        if self._countElectrons:
+            #integer images count whole electrons; photons carrying fractions of an electron
+            #would be rounded up or down in the sparsely populated pixels of each object
+            return 1.0
+
+        if nPhotonsAllowed is None:
+            nPhotonsAllowed = self.maxPhotons
+
+        if bandpassFlux is None:
+            bandpassFlux = flux
+
+        if nPhotonsAllowed is None or flux is None or flux <= nPhotonsAllowed:
+            return 1.0
+
+        weight = flux/float(nPhotonsAllowed)
+
+        if self.photonNoiseFraction is not None:
+            #maxSB is an upper bound on the surface brightness of the profile, so this
+            #overestimates the flux in the brightest pixel (making the limit conservative)
+            peak = bandpassFlux*centeredObj.maxSB()*detector.photParams.platescale*detector.photParams.platescale
+
+            if peak > 0.0:
+                variance = peak
+                noiseLevel = self._getNoiseLevel(bandpassName, detector=detector)
+                if noiseLevel is not None:
+                    variance += noiseLevel*noiseLevel
+
+                weight = min(weight, 1.0 + self.photonNoiseFraction*variance/peak)
+
+        if weight < 1.01:
+            return 1.0
+
+        return weight
+
+    def _getPhotonKwargs(self, flux, photonWeight):
+        """
+        Return the keyword arguments which tell GalSim's drawImage to shoot photons
+        carrying photonWeight electrons each (see _getPhotonWeight)
+        """
+
+        if photonWeight <= 1.0 or flux is None:
+            return {}
+
+        self._weightedPhotonDraws += 1
+
+        #The total flux of the object is not allowed to vary.  Its Poisson fluctuation
+        #(which is much smaller than the noise added by the weighted photons) is lost.
+        return {'n_photons':int(numpy.ceil(flux/photonWeight)), 'poisson_flux':False}
+
+    def _chooseDrawMethod(self, flux, stampSize):
+        """
+        Choose whether to draw an object by photon shooting ('phot') or with an FFT ('fft').
+
+        If self.drawMethod is 'auto', bright objects (more than self.fftFluxThreshold electrons,
+        and more than self.fftPhotonsPerPixel electrons per pixel of the postage stamp) are drawn
+        with an FFT, unless their postage stamps are larger than self.fftMaxStampSize pixels on a side.
+        All other objects are photon shot.
+
+        @param [in] flux is the number of electrons the object deposits in the bandpass
+        (None if unknown)
+
+        @param [in] stampSize is the number of pixels on a side of the postage stamp
+
+        @param [out] the name of the method ('phot' or 'fft')
+        """
+
+        if self.drawMethod != 'auto':
+            return self.drawMethod
+
+        if flux is None or stampSize > self.fftMaxStampSize:
+            return 'phot'
+
+        if flux >= self.fftFluxThreshold and flux >= self.fftPhotonsPerPixel*stampSize*stampSize:
+            return 'fft'
+
+        return 'phot'
+
+    def _drawImage(self, obj, bandpassName, method='phot', **kwargs):
+        """
+        Draw a GalSim object.
+
+        @param [in] obj is the GalSim object to be drawn.  If it is chromatic (i.e. a profile
+        multiplied by a galsim.SED), GalSim will integrate it over the bandpass.  If it is
+        achromatic, it must already have been given its flux in the bandpass
+        (see _drawObjectOnDetectors).
+
+        @param [in] bandpassName is the name of the bandpass being drawn
+
+        @param [in] method is either 'phot' (photon shooting) or 'fft'
+
+        **kwargs are passed on to GalSim's drawImage method
+
+        @param [out] the drawn image
+        """
+
+        if method == 'phot':
+            kwargs['rng'] = self._rng
+
+        if isinstance(obj, galsim.ChromaticObject):
+            return obj.drawImage(bandpass=self.bandpasses[bandpassName], method=method, **kwargs)
+
+        return obj.drawImage(method=method, **kwargs)
+
+    def drawObject(self, gsObject):
+        """
+        Draw an astronomical object on all of the relevant FITS files.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject
+        class carrying all of the information for the object whose image
+        is to be drawn
+
+        @param [out] outputString is a string denoting which detectors the astronomical
+        object illumines, suitable for output in the GalSim InstanceCatalog
+        """
+
+        gsObject = self._demoteUnresolvedGalaxy(gsObject)
+
+        #find the detectors which the astronomical object illumines
+        outputString, \
+        detectorList, \
+        centeredObjDict, \
+        footprintDict = self._findAllDetectors(gsObject)
+
+        self._drawObjectOnDetectors(gsObject, detectorList, centeredObjDict, footprintDict)
+
+        if self.faintBackground:
+            faintDetector = self._addToFaintBackground(gsObject)
+            if faintDetector is not None and faintDetector not in detectorList:
+                detectorList = detectorList + [faintDetector]
+                outputString = '//'.join([dd.name for dd in detectorList])
+
+        return outputString
+
+    def drawObjectList(self, gsObjectList):
+        """
+        Draw a list of astronomical objects on all of the relevant FITS files.
+
+        This has the same effect as calling drawObject on each object in turn, except that
+        the detectors illumined by all of the objects are found in one vectorized pass
+        (see findAllDetectorsBatch) before any of the objects are drawn, and the pixel
+        positions of all of the objects on each detector are found in one call per detector.
+        The fluxes, culling (see _getVisibleBandpasses), and footprints of the objects are
+        evaluated on the columns of a GalSimObjectBatch, and objects are only built one at a
+        time if they are to be drawn.
+
+        @param [in] gsObjectList is a list of instantiations of the GalSimCelestialObject
+        class carrying all of the information for the objects whose images are to be drawn,
+        or a GalSimObjectBatch (a list is converted into one)
+
+        @param [out] outputList is a list of strings denoting which detectors each astronomical
+        object illumines, suitable for output in the GalSim InstanceCatalog
+        """
+
+        #calculate the band fluxes of each object in the chunk only once (see _getBandFlux)
+        self._chunkBandFluxes = {}
+        try:
+            return self._drawObjectList(gsObjectList)
+        finally:
+            self._chunkBandFluxes = None
+
+    def _drawObjectList(self, gsObjectList):
+        """
+        Do the work of drawObjectList.
+
+        @param [in] gsObjectList is as in drawObjectList
+
+        @param [out] outputList is as in drawObjectList
+        """
+
+        if self.exactFootprint:
+            #the exact footprint cannot be evaluated in a batch
+            return [self.drawObject(gsObject) for gsObject in gsObjectList]
+
+        if not isinstance(gsObjectList, GalSimObjectBatch):
+            gsObjectList = GalSimObjectBatch([gsObject.galSimType for gsObject in gsObjectList],
+                                             [gsObject.sed for gsObject in gsObjectList],
+                                             [gsObject.raRadians for gsObject in gsObjectList],
+                                             [gsObject.decRadians for gsObject in gsObjectList],
+                                             [gsObject.xPupilRadians for gsObject in gsObjectList],
+                                             [gsObject.yPupilRadians for gsObject in gsObjectList],
+                                             [gsObject.halfLightRadiusRadians for gsObject in gsObjectList],
+                                             [gsObject.minorAxisRadians for gsObject in gsObjectList],
+                                             [gsObject.majorAxisRadians for gsObject in gsObjectList],
+                                             [gsObject.positionAngleRadians for gsObject in gsObjectList],
+                                             [gsObject.sindex for gsObject in gsObjectList])
+
+        if len(gsObjectList) == 0:
+            return []
+
+        #the fluxes, culling, and footprints are all evaluated on the columns of the batch;
+        #objects are only built one at a time if they are actually drawn
+        batch = self._demoteUnresolvedGalaxies(gsObjectList)
+        bandpassNameList = list(self.bandpasses.keys())
+
+        #integrating every Sed over every bandpass is only worthwhile if the fluxes are
+        #needed before the objects are drawn
+        if self._needsBandFluxArray(bandpassNameList):
+            fluxes = self._getBandFluxArray(batch, bandpassNameList)
+        else:
+            fluxes = None
+
+        visible = self._getVisibleBandpassArray(batch, fluxes, bandpassNameList)
+        footprints = self._getFootprintArray(batch, fluxes, visible, bandpassNameList)
+
+        #if the PSF is wavelength dependent, the union of the footprints in all of the
+        #bandpasses is just the largest of them (they all have the same center)
+        radius = footprints.max(axis=1)
+
+        membership = self.findAllDetectorsBatch(batch.xPupilArcsec, batch.yPupilArcsec, radius)
+        drawnIndices = numpy.where(membership.any(axis=1))[0]
+        drawnMembership = membership[drawnIndices]
+
+        #find the pixel positions of all of the objects illumining each detector at once
+        pixelPositionsList = [{} for ix in drawnIndices]
+        for jx, detector in enumerate(self.detectors):
+            members = numpy.where(drawnMembership[:,jx])[0]
+            if len(members) == 0:
+                continue
+
+            xPix, yPix = detector.pixelCoordinatesFromPupilCoordinates(batch.xPupilRadians[drawnIndices[members]],
+                                                                       batch.yPupilRadians[drawnIndices[members]])
+
+            for ix, xx, yy in zip(members, xPix, yPix):
+                pixelPositionsList[ix][detector.name] = (xx, yy)
+
+        drawnObjectList = list(batch[drawnIndices])
+        centeredObjDictList = [self._createCenteredObjectDict(gsObject) for gsObject in drawnObjectList]
+        footprintDictList = [dict([(bandpassName, footprints[ix][jx])
+                                   for jx, bandpassName in enumerate(bandpassNameList) if visible[ix][jx]])
+                             for ix in drawnIndices]
+
+        if self._canBatchPointSources():
+            batchedIndices = self._drawPointSourceBatch(drawnObjectList, centeredObjDictList, footprintDictList,
+                                                        drawnMembership, pixelPositionsList)
+        else:
+            batchedIndices = set()
+
+        detectorLists = [[] for ix in range(len(batch))]
+        for ix, (gsObject, centeredObjDict, footprintDict, isMember, pixelPositions) in \
+            enumerate(zip(drawnObjectList, centeredObjDictList, footprintDictList, drawnMembership, pixelPositionsList)):
+
+            detectorList = [self.detectors[jx] for jx in numpy.where(isMember)[0]]
+            detectorLists[drawnIndices[ix]] = detectorList
+
+            if ix not in batchedIndices:
+                self._drawObjectOnDetectors(gsObject, detectorList, centeredObjDict, footprintDict,
+                                            pixelPositions=pixelPositions)
+
+        if self.faintBackground:
+            #only the objects which are too faint to be drawn in some bandpass need to be built
+            for ix in numpy.where((~visible).any(axis=1))[0]:
+                faintDetector = self._addToFaintBackground(batch[ix])
+                if faintDetector is not None and faintDetector not in detectorLists[ix]:
+                    detectorLists[ix] = detectorLists[ix] + [faintDetector]
+
+        outputList = []
+        for detectorList in detectorLists:
+            if len(detectorList) == 0:
+                outputList.append(None)
+            else:
+                outputList.append('//'.join([dd.name for dd in detectorList]))
+
+        return outputList
+
+    def _needsBandFluxArray(self, bandpassNameList):
+        """
+        Return True if drawObjectList needs the fluxes of the objects in a batch before it draws
+        them, i.e. to cull them (see snrFloor in __init__) or to scale their footprints to the
+        sky noise (see skyLimitedFootprint in __init__).  Both only apply if noise is being added
+        to the images.
+
+        @param [in] bandpassNameList is a list of the names of the bandpasses
+        """
+
+        if self.snrFloor is None and not self.skyLimitedFootprint:
+            return False
+
+        return any([self._getNoiseLevel(bandpassName) is not None for bandpassName in bandpassNameList])
+
+    def _getBandFluxArray(self, batch, bandpassNameList):
+        """
+        Find the number of electrons each object in a batch deposits in each bandpass (see _getBandFlux)
+
+        @param [in] batch is an instantiation of the GalSimObjectBatch class
+
+        @param [in] bandpassNameList is a list of the names of the bandpasses
+
+        @param [out] a numpy array of shape (len(batch), len(bandpassNameList)).  Objects
+        without an Sed have zero flux.
+        """
+
+        fluxes = numpy.zeros((len(batch), len(bandpassNameList)))
+        for ix, sed in enumerate(batch.sedList):
+            if sed is None:
+                continue
+
+            for jx, bandpassName in enumerate(bandpassNameList):
+                fluxes[ix][jx] = self._getSedBandFlux(sed, bandpassName)
+
+        return fluxes
+
+    def _getVisibleBandpassArray(self, batch, fluxes, bandpassNameList):
+        """
+        Find the bandpasses in which each of a set of objects is bright enough to be drawn
+        (see _getVisibleBandpasses).  The numbers of culled objects and bandpasses are recorded
+        (see getStatistics).
+
+        @param [in] batch is an instantiation of the GalSimObjectBatch class
+
+        @param [in] fluxes is a numpy array of the fluxes of the objects (see _getBandFluxArray),
+        or None if they were not needed (see _needsBandFluxArray)
+
+        @param [in] bandpassNameList is a list of the names of the bandpasses
+
+        @param [out] a numpy array of booleans of shape (len(batch), len(bandpassNameList)),
+        which is True where the object is to be drawn in the bandpass
+        """
+
+        visible = numpy.ones((len(batch), len(bandpassNameList)), dtype=bool)
+        if self.snrFloor is None or fluxes is None:
+            return visible
+
+        #objects without an Sed are never culled (see _getFaintBandpasses)
+        hasSed = numpy.array([sed is not None for sed in batch.sedList], dtype=bool)
+
+        for jx, bandpassName in enumerate(bandpassNameList):
+            snr = self._signalToNoiseFromFlux(fluxes[:,jx], bandpassName)
+            if snr is not None:
+                visible[:,jx] = (snr >= self.snrFloor) | ~hasSed
+
+        self._culledBandpasses += int((~visible).sum())
+        self._culledObjects += int((~visible.any(axis=1)).sum())
+
+        return visible
+
+    def _getFootprintArray(self, batch, fluxes, visible, bandpassNameList):
+        """
+        Find the radius of the footprint of each object in a batch in each bandpass in which
+        it is to be drawn (see _createCenteredObjects).
+
+        @param [in] batch is an instantiation of the GalSimObjectBatch class
+
+        @param [in] fluxes is a numpy array of the fluxes of the objects (see _getBandFluxArray),
+        or None if they were not needed (see _needsBandFluxArray)
+
+        @param [in] visible is a numpy array of booleans indicating the bandpasses in which each
+        object is to be drawn (see _getVisibleBandpassArray)
+
+        @param [in] bandpassNameList is a list of the names of the bandpasses
+
+        @param [out] a numpy array of the same shape as visible containing the radii in arcseconds.
+        The radius is zero wherever the object is not to be drawn, and for objects which
+        GalSimInterpreter does not know how to draw.
+        """
+
+        footprints = numpy.zeros(visible.shape)
+
+        canDraw = (batch.galSimType == 'sersic') | (batch.galSimType == 'pointSource')
+        candidates = numpy.where(canDraw & visible.any(axis=1))[0]
+        if len(candidates) == 0:
+            return footprints
+
+        hasSed = numpy.array([sed is not None for sed in batch.sedList], dtype=bool)
+
+        #if this is not None, the footprint is only evaluated in this bandpass
+        footprintBandpassName = self._getFootprintBandpass()
+
+        unscaledRadius = {}
+        for jx, bandpassName in enumerate(bandpassNameList):
+            drawn = candidates[visible[candidates,jx]]
+            if len(drawn) == 0:
+                continue
+
+            evaluationBandpassName = bandpassName if footprintBandpassName is None else footprintBandpassName
+            if evaluationBandpassName not in unscaledRadius:
+                unscaledRadius[evaluationBandpassName] = self._getUnscaledFootprintArray(batch, evaluationBandpassName,
+                                                                                         candidates)
+
+            footprints[drawn,jx] = unscaledRadius[evaluationBandpassName][drawn]
+
+            #the object's flux is only needed if the footprint is limited by the sky noise
+            if fluxes is not None and self.skyLimitedFootprint and self._getNoiseLevel(bandpassName) is not None:
+                scaled = drawn[hasSed[drawn]]
+                footprints[scaled,jx] = self._scaleFootprintsToSky(bandpassName, footprints[scaled,jx],
+                                                                   fluxes[scaled,jx], batch.galSimType[scaled],
+                                                                   batch.halfLightRadiusArcsec[scaled],
+                                                                   batch.sindex[scaled],
+                                                                   batch.minorAxisRadians[scaled],
+                                                                   batch.majorAxisRadians[scaled])
+
+        return footprints
+
+    def _getUnscaledFootprintArray(self, batch, bandpassName, candidates):
+        """
+        Find the radii of the footprints of some of the objects in a batch at GalSim's default
+        folding_threshold (see _getUnscaledFootprint).  The footprint cache is consulted once
+        for each distinct key, and an object is only built when its key is missing.
+
+        @param [in] batch is an instantiation of the GalSimObjectBatch class
+
+        @param [in] bandpassName is the name of the bandpass in which to evaluate the footprints
+
+        @param [in] candidates is a numpy array of the indices of the objects whose footprints are desired
+
+        @param [out] a numpy array of length len(batch) containing the radii in arcseconds
+        (zero for objects not in candidates)
+        """
+
+        radius = numpy.zeros(len(batch))
+
+        keys = self._footprintCacheKeys(batch.galSimType[candidates], batch.halfLightRadiusArcsec[candidates],
+                                        batch.sindex[candidates], batch.minorAxisRadians[candidates],
+                                        batch.majorAxisRadians[candidates], bandpassName)
+
+        if keys is None:
+            #the footprint depends on where the object is, so each object must be built
+            for ix in candidates:
+                radius[ix] = self._getFootprintRadius(self.createCenteredObject(batch[ix], bandpassName=bandpassName))
+
+            return radius
+
+        uncached = []
+        keyMembers = OrderedDict()
+        for ix, key in zip(candidates.tolist(), keys):
+            if key is None:
+                uncached.append(ix)
+                continue
+
+            if key not in keyMembers:
+                keyMembers[key] = []
+            keyMembers[key].append(ix)
+
+        for key in keyMembers:
+            members = keyMembers[key]
+            value = self._footprintCache.get(key, count=len(members))
+            if value is None:
+                value = self._getFootprintRadius(self.createCenteredObject(batch[members[0]],
+                                                                           bandpassName=bandpassName))
+                self._footprintCache.set(key, value)
+
+            radius[members] = value
+
+        #objects sharing a key can differ in size by a factor of exp(footprintCacheTolerance);
+        #pad the radius so that the footprint remains conservative (see _getUnscaledFootprint)
+        radius *= numpy.exp(self.footprintCacheTolerance)
+
+        for ix in uncached:
+            radius[ix] = self._getFootprintRadius(self.createCenteredObject(batch[ix], bandpassName=bandpassName))
+
+        return radius
+
+    def _canBatchPointSources(self):
+        """
+        Return True if point sources can be drawn by _drawPointSourceBatch, i.e. if
+        self.batchPointSources or self.analyticPointSources is True, objects are being drawn
+        by the achromatic fast path (self.achromaticFastPath), and every point source
+        has the same (achromatic) PSF
+        """
+
+        return (self.batchPointSources or self.analyticPointSources) and self.achromaticFastPath and \
+               self.PSF is not None and not self.PSF.wavelength_dependent and not self.PSF.position_dependent
+
+    def _getGaussianComponents(self):
+        """
+        Return the (weight, sigma) tuples of the circular Gaussians making up the PSF if point sources
+        are to be drawn analytically (see analyticPointSources in __init__), or None otherwise
+        """
+
+        if not self.analyticPointSources or not self._canBatchPointSources():
+            return None
+
+        return self.PSF.getGaussianComponents()
+
+    def _drawPointSourceBatch(self, gsObjectList, centeredObjDictList, footprintDictList,
+                              membership, pixelPositionsList):
+        """
+        Draw all of the point sources in a list of objects at once.  In each bandpass, the
+        photons of all of the point sources are shot from the PSF in calls to GalSim of at most
+        self.pointSourcePhotonBatchSize photons, assigned to the point sources in proportion to
+        their fluxes, offset to the pixel positions of the point sources, and binned into the
+        detector images with numpy.
+        The offsets are converted from arcseconds to pixels with the WCS of each detector
+        at its center.
+
+        Point sources which would be drawn with an FFT (see _chooseDrawMethod) are not drawn here.
+
+        If the PSF is a sum of circular Gaussians and self.analyticPointSources is True, no photons
+        are shot; the point sources are instead drawn by _drawGaussianPointSources (which draws
+        bright point sources as well).
+
+        @param [in] gsObjectList is a list of objects (see drawObjectList)
+
+        @param [in] centeredObjDictList is a list of the centeredObjDicts of the objects
+        (see _createCenteredObjects)
+
+        @param [in] footprintDictList is a list of the footprintDicts of the objects
+
+        @param [in] membership is the array returned by findAllDetectorsBatch for the objects
+
+        @param [in] pixelPositionsList is a list of dicts of the objects' (xPix, yPix) pixel positions
+        keyed on the names of the detectors they illumine
+
+        @param [out] a set of the indices (in gsObjectList) of the objects which were drawn
+        """
+
+        gaussianComponents = self._getGaussianComponents()
+
+        batchedIndices = []
+        for ix, gsObject in enumerate(gsObjectList):
+            if gsObject.galSimType != 'pointSource' or gsObject.sed is None or \
+               len(footprintDictList[ix]) == 0 or not membership[ix].any():
+                continue
+
+            detectorList = [self.detectors[jx] for jx in numpy.where(membership[ix])[0]]
+            if gaussianComponents is None and self._wantsFFT(gsObject, detectorList, footprintDictList[ix]):
+                continue
+
+            batchedIndices.append(ix)
+
+            for detector in detectorList:
+                for bandpassName in self.bandpasses:
+                    name = self._getFileName(detector=detector, bandpassName=bandpassName)
+                    if name not in self.detectorImages:
+                        self.detectorImages[name] = self._initializeDetectorImage(detector, bandpassName)
+
+        if len(batchedIndices) == 0:
+            return set()
+
+        batchedIndices = numpy.array(batchedIndices)
+
+        if gaussianComponents is None:
+            self._batchedPointSources += len(batchedIndices)
+        else:
+            self._analyticPointSources += len(batchedIndices)
+
+        bandpassNameList = list(self.bandpasses.keys())
+        fluxes = numpy.zeros((len(batchedIndices), len(bandpassNameList)))
+        for ii, ix in enumerate(batchedIndices):
+            for jj, bandpassName in enumerate(bandpassNameList):
+                if bandpassName in footprintDictList[ix]:
+                    fluxes[ii][jj] = max(self._getBandFlux(gsObjectList[ix], bandpassName), 0.0)
+
+        if gaussianComponents is not None:
+            for jj, bandpassName in enumerate(bandpassNameList):
+                footprints = numpy.array([footprintDictList[ix].get(bandpassName, 0.0) for ix in batchedIndices])
+                self._drawGaussianPointSources(gaussianComponents, bandpassName, fluxes[:,jj], footprints,
+                                               membership[batchedIndices],
+                                               [pixelPositionsList[ix] for ix in batchedIndices])
+
+            return set(batchedIndices.tolist())
+
+        psf = self.PSF.applyPSF(xPupil=0.0, yPupil=0.0)
+
+        #the positions of the point sources in the coordinate system of each image
+        #(see _getImagePosition) and the WCS of each detector at its center
+        detectorGeometry = {}
+        for jx, detector in enumerate(self.detectors):
+            onDetector = numpy.where(membership[batchedIndices, jx])[0]
+            if len(onDetector) == 0:
+                continue
+
+            isOnDetector = numpy.zeros(len(batchedIndices), dtype=bool)
+            isOnDetector[onDetector] = True
+
+            xCenter = numpy.zeros(len(batchedIndices))
+            yCenter = numpy.zeros(len(batchedIndices))
+            for ii in onDetector:
+                xPix, yPix = pixelPositionsList[batchedIndices[ii]][detector.name]
+                imagePosition = self._getImagePosition(detector, xPix, yPix)
+                xCenter[ii] = imagePosition.x
+                yCenter[ii] = imagePosition.y
+
+            nx = detector.xMaxPix - detector.xMinPix + 1
+            ny = detector.yMaxPix - detector.yMinPix + 1
+            jacobian = detector.wcs.jacobian(image_pos=galsim.PositionD(0.5*(1+nx), 0.5*(1+ny)))
+
+            detectorGeometry[jx] = (isOnDetector, xCenter, yCenter, numpy.linalg.inv(jacobian.getMatrix()))
+
+        for jj, bandpassName in enumerate(bandpassNameList):
+            photonWeights = numpy.ones(len(batchedIndices))
+            if self.maxPhotons is not None:
+                for ii, ix in enumerate(batchedIndices):
+                    detector = self.detectors[numpy.where(membership[ix])[0][0]]
+                    photonWeights[ii] = self._getPhotonWeight(fluxes[ii][jj], centeredObjDictList[ix][bandpassName],
+                                                              bandpassName, detector)
+
+            #each photon carries one electron unless the photon budget requires otherwise
+            weighted = photonWeights > 1.0
+            nPhotons = self._numpyRng.poisson(fluxes[:,jj])
+            nPhotons[weighted] = numpy.ceil(fluxes[:,jj][weighted]/photonWeights[weighted]).astype(int)
+            self._weightedPhotonDraws += weighted.sum()
+
+            totalPhotons = int(nPhotons.sum())
+            if totalPhotons == 0:
+                continue
+
+            self._drawCounts['phot'] += 1
+
+            #the photons are numbered consecutively by point source; photon k belongs to the
+            #first point source whose cumulative number of photons exceeds k
+            cumulativePhotons = numpy.cumsum(nPhotons)
+
+            for firstPhoton in range(0, totalPhotons, self.pointSourcePhotonBatchSize):
+                lastPhoton = min(firstPhoton + self.pointSourcePhotonBatchSize, totalPhotons)
+                nShot = lastPhoton - firstPhoton
+
+                photons = psf.withFlux(float(nShot)).shoot(int(nShot), self._rng)
+
+                #GalSim does not shoot the photons of compound profiles in a random order,
+                #so assign them to the point sources in a random order
+                order = self._numpyRng.permutation(nShot)
+                xPhotons = numpy.array(photons.getXArray())[order]
+                yPhotons = numpy.array(photons.getYArray())[order]
+                owner = numpy.searchsorted(cumulativePhotons, numpy.arange(firstPhoton, lastPhoton), side='right')
+
+                for jx in detectorGeometry:
+                    detector = self.detectors[jx]
+                    isOnDetector, xCenter, yCenter, inverseJacobian = detectorGeometry[jx]
+
+                    inPhotons = numpy.where(isOnDetector[owner])[0]
+                    if len(inPhotons) == 0:
+                        continue
+
+                    inOwner = owner[inPhotons]
+                    xImage = xCenter[inOwner] + inverseJacobian[0][0]*xPhotons[inPhotons] \
+                             + inverseJacobian[0][1]*yPhotons[inPhotons]
+                    yImage = yCenter[inOwner] + inverseJacobian[1][0]*xPhotons[inPhotons] \
+                             + inverseJacobian[1][1]*yPhotons[inPhotons]
+
+                    name = self._getFileName(detector=detector, bandpassName=bandpassName)
+                    self._binPhotons(self.detectorImages[name], xImage, yImage,
+                                     photonWeights[inOwner]/self._getDrawGain(detector))
+
+        return set(batchedIndices.tolist())
+
+    def _drawGaussianPointSources(self, gaussianComponents, bandpassName, fluxes, footprints,
+                                  membership, pixelPositionsList):
+        """
+        Draw point sources whose PSF is a sum of circular Gaussians by evaluating the integral of
+        the PSF over each pixel in closed form.  The integral of a circular Gaussian over a pixel
+        is the product of differences of error functions along x and y, so the expected counts
+        in the stamps of many point sources can be found with a few vectorized numpy operations.
+        Poisson noise is added to the expected counts of each stamp, and the stamps are added to
+        the detector image pixel by pixel, so that only the pixels they cover are touched.  Since
+        the sum of Poisson deviates is itself a Poisson deviate, overlapping stamps receive the
+        same noise as if their expected counts had been summed first.
+
+        The PSF is mapped onto each detector with the pixel scale of its WCS at its center
+        (the square root of the determinant of the jacobian).  This is exact for WCSs which
+        only rotate and scale the sky, since circular Gaussians are unchanged by rotations.
+
+        @param [in] gaussianComponents is a list of the (weight, sigma) tuples of the Gaussians
+        making up the PSF (see PSFbase.getGaussianComponents)
+
+        @param [in] bandpassName is the name of the bandpass being drawn
+
+        @param [in] fluxes is a numpy array of the number of electrons each point source deposits
+        in the bandpass
+
+        @param [in] footprints is a numpy array of the radii in arcseconds within which the point
+        sources are drawn (see _getFootprint)
+
+        @param [in] membership is a 2-D boolean numpy array indicating which detectors
+        each point source illumines (see findAllDetectorsBatch)
+
+        @param [in] pixelPositionsList is a list of dicts of the point sources' (xPix, yPix) pixel
+        positions keyed on the names of the detectors they illumine
+        """
+
+        for jx, detector in enumerate(self.detectors):
+            onDetector = numpy.where(numpy.logical_and(membership[:,jx], fluxes > 0.0))[0]
+            if len(onDetector) == 0:
+                continue
+
+            nx = detector.xMaxPix - detector.xMinPix + 1
+            ny = detector.yMaxPix - detector.yMinPix + 1
+
+            jacobian = detector.wcs.jacobian(image_pos=galsim.PositionD(0.5*(1+nx), 0.5*(1+ny)))
+            pixelScale = numpy.sqrt(numpy.abs(numpy.linalg.det(jacobian.getMatrix())))
+
+            #the positions of the point sources in the coordinate system of the image
+            xCenter = numpy.zeros(len(onDetector))
+            yCenter = numpy.zeros(len(onDetector))
+            for ii, ix in enumerate(onDetector):
+                xPix, yPix = pixelPositionsList[ix][detector.name]
+                imagePosition = self._getImagePosition(detector, xPix, yPix)
+                xCenter[ii] = imagePosition.x
+                yCenter[ii] = imagePosition.y
+
+            xNearest = numpy.floor(xCenter + 0.5).astype(int)
+            yNearest = numpy.floor(yCenter + 0.5).astype(int)
+
+            #the half width of the stamp of each point source in pixels; point sources whose
+            #stamps are the same size are drawn together
+            halfSizes = numpy.ceil(footprints[onDetector]/pixelScale).astype(int)
+
+            name = self._getFileName(detector=detector, bandpassName=bandpassName)
+            image = self.detectorImages[name]
+            gain = self._getDrawGain(detector)
+
+            for halfSize in numpy.unique(halfSizes):
+                group = numpy.where(halfSizes == halfSize)[0]
+                offsets = numpy.arange(-halfSize, halfSize+1)
+
+                #the edges of the pixels of the stamps relative to the point sources
+                xEdges = (xNearest[group] - xCenter[group])[:,None] + numpy.arange(-halfSize, halfSize+2)[None,:] - 0.5
+                yEdges = (yNearest[group] - yCenter[group])[:,None] + numpy.arange(-halfSize, halfSize+2)[None,:] - 0.5
+
+                stamps = numpy.zeros((len(group), len(offsets), len(offsets)))
+                for weight, sigma in gaussianComponents:
+                    norm = 1.0/(numpy.sqrt(2.0)*sigma/pixelScale)
+                    xIntegral = 0.5*numpy.diff(_erf(xEdges*norm), axis=1)
+                    yIntegral = 0.5*numpy.diff(_erf(yEdges*norm), axis=1)
+                    stamps += weight*yIntegral[:,:,None]*xIntegral[:,None,:]
+
+                stamps *= fluxes[onDetector[group]][:,None,None]
+
+                #the (zero-indexed) rows and columns of the image covered by the stamps
+                rows = (yNearest[group] - 1)[:,None,None] + offsets[None,:,None] + numpy.zeros(stamps.shape, dtype=int)
+                columns = (xNearest[group] - 1)[:,None,None] + offsets[None,None,:] + numpy.zeros(stamps.shape, dtype=int)
+
+                onImage = numpy.logical_and(numpy.logical_and(rows >= 0, rows < ny),
+                                            numpy.logical_and(columns >= 0, columns < nx))
+
+                counts = self._numpyRng.poisson(stamps[onImage])/gain
+                numpy.add.at(image.array, (rows[onImage], columns[onImage]), counts.astype(image.array.dtype))
+
+    def _addToFaintBackground(self, gsObject):
+        """
+        Add the flux of an object in the bandpasses in which it is too faint to be drawn
+        (see _getFaintBandpasses) to the coarse grid of the detector on which its center falls.
+        The grids are added to the detector images by _applyFaintBackground.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+
+        @param [out] the GalSimDetector to whose grid the flux was added (None if the object
+        is not faint in any bandpass or does not fall on any detector)
+        """
+
+        faintBandpassNames = self._getFaintBandpasses(gsObject)
+        if len(faintBandpassNames) == 0:
+            return None
+
+        detectorList = self._detectorIndex.findDetectors(gsObject.xPupilArcsec, gsObject.xPupilArcsec,
+                                                         gsObject.yPupilArcsec, gsObject.yPupilArcsec)
+        if len(detectorList) == 0:
+            return None
+
+        detector = detectorList[0]
+        xPix, yPix = detector.pixelCoordinatesFromPupilCoordinates(gsObject.xPupilRadians,
+                                                                   gsObject.yPupilRadians)
+        imagePosition = self._getImagePosition(detector, xPix[0], yPix[0])
+
+        nx = detector.xMaxPix - detector.xMinPix + 1
+        ny = detector.yMaxPix - detector.yMinPix + 1
+        nxCell = int(numpy.ceil(float(nx)/self.faintBackgroundCellSize))
+        nyCell = int(numpy.ceil(float(ny)/self.faintBackgroundCellSize))
+
+        #pixel i of the image is centered on x = i (counting from 1)
+        xCell = min(max(int(numpy.floor(imagePosition.x - 0.5)), 0), nx-1)//self.faintBackgroundCellSize
+        yCell = min(max(int(numpy.floor(imagePosition.y - 0.5)), 0), ny-1)//self.faintBackgroundCellSize
+
+        for bandpassName in faintBandpassNames:
+            flux = self._getBandFlux(gsObject, bandpassName)
+            if flux <= 0.0:
+                continue
+
+            name = self._getFileName(detector=detector, bandpassName=bandpassName)
+
+            #the detector image is initialized now (rather than when the grid is applied)
+            #so that the detector appears in the object's fitsFiles entry
+            if name not in self.detectorImages:
+                self.detectorImages[name] = self._initializeDetectorImage(detector, bandpassName)
+
+            if name not in self._faintBackgroundGrids:
+                self._faintBackgroundGrids[name] = (detector, numpy.zeros((nyCell, nxCell)))
+
+            self._faintBackgroundGrids[name][1][yCell][xCell] += flux
+            self._aggregatedBandpasses += 1
+
+        return detector
+
+    def _interpolateGrid(self, nPix, nCell):
+        """
+        Find the weights with which to linearly interpolate the cells of a faint background grid
+        onto the pixels of an image along one axis
+
+        @param [in] nPix is the number of pixels along the axis
+
+        @param [in] nCell is the number of cells along the axis
+
+        @param [out] low, high, and weight are numpy arrays such that the value at each pixel
+        is (1-weight)*grid[low] + weight*grid[high]
+        """
+
+        #the position of the center of each pixel in units of cells, measured from the
+        #center of the first cell; values beyond the outermost cell centers are held constant
+        position = numpy.clip((numpy.arange(nPix) + 0.5)/self.faintBackgroundCellSize - 0.5, 0.0, nCell-1)
+        low = numpy.floor(position).astype(int)
+        high = numpy.minimum(low + 1, nCell - 1)
+
+        return low, high, position - low
+
+    def _applyFaintBackground(self):
+        """
+        Interpolate the faint background grids (see _addToFaintBackground) onto the
+        detector images.  The interpolated surface brightness is normalized so that each
+        image receives the total flux in its grid, and Poisson noise is added to it.
+        The grids are emptied, so that calling this method again adds nothing.
+        """
+
+        for name in self._faintBackgroundGrids:
+            detector, grid = self._faintBackgroundGrids[name]
+            image = self.detectorImages[name]
+            ny, nx = image.array.shape
+
+            xLow, xHigh, xWeight = self._interpolateGrid(nx, grid.shape[1])
+            yLow, yHigh, yWeight = self._interpolateGrid(ny, grid.shape[0])
+
+            rows = grid[:, xLow]*(1.0 - xWeight) + grid[:, xHigh]*xWeight
+            background = rows[yLow, :]*(1.0 - yWeight)[:, None] + rows[yHigh, :]*yWeight[:, None]
+
+            total = background.sum()
+            if total <= 0.0:
+                continue
+
+            background = self._numpyRng.poisson(background*(grid.sum()/total))
+
+            if self._countElectrons:
+                image.array[:,:] += background.astype(self.pixelDtype)
+            else:
+                image.array[:,:] += (background/detector.photParams.gain).astype(image.array.dtype)
+
+        self._faintBackgroundGrids = {}
+
+    def _getPixelPositions(self, gsObject, detectorList):
+        """
+        Find the pixel position of an object on each of a list of detectors.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+
+        @param [in] detectorList is a list of GalSimDetectors
+
+        @param [out] pixelPositions is a dict of (xPix, yPix) tuples keyed on
+        the names of the detectors
+        """
+
+        pixelPositions = {}
+        for detector in detectorList:
+            xPix, yPix = detector.pixelCoordinatesFromPupilCoordinates(gsObject.xPupilRadians,
+                                                                       gsObject.yPupilRadians)
+            pixelPositions[detector.name] = (xPix[0], yPix[0])
+
+        return pixelPositions
+
+    def _drawObjectOnDetectors(self, gsObject, detectorList, centeredObjDict, footprintDict,
+                               pixelPositions=None):
+        """
+        Draw an astronomical object on the FITS files of a list of detectors.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject
+        class carrying all of the information for the object whose image
+        is to be drawn
+
+        @param [in] detectorList is a list of the GalSimDetectors illumined by the object
+
+        @param [in] centeredObjDict is a dict of GalSim Objects centered on the chip, keyed
+        on the names of the bandpasses (see findAllDetectors)
+
+        @param [in] footprintDict is a dict of footprint radii in arcseconds, keyed on the
+        names of the bandpasses (see _findAllDetectors)
+
+        @param [in] pixelPositions is a dict of the object's (xPix, yPix) pixel positions keyed on
+        the names of the detectors in detectorList (see _getPixelPositions).  If None, they will be
+        calculated here.  Either way, they are only calculated once for all of the bandpasses.
+        """
+
+        if gsObject.sed is None or len(detectorList) == 0:
+            #there is nothing to draw
+            return
+
+        if pixelPositions is None:
+            pixelPositions = self._getPixelPositions(gsObject, detectorList)
+
+        #go through the list of detector/bandpass combinations and initialize
+        #all of the FITS files we will need (if they have not already been initialized)
+        for detector in detectorList:
+            for bandpassName in self.bandpasses:
+                name = self._getFileName(detector=detector, bandpassName=bandpassName)
+                if name not in self.detectorImages:
+                    self.detectorImages[name] = self._initializeDetectorImage(detector, bandpassName)
+
+        #if the PSF does not depend on wavelength, the image of the object in each bandpass
+        #is just its achromatic profile scaled by its flux in that bandpass, so there is no
+        #need to have GalSim integrate over wavelength
+        achromatic = self.achromaticFastPath and (self.PSF is None or not self.PSF.wavelength_dependent)
+
+        #the object is only drawn in the bandpasses in which it is bright enough to be seen
+        #(see _getVisibleBandpasses)
+        bandpassNameList = [bandpassName for bandpassName in self.bandpasses if bandpassName in footprintDict]
+
+        if achromatic and self.sharedPhotons and not self._wantsFFT(gsObject, detectorList, footprintDict):
+            self._drawSharedPhotons(gsObject, centeredObjDict, detectorList, pixelPositions,
+                                    bandpassNameList=bandpassNameList)
+            return
+
+        if not achromatic:
+            spectrum = self._getSpectrum(gsObject)
+
+        #otherwise GalSim integrates the spectrum as it draws the object, and the flux is
+        #only integrated from the Sed if it is needed to choose how to draw the object
+        needsFlux = achromatic or self.maxPhotons is not None or self.drawMethod == 'auto' or \
+                    (gsObject.galSimType == 'pointSource' and self.psfStampFluxThreshold is not None)
+
+        for bandpassName in bandpassNameList:
+
+            #create a new object if one has not already been created or if the PSF is wavelength
+            #dependent (in which case, each filter is going to need its own initialized object)
+            centeredObj = centeredObjDict[bandpassName]
+            if centeredObj is None:
+                return
+
+            flux = self._getBandFlux(gsObject, bandpassName) if needsFlux else None
+
+            if achromatic:
+                if flux <= 0.0:
+                    continue
+
+                obj = centeredObj*flux
+            else:
+                #convolve the object's shape profile with the spectrum
+                obj = centeredObj*spectrum
+
+            if gsObject.galSimType == 'pointSource' and self.psfStampFluxThreshold is not None and \
+               flux < self.psfStampFluxThreshold:
+
+                #faint point sources are copied from a pre-rendered image of the PSF
+                if flux > 0.0:
+                    for detector in detectorList:
+                        xPix, yPix = pixelPositions[detector.name]
+                        self._drawPSFStamp(gsObject, detector, bandpassName, xPix, yPix, flux)
+                continue
+
+            if achromatic and self.shootStraddlersOnce and len(detectorList) > 1 and \
+               not self._wantsFFT(gsObject, detectorList, {bandpassName: footprintDict[bandpassName]}):
+
+                #shoot the photons once and let each detector keep the ones which land on it,
+                #rather than shooting an independent realization of the object for each detector
+                photonWeight = min([self._getPhotonWeight(flux, centeredObj, bandpassName, detector)
+                                    for detector in detectorList])
+
+                photons = self._shootPhotons(centeredObj, flux, photonWeight)
+                if photons is not None:
+                    self._straddlerDraws += 1
+                    self._binPhotonsOnDetectors(photons, detectorList, pixelPositions, [bandpassName])
+                continue
+
+            for detector in detectorList:
+
+                name = self._getFileName(detector=detector, bandpassName=bandpassName)
+
+                xPix, yPix = pixelPositions[detector.name]
+
+                photonWeight = self._getPhotonWeight(flux, centeredObj, bandpassName, detector)
+
+                if self.useStamps:
+                    #only draw (and add) the pixels which the object can actually illumine
+                    stampSize = self._getStampSize(footprintDict[bandpassName], detector)
+                    self._drawStamp(obj, detector, bandpassName, xPix, yPix, stampSize, flux=flux,
+                                    photonWeight=photonWeight)
+                    continue
+
+                self._drawCounts['phot'] += 1
+                localImage = self.blankImage(detector=detector, dtype=numpy.float32)
+                localImage = self._drawImage(obj, bandpassName, wcs=detector.wcs,
+                                             gain=self._getDrawGain(detector), image=localImage,
+                                             offset=galsim.PositionD(xPix-detector.xCenterPix, yPix-detector.yCenterPix),
+                                             **self._getPhotonKwargs(flux, photonWeight))
+
+                self._addToDetectorImage(name, localImage)
+
+    def _getStampSize(self, footprint, detector):
+        """
+        Return the number of pixels on a side of the postage stamp needed to contain
+        a footprint of a given radius in arcseconds on a detector.  The size is odd, so that
+        the stamp extends the full radius of the footprint on every side of the pixel
+        containing the object (see _getStampBounds).
+        """
+        return 2*int(numpy.ceil(footprint/detector.photParams.platescale)) + 1
+
+    def _wantsFFT(self, gsObject, detectorList, footprintDict):
+        """
+        Return True if any of the postage stamps of an object would be drawn with an FFT
+        (see _chooseDrawMethod).  Such objects are not drawn with shared photons.
+        """
+
+        if not self.useStamps:
+            return False
+
+        for bandpassName in footprintDict:
+            flux = self._getBandFlux(gsObject, bandpassName)
+            for detector in detectorList:
+                if self._chooseDrawMethod(flux, self._getStampSize(footprintDict[bandpassName], detector)) == 'fft':
+                    return True
+
+        return False
+
+    def _drawSharedPhotons(self, gsObject, centeredObjDict, detectorList, pixelPositions,
+                           bandpassNameList=None):
+        """
+        Draw an astronomical object in all of the bandpasses at once by shooting its photons
+        once and dividing them among the bandpasses.  This is only valid if the profile of the
+        object is the same in all of the bandpasses (i.e. if the PSF is not wavelength dependent).
+
+        The total number of photons is drawn from a Poisson distribution whose mean is the sum
+        of the object's fluxes in all of the bandpasses (see _getBandFlux).  Each photon is then
+        assigned to a bandpass with a probability proportional to the flux in that bandpass, so
+        that the number of photons in each bandpass is itself Poisson-distributed about the
+        flux in that bandpass.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+
+        @param [in] centeredObjDict is a dict of GalSim Objects centered on the chip, keyed
+        on the names of the bandpasses (see findAllDetectors)
+
+        @param [in] detectorList is a list of the GalSimDetectors illumined by the object
+
+        @param [in] pixelPositions is a dict of the object's (xPix, yPix) pixel positions keyed on
+        the names of the detectors in detectorList (see _getPixelPositions)
+
+        @param [in] bandpassNameList is a list of the names of the bandpasses in which to draw
+        the object (None for all of them)
+        """
+
+        if bandpassNameList is None:
+            bandpassNameList = list(self.bandpasses.keys())
+
+        if len(bandpassNameList) == 0:
+            return
+
+        fluxes = numpy.array([max(self._getBandFlux(gsObject, bandpassName), 0.0)
+                              for bandpassName in bandpassNameList])
+
+        totalFlux = fluxes.sum()
+        if totalFlux <= 0.0:
+            return
+
+        #the profile is the same in all of the bandpasses
+        centeredObj = centeredObjDict[bandpassNameList[0]]
+
+        #the photon budget is shared among the bandpasses; the weight of the photons is
+        #limited by the noise in the bandpass which can tolerate the least extra noise
+        photonWeight = None
+        if self.maxPhotons is not None:
+            for bandpassName, flux in zip(bandpassNameList, fluxes):
+                for detector in detectorList:
+                    weight = self._getPhotonWeight(totalFlux, centeredObj, bandpassName, detector,
+                                                   nPhotonsAllowed=self.maxPhotons*len(bandpassNameList),
+                                                   bandpassFlux=flux)
+
+                    if photonWeight is None or weight < photonWeight:
+                        photonWeight = weight
+
+        photons = self._shootPhotons(centeredObj, totalFlux, photonWeight)
+        if photons is None:
+            return
+
+        #GalSim does not shoot the photons of compound profiles in a random order,
+        #so assign them to bandpasses in a random order
+        bandpassIndex = numpy.repeat(numpy.arange(len(bandpassNameList)),
+                                     self._numpyRng.multinomial(len(photons[0]), fluxes/totalFlux))
+        self._numpyRng.shuffle(bandpassIndex)
+
+        self._binPhotonsOnDetectors(photons, detectorList, pixelPositions, bandpassNameList,
+                                    bandpassIndex=bandpassIndex)
+
+    def _shootPhotons(self, centeredObj, flux, photonWeight=None):
+        """
+        Shoot the photons of an object (without binning them into pixels).
+
+        @param [in] centeredObj is the GalSim object to shoot (its flux is ignored)
+
+        @param [in] flux is the number of electrons the object deposits
+
+        @param [in] photonWeight is the number of electrons carried by each photon
+        (see _getPhotonWeight).  If it is None or not greater than one, the number of
+        photons is drawn from a Poisson distribution about flux.
+
+        @param [out] xPhotons, yPhotons, fluxPhotons are numpy arrays of the positions
+        (in arcseconds relative to the center of the object) and fluxes (in electrons)
+        of the photons.  None is returned if no photons were shot.
+        """
+
+        if photonWeight is None or photonWeight <= 1.0:
+            #each photon carries one electron
+            photonWeight = 1.0
+            nPhotons = self._numpyRng.poisson(flux)
+        else:
+            self._weightedPhotonDraws += 1
+            nPhotons = int(numpy.ceil(flux/photonWeight))
+
+        if nPhotons == 0:
+            return None
+
+        self._drawCounts['phot'] += 1
+
+        photons = centeredObj.withFlux(float(nPhotons)*photonWeight).shoot(nPhotons, self._rng)
+
+        return (numpy.array(photons.getXArray()), numpy.array(photons.getYArray()),
+                numpy.array(photons.getFluxArray()))
+
+    def _binPhotonsOnDetectors(self, photons, detectorList, pixelPositions, bandpassNameList,
+                               bandpassIndex=None):
+        """
+        Add photons shot by _shootPhotons to the images of a list of detectors.  Each photon
+        is mapped onto each detector with the local WCS of that detector at the position of the
+        object, and is kept only by the detector on which it lands, so that an object straddling
+        several detectors deposits each of its photons at most once.
+
+        @param [in] photons is the tuple (xPhotons, yPhotons, fluxPhotons) returned by _shootPhotons
+
+        @param [in] detectorList is a list of the GalSimDetectors illumined by the object
+
+        @param [in] pixelPositions is a dict of the object's (xPix, yPix) pixel positions keyed on
+        the names of the detectors in detectorList (see _getPixelPositions)
+
+        @param [in] bandpassNameList is a list of the names of the bandpasses of the photons
+
+        @param [in] bandpassIndex is a numpy array of the index in bandpassNameList of each
+        photon's bandpass (None if all of the photons are in bandpassNameList[0])
+        """
+
+        xPhotons, yPhotons, fluxPhotons = photons
+
+        for detector in detectorList:
+            xPix, yPix = pixelPositions[detector.name]
+            imagePosition = self._getImagePosition(detector, xPix, yPix)
+
+            #convert the photons' positions from arcseconds to pixels
+            #using the local WCS at the position of the object
+            inverseJacobian = numpy.linalg.inv(detector.wcs.jacobian(image_pos=imagePosition).getMatrix())
+            xImage = imagePosition.x + inverseJacobian[0][0]*xPhotons + inverseJacobian[0][1]*yPhotons
+            yImage = imagePosition.y + inverseJacobian[1][0]*xPhotons + inverseJacobian[1][1]*yPhotons
+
+            gain = self._getDrawGain(detector)
+
+            if bandpassIndex is None:
+                name = self._getFileName(detector=detector, bandpassName=bandpassNameList[0])
+                self._binPhotons(self.detectorImages[name], xImage, yImage, fluxPhotons/gain)
+                continue
+
+            for ix, bandpassName in enumerate(bandpassNameList):
+                inBandpass = numpy.where(bandpassIndex == ix)[0]
+                if len(inBandpass) == 0:
+                    continue
+
+                name = self._getFileName(detector=detector, bandpassName=bandpassName)
+                self._binPhotons(self.detectorImages[name], xImage[inBandpass], yImage[inBandpass],
+                                 fluxPhotons[inBandpass]/gain)
+
+    def _binPhotons(self, image, xImage, yImage, flux):
+        """
+        Add photons to the pixels of an image.  Photons falling outside of the image are discarded.
+
+        @param [in] image is the GalSim image to which the photons are added
+
+        @param [in] xImage is a numpy array of the photons' x positions in the coordinate system
+        of the image (the center of pixel i is at x = i)
+
+        @param [in] yImage is a numpy array of the photons' y positions
+
+        @param [in] flux is a numpy array of the photons' fluxes in the units of the image
+        """
+
+        bounds = image.bounds
+        ix = numpy.floor(xImage + 0.5).astype(int)
+        iy = numpy.floor(yImage + 0.5).astype(int)
+
+        onImage = numpy.where(numpy.logical_and(numpy.logical_and(ix >= bounds.xmin, ix <= bounds.xmax),
+                                                numpy.logical_and(iy >= bounds.ymin, iy <= bounds.ymax)))[0]
+
+        if len(onImage) == 0:
+            return
+
+        rows = iy[onImage] - bounds.ymin
+        columns = ix[onImage] - bounds.xmin
+
+        if self._countElectrons:
+            #sum the photons landing in each pixel before rounding, so that photons carrying
+            #fractions of an electron are not each rounded up or down
+            nx = bounds.xmax - bounds.xmin + 1
+            pixels, inverse = numpy.unique(rows*nx + columns, return_inverse=True)
+            electrons = numpy.bincount(inverse, weights=flux[onImage])
+
+            #each pixel appears only once in pixels, so the fancy-indexed sum does not drop any photons
+            image.array[pixels//nx, pixels%nx] += numpy.round(electrons).astype(self.pixelDtype)
+            return
+
+        #numpy.add.at accumulates correctly when several photons land in the same pixel
+        numpy.add.at(image.array, (rows, columns), flux[onImage].astype(image.array.dtype))
+
+    def drawPointSource(self, gsObject, bandpass=None):
+        """
+        Draw an image of a point source.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+        carrying information about the object whose image is to be drawn
+
+        @param [in] bandpass is an instantiation of the galsim.Bandpass class characterizing
+        the bandpass over which we are integrating (in case the PSF is wavelength dependent)
+        """
+
+        if self.PSF is None:
+            raise RuntimeError("Cannot draw a point source in GalSim without a PSF")
+
+        return self.PSF.applyPSF(xPupil=gsObject.xPupilArcsec, yPupil=gsObject.yPupilArcsec, bandpass=bandpass)
+
+    def _getUnitSersic(self, sindex):
+        """
+        Return a Sersic profile with a half light radius of one arcsecond.  The profiles are
+        cached, keyed on the Sersic index (rounded onto a grid of spacing self.sersicIndexStep,
+        if it is not None).
+
+        @param [in] sindex is the Sersic index of the profile
+
+        @param [out] a galsim.Sersic
+        """
+
+        n = float(sindex)
+        if self.sersicIndexStep is not None:
+            n = float(numpy.round(n/self.sersicIndexStep)*self.sersicIndexStep)
+
+            #do not round the index outside of the range GalSim can draw
+            n = min(max(n, 0.3), 6.2)
+
+        unitSersic = self._sersicCache.get(n)
+        if unitSersic is None:
+            unitSersic = galsim.Sersic(n=n, half_light_radius=1.0)
+            self._sersicCache.set(n, unitSersic)
+
+        return unitSersic
+
+    def _getPSFHalfLightRadius(self, gsObject, bandpass=None):
+        """
+        Return the half light radius of the PSF at the position of an object (see
+        PSFbase.getHalfLightRadius).  The radii are cached, keyed on the effective wavelength
+        of the bandpass if the PSF is wavelength dependent and on the pupil coordinates of the
+        object (rounded onto a grid of spacing self.psfRadiusPositionStep) if the PSF is position
+        dependent.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+
+        @param [in] bandpass is an instantiation of the galsim.Bandpass class.  If it is None and
+        the PSF is wavelength dependent, the smallest radius in any of self.bandpasses is returned.
+
+        @param [out] the half light radius in arcseconds
+        """
+
+        return self._getPSFHalfLightRadiusAt(gsObject.xPupilArcsec, gsObject.yPupilArcsec, bandpass=bandpass)
+
+    def _getPSFHalfLightRadiusAt(self, xPupilArcsec, yPupilArcsec, bandpass=None):
+        """
+        Return the half light radius of the PSF at a position in the pupil (see _getPSFHalfLightRadius).
+
+        @param [in] xPupilArcsec is the x pupil coordinate in arcseconds
+
+        @param [in] yPupilArcsec is the y pupil coordinate in arcseconds
+
+        @param [in] bandpass is as in _getPSFHalfLightRadius
+
+        @param [out] the half light radius in arcseconds
+        """
+
+        if self.PSF.wavelength_dependent:
+            if bandpass is None:
+                return min([self._getPSFHalfLightRadiusAt(xPupilArcsec, yPupilArcsec, bandpass=bp)
+                            for bp in self.bandpasses.values()])
+
+            wavelength = bandpass.effective_wavelength
+        else:
+            wavelength = None
+
+        if self.PSF.position_dependent:
+            xPupil = float(numpy.round(xPupilArcsec/self.psfRadiusPositionStep)*self.psfRadiusPositionStep)
+            yPupil = float(numpy.round(yPupilArcsec/self.psfRadiusPositionStep)*self.psfRadiusPositionStep)
+            position = (xPupil, yPupil)
+        else:
+            xPupil = 0.0
+            yPupil = 0.0
+            position = None
+
+        key = (wavelength, position)
+        if key not in self._psfHalfLightRadii:
+            self._psfHalfLightRadii[key] = self.PSF.getHalfLightRadius(xPupil=xPupil, yPupil=yPupil,
+                                                                       bandpass=bandpass)
+
+        return self._psfHalfLightRadii[key]
+
+    def _demoteUnresolvedGalaxy(self, gsObject):
+        """
+        Decide how much detail to draw an object with.  Galaxies whose half light radius is less
+        than self.pointSourceRadiusRatio times that of the PSF are replaced by point sources at the
+        same position with the same SED.  Galaxies whose half light radius is less than
+        self.unresolvedRadiusRatio times that of the PSF (and whose Sersic index is at most
+        _maxBroadenedSersicIndex) are counted here, but drawn as a broadened PSF by drawSersic.
+        All other objects are returned unchanged.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+
+        @param [out] an instantiation of the GalSimCelestialObject class to be drawn in its place
+        """
+
+        if gsObject.galSimType != 'sersic' or self.PSF is None or \
+           (self.pointSourceRadiusRatio is None and self.unresolvedRadiusRatio is None):
+
+            return gsObject
+
+        ratio = gsObject.halfLightRadiusArcsec/self._getPSFHalfLightRadius(gsObject)
+
+        if self.pointSourceRadiusRatio is not None and ratio < self.pointSourceRadiusRatio:
+            self._pointSourceGalaxies += 1
+            return GalSimCelestialObject('pointSource', gsObject.sed, gsObject.raRadians, gsObject.decRadians,
+                                         gsObject.xPupilRadians, gsObject.yPupilRadians, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+        if self.unresolvedRadiusRatio is not None and ratio < self.unresolvedRadiusRatio and \
+           gsObject.sindex <= _maxBroadenedSersicIndex:
+
+            self._broadenedGalaxies += 1
+
+        return gsObject
+
+    def _demoteUnresolvedGalaxies(self, batch):
+        """
+        Apply _demoteUnresolvedGalaxy to every object in a batch at once.
+
+        @param [in] batch is an instantiation of the GalSimObjectBatch class
+
+        @param [out] an instantiation of the GalSimObjectBatch class in which the demoted
+        galaxies have been replaced by point sources (batch itself if none were demoted)
+        """
+
+        if self.PSF is None or (self.pointSourceRadiusRatio is None and self.unresolvedRadiusRatio is None):
+            return batch
+
+        isSersic = batch.galSimType == 'sersic'
+        if not isSersic.any():
+            return batch
+
+        if self.PSF.position_dependent:
+            psfRadius = numpy.array([self._getPSFHalfLightRadiusAt(xx, yy) for xx, yy in
+                                     zip(batch.xPupilArcsec.tolist(), batch.yPupilArcsec.tolist())])
+        else:
+            psfRadius = self._getPSFHalfLightRadiusAt(0.0, 0.0)
+
+        ratio = batch.halfLightRadiusArcsec/psfRadius
+
+        demote = numpy.zeros(len(batch), dtype=bool)
+        if self.pointSourceRadiusRatio is not None:
+            demote = isSersic & (ratio < self.pointSourceRadiusRatio)
+            self._pointSourceGalaxies += int(demote.sum())
+
+        if self.unresolvedRadiusRatio is not None:
+            self._broadenedGalaxies += int((isSersic & ~demote & (ratio < self.unresolvedRadiusRatio) &
+                                            (batch.sindex <= _maxBroadenedSersicIndex)).sum())
+
+        if not demote.any():
+            return batch
+
+        return GalSimObjectBatch(numpy.where(demote, 'pointSource', batch.galSimType), batch.sedList,
+                                 batch.raRadians, batch.decRadians, batch.xPupilRadians, batch.yPupilRadians,
+                                 numpy.where(demote, 0.0, batch.halfLightRadiusRadians),
+                                 numpy.where(demote, 0.0, batch.minorAxisRadians),
+                                 numpy.where(demote, 0.0, batch.majorAxisRadians),
+                                 numpy.where(demote, 0.0, batch.positionAngleRadians),
+                                 numpy.where(demote, 0.0, batch.sindex))
+
+    def _drawBroadenedPSF(self, gsObject, bandpass=None):
+        """
+        Approximate a galaxy much smaller than the PSF by the PSF, dilated and sheared so that its
+        second moments are those of the PSF plus those of the galaxy (as they are for the galaxy
+        convolved with the PSF).  The second moments of the PSF are taken to be those of a Gaussian
+        of the same half light radius, and those of the galaxy are scaled from that by
+        _sersicSecondMomentFactor.  This is only accurate for galaxies with Sersic index of at most
+        _maxBroadenedSersicIndex (see unresolvedRadiusRatio in __init__).
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+
+        @param [in] bandpass is an instantiation of the galsim.Bandpass class characterizing
+        the bandpass over which we are integrating (in case the PSF is wavelength dependent)
+
+        @param [out] a GalSim GSObject of unit flux
+        """
+
+        hlr = float(gsObject.halfLightRadiusArcsec)
+        q = gsObject.minorAxisRadians/gsObject.majorAxisRadians
+        psfSquared = numpy.power(self._getPSFHalfLightRadius(gsObject, bandpass=bandpass), 2)
+        galaxySquared = hlr*hlr*_sersicSecondMomentFactor(gsObject.sindex)
+
+        #GalSim's shear preserves area, so the semi-major and semi-minor axes of the galaxy are
+        #hlr/sqrt(q) and hlr*sqrt(q) (see GalSimTemplateBank.drawSersic)
+        majorSquared = galaxySquared/q + psfSquared
+        minorSquared = galaxySquared*q + psfSquared
+
+        centeredObj = self.PSF.applyPSF(xPupil=gsObject.xPupilArcsec, yPupil=gsObject.yPupilArcsec,
+                                        bandpass=bandpass)
+
+        # Subtract pi/2 from the position angle, because GalSim sets position angle=0
+        # aligned with East, rather than North (see drawSersic)
+        return centeredObj.dilate(numpy.power(majorSquared*minorSquared/(psfSquared*psfSquared), 0.25)) \
+                          .shear(q=numpy.sqrt(minorSquared/majorSquared),
+                                 beta=(0.5*numpy.pi-gsObject.positionAngleRadians)*galsim.radians)
+
+    def drawSersic(self, gsObject, bandpass=None):
+        """
+        Draw the image of a Sersic profile.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+        carrying information about the object whose image is to be drawn
+
+        @param [in] bandpass is an instantiation of the galsim.Bandpass class characterizing
+        the bandpass over which we are integrating (in case the PSF is wavelength dependent)
+        """
+
+        if self.unresolvedRadiusRatio is not None and self.PSF is not None and \
+           gsObject.sindex <= _maxBroadenedSersicIndex and \
+           gsObject.halfLightRadiusArcsec < self.unresolvedRadiusRatio*self._getPSFHalfLightRadius(gsObject):
+
+            #the galaxy is too small for its profile to matter (see unresolvedRadiusRatio in __init__)
+            return self._drawBroadenedPSF(gsObject, bandpass=bandpass)
+
+        if self.templateBank is not None and self.PSF is not None and \
+           not self.PSF.wavelength_dependent and not self.PSF.position_dependent:
+
+            #the templates are already convolved with the PSF
+            return self.templateBank.drawSersic(gsObject, self.PSF)
+
+        #create a Sersic profile by dilating a cached profile of unit half light radius
+        centeredObj = self._getUnitSersic(gsObject.sindex).dilate(float(gsObject.halfLightRadiusArcsec))
+
+        # Turn the Sersic profile into an ellipse
+        # Subtract pi/2 from the position angle, because GalSim sets position angle=0
         # aligned with East, rather than North
         centeredObj = centeredObj.shear(q=gsObject.minorAxisRadians/gsObject.majorAxisRadians, \
                                         beta=(0.5*numpy.pi-gsObject.positionAngleRadians)*galsim.radians)
@@ -472,7 +3363,8 @@ class GalSimInterpreter(object):
 
     def writeImages(self, nameRoot=None):
         """
-        Write the FITS files to disk.
+        Write the FITS files to disk.  The pixels are written with the type self.pixelDtype
+        (so integer images will contain electrons rather than ADU).
 
         @param [in] nameRoot is a string that will be prepended to the names of the output
         FITS files.  The files will be named like
@@ -484,6 +3376,9 @@ class GalSimInterpreter(object):
         myImages_R_0_0_S_1_1_y.fits is an example of an image for an LSST-like camera with
         nameRoot = 'myImages'
         """
+        if self.faintBackground:
+            self._applyFaintBackground()
+
         namesWritten = []
         for name in self.detectorImages:
             if nameRoot is not None:
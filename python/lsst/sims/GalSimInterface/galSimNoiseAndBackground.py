@@ -72,6 +72,65 @@ class NoiseAndBackgroundBase(object):
         raise NotImplementedError("There is no noise model for NoiseAndBackgroundBase")
 
 
+    def getSkyCounts(self, bandpass=None, m5=None, seeing=None, photParams=None):
+        """
+        Return the sky background in ADU per pixel.
+
+        @param [in] bandpass is a CatSim bandpass object (not a GalSim bandpass
+        object) characterizing the filter through which the image is being taken.
+
+        @param [in] m5 is the 5-sigma limiting magnitude of the observation
+
+        @param [in] seeing is the seeing in arcseconds
+
+        @param [in] photParams is an instantiation of the
+        PhotometricParameters class that carries details about the
+        photometric response of the telescope.
+
+        @param [out] the number of ADU per pixel due to the sky background
+        """
+
+        return calcSkyCountsPerPixelForM5(m5, bandpass, seeing=seeing, photParams=photParams)
+
+
+    def getNoiseLevel(self, bandpass=None, m5=None, seeing=None, photParams=None):
+        """
+        Return the standard deviation of the noise this wrapper adds to each pixel.
+        This is the level below which the light from an astronomical object cannot be
+        distinguished from the sky.
+
+        sims_photUtils defines photParams.readnoise as a standard deviation in electrons.
+        However, the noise added to the images comes from galsim.CCDNoise (see getNoiseModel),
+        which is passed photParams.readnoise as its read_noise and adds it to the variance of
+        each pixel (testNoise in testGalSimInterface.py measures a variance of
+        sky*gain + readnoise electrons**2).  This method reports the noise which is actually
+        added, so it treats photParams.readnoise as a variance in electrons**2, not as a sigma.
+
+        @param [in] bandpass is a CatSim bandpass object (not a GalSim bandpass
+        object) characterizing the filter through which the image is being taken.
+
+        @param [in] m5 is the 5-sigma limiting magnitude of the observation
+
+        @param [in] seeing is the seeing in arcseconds
+
+        @param [in] photParams is an instantiation of the
+        PhotometricParameters class that carries details about the
+        photometric response of the telescope.
+
+        @param [out] the standard deviation of the noise in electrons per pixel
+        (zero if this wrapper does not add noise)
+        """
+
+        if not self.addNoise:
+            return 0.0
+
+        skyCounts = self.getSkyCounts(bandpass=bandpass, m5=m5, seeing=seeing, photParams=photParams)
+
+        #the sky contributes Poisson noise in electrons; photParams.readnoise enters
+        #as a variance, as it does in the galsim.CCDNoise added to the images
+        return numpy.sqrt(skyCounts*photParams.gain + photParams.readnoise)
+
+
     def addNoiseAndBackground(self, image, bandpass=None, m5=None,
                               seeing=None,
                               photParams=None):
@@ -99,7 +158,7 @@ class NoiseAndBackgroundBase(object):
 
 
         #calculate the sky background to be added to each pixel
-        skyCounts = calcSkyCountsPerPixelForM5(m5, bandpass, seeing=seeing, photParams=photParams)
+        skyCounts = self.getSkyCounts(bandpass=bandpass, m5=m5, seeing=seeing, photParams=photParams)
 
         image = image.copy()
 
@@ -24,6 +24,15 @@ class PSFbase(object):
     a psf object at those coordinates (and, if relevant, the effective wavelength) of the bandpass, and return
     it.
 
+    Daughter classes may also set the boolean member variable position_dependent to False if
+    the PSF does not vary across the field of view.  This allows the GalSimInterpreter to
+    re-use quantities (like the extent of objects convolved with the PSF) which it calculated
+    for other objects.
+
+    Daughter classes whose PSF is a sum of circular Gaussians may also override the method
+    getGaussianComponents.  This allows the GalSimInterpreter to draw point sources by
+    integrating the PSF over pixels analytically (see analyticPointSources in GalSimInterpreter).
+
     The method applyPSF is defined in this class and should not be overwritten.  It handles the task of actually
     convolving the PSF returned by _getPSF.
 
@@ -36,6 +45,8 @@ class PSFbase(object):
 
     wavelength_dependent = False
 
+    position_dependent = True
+
     def _getPSF(self, xPupil=None, yPupil=None, bandpass=None):
         """
         If it had been implemented, this would return a GalSim PSF instantiation at the
@@ -87,6 +98,45 @@ class PSFbase(object):
             #if there is no object (i.e. if this is a point source), just return the PSF
             return psf
 
+    def getHalfLightRadius(self, xPupil=0.0, yPupil=0.0, bandpass=None):
+        """
+        Find the radius within which half of the light of the PSF falls.  The PSF is drawn
+        on a finely sampled image and the radius is found from the cumulative flux of its pixels,
+        so this works for PSFs (like sums of profiles) for which GalSim does not provide
+        getHalfLightRadius.
+
+        @param [in] xPupil the x pupil coordinate in arc seconds
+
+        @param [in] yPupil the y pupil coordinate in arc seconds
+
+        @param [in] bandpass is an instantiation of the GalSim bandpass class (in case
+        the PSF is wavelength dependent)
+
+        @param [out] the half light radius in arc seconds
+        """
+
+        psf = self._getPSF(xPupil=xPupil, yPupil=yPupil, bandpass=bandpass)
+
+        image = psf.drawImage(scale=0.25*psf.nyquistScale(), method='no_pixel')
+        ny, nx = image.array.shape
+        xx, yy = numpy.meshgrid(numpy.arange(nx) - 0.5*(nx-1), numpy.arange(ny) - 0.5*(ny-1))
+        radius = numpy.sqrt(xx*xx + yy*yy).flatten()*image.scale
+
+        order = numpy.argsort(radius)
+        enclosed = numpy.cumsum(image.array.flatten()[order])
+
+        return radius[order][numpy.searchsorted(enclosed, 0.5*enclosed[-1])]
+
+    def getGaussianComponents(self):
+        """
+        Return the circular Gaussians of which the PSF is the sum, or None if the PSF is not
+        a sum of circular Gaussians (as is the case for this base class)
+
+        @param [out] a list of (weight, sigma) tuples, where weight is the fraction of the flux
+        of the PSF in each Gaussian and sigma is its standard deviation in arcseconds
+        """
+        return None
+
 class DoubleGaussianPSF(PSFbase):
     """
     This is an example implementation of a wavelength- and position-independent
@@ -95,6 +145,8 @@ class DoubleGaussianPSF(PSFbase):
 
     wavelength_dependent = False
 
+    position_dependent = False
+
     def __init__(self, fwhm1=0.6, fwhm2=0.12, wgt1=1.0, wgt2=0.1):
         """
         @param [in] fwhm1 is the Full Width at Half Max of the first Gaussian in arcseconds
@@ -126,6 +178,7 @@ class DoubleGaussianPSF(PSFbase):
         gaussian2 = galsim.Gaussian(sigma=r2)
 
         self._cached_psf = norm*(wgt1*gaussian1 + wgt2*gaussian2)
+        self._gaussianComponents = [(norm*wgt1, r1), (norm*wgt2, r2)]
 
     def _getPSF(self, xPupil=None, yPupil=None, **kwargs):
         """
@@ -140,6 +193,15 @@ class DoubleGaussianPSF(PSFbase):
         """
         return self._cached_psf
 
+    def getGaussianComponents(self):
+        """
+        Return the circular Gaussians of which the PSF is the sum
+
+        @param [out] a list of (weight, sigma) tuples, where weight is the fraction of the flux
+        of the PSF in each Gaussian and sigma is its standard deviation in arcseconds
+        """
+        return list(self._gaussianComponents)
+
 
 
 class SNRdocumentPSF(DoubleGaussianPSF):
@@ -155,6 +217,8 @@ class SNRdocumentPSF(DoubleGaussianPSF):
 
     wavelength_dependent = False
 
+    position_dependent = False
+
     def __init__(self, fwhm=0.6):
         """
         @param [in] fwhm is the Full Width at Half Max of the total PSF.  This is given in
@@ -175,3 +239,4 @@ class SNRdocumentPSF(DoubleGaussianPSF):
         gaussian2 = galsim.Gaussian(sigma=2.0*alpha)
 
         self._cached_psf = 0.909*(gaussian1 + 0.1*gaussian2)
+        self._gaussianComponents = [(0.909, alpha), (0.0909, 2.0*alpha)]
@@ -0,0 +1,258 @@
+"""
+This file defines GalSimTemplateBank, which stores images of Sersic profiles convolved
+with a PSF so that galaxies can be drawn without convolving each of them with the PSF.
+"""
+
+import hashlib
+import numpy
+import galsim
+
+__all__ = ["GalSimTemplateBank"]
+
+
+class GalSimTemplateBank(object):
+    """
+    This class stores pre-rendered images of circular Sersic profiles convolved with a PSF
+    on a grid of Sersic index and ratio of galaxy half light radius to PSF half light radius.
+    A galaxy is drawn as a galsim.InterpolatedImage of the nearest template, dilated and
+    sheared so that the second moments of the result match those of the galaxy convolved
+    with the PSF.  This is an approximation: the wings of sheared galaxies are only as
+    elliptical as their second moments, and the profile is that of the nearest Sersic
+    index on the grid.
+
+    The templates are rendered the first time they are needed.  They can be written to
+    disk with writeBank and read back with readBank, so that a bank can be re-used by
+    later runs with the same PSF.
+
+    To use a bank, assign an instantiation of this class to the member variable
+    templateBank of a GalSim InstanceCatalog.  The bank is only used if the PSF depends
+    on neither position nor wavelength; otherwise galaxies are drawn analytically.
+    """
+
+    def __init__(self, sindexGrid=None, ratioGrid=None, samplesPerHalfLightRadius=4.0):
+        """
+        @param [in] sindexGrid is a numpy array of the Sersic indices of the templates
+        (defaults to 0.5, 1.0, ... 6.0)
+
+        @param [in] ratioGrid is a numpy array of the ratios of galaxy half light radius
+        to PSF half light radius of the templates (defaults to 21 logarithmically spaced
+        values between 0.1 and 31.6)
+
+        @param [in] samplesPerHalfLightRadius is the number of pixels across the half light
+        radius of each (PSF-convolved) template
+        """
+
+        if sindexGrid is None:
+            sindexGrid = numpy.arange(0.5, 6.01, 0.5)
+
+        if ratioGrid is None:
+            ratioGrid = numpy.power(10.0, numpy.arange(-1.0, 1.51, 0.125))
+
+        self.sindexGrid = numpy.array(sindexGrid, dtype=float)
+        self.ratioGrid = numpy.array(ratioGrid, dtype=float)
+        self.samplesPerHalfLightRadius = samplesPerHalfLightRadius
+
+        self.hits = 0 #the number of galaxies drawn from templates which had already been rendered
+        self.misses = 0 #the number of templates rendered
+
+        self._PSF = None
+        self._psfHalfLightRadius = None
+        self._psfFingerprint = None #identifies the PSF with which the templates were rendered
+        self._templates = {} #galsim.Images of the templates keyed on (sindex index, ratio index)
+        self._interpolatedImages = {} #the galsim.InterpolatedImages of self._templates
+
+
+    def _getPSFFingerprint(self, PSF, psfHalfLightRadius):
+        """
+        Return a string identifying the profile of a PSF: a hash of an image of the PSF,
+        sampled in units of its half light radius and normalized to its peak.  PSFs with the
+        same half light radius but different profiles have different fingerprints.
+
+        @param [in] PSF is an instantiation of a daughter class of PSFbase which depends on
+        neither position nor wavelength
+
+        @param [in] psfHalfLightRadius is the half light radius of the PSF in arcseconds
+
+        @param [out] the fingerprint (a string)
+        """
+
+        psf = PSF._getPSF(xPupil=0.0, yPupil=0.0)
+        image = psf.drawImage(nx=33, ny=33, scale=0.25*psfHalfLightRadius, method='no_pixel')
+
+        #round away the last few bits, which may differ between platforms
+        array = numpy.round(image.array/image.array.max(), 5).astype(numpy.float64)
+
+        fingerprint = hashlib.sha1(array.tostring())
+        fingerprint.update(('%.6e' % psfHalfLightRadius).encode('ascii'))
+        return fingerprint.hexdigest()
+
+
+    def setPSF(self, PSF):
+        """
+        Set the PSF with which the templates are convolved.  Templates rendered (or read in)
+        with a PSF of a different profile (see _getPSFFingerprint) are discarded.
+
+        @param [in] PSF is an instantiation of a daughter class of PSFbase which depends on
+        neither position nor wavelength
+        """
+
+        if PSF is self._PSF:
+            return
+
+        psfHalfLightRadius = PSF.getHalfLightRadius()
+        psfFingerprint = self._getPSFFingerprint(PSF, psfHalfLightRadius)
+
+        if psfFingerprint != self._psfFingerprint:
+            self._templates = {}
+            self._interpolatedImages = {}
+            self._psfHalfLightRadius = psfHalfLightRadius
+            self._psfFingerprint = psfFingerprint
+
+        self._PSF = PSF
+
+
+    def _getTemplate(self, ix, jx):
+        """
+        Return the galsim.InterpolatedImage of a template, rendering it if necessary.
+        The template has unit flux.
+
+        @param [in] ix is the index of the template's Sersic index in self.sindexGrid
+
+        @param [in] jx is the index of the template's radius ratio in self.ratioGrid
+        """
+
+        key = (ix, jx)
+
+        if key in self._interpolatedImages:
+            self.hits += 1
+            return self._interpolatedImages[key]
+
+        if key not in self._templates:
+            if self._PSF is None:
+                raise RuntimeError("GalSimTemplateBank cannot render templates without a PSF; call setPSF")
+
+            self.misses += 1
+            galaxy = galsim.Sersic(n=self.sindexGrid[ix],
+                                   half_light_radius=self.ratioGrid[jx]*self._psfHalfLightRadius)
+
+            obj = self._PSF.applyPSF(xPupil=0.0, yPupil=0.0, obj=galaxy)
+
+            #sample the template in proportion to its size, so that large templates
+            #do not need enormous images
+            scale = self._psfHalfLightRadius*numpy.sqrt(1.0 + self.ratioGrid[jx]*self.ratioGrid[jx]) \
+                    /self.samplesPerHalfLightRadius
+
+            self._templates[key] = obj.drawImage(scale=scale, method='no_pixel')
+        else:
+            self.hits += 1
+
+        self._interpolatedImages[key] = galsim.InterpolatedImage(self._templates[key], flux=1.0)
+        return self._interpolatedImages[key]
+
+
+    def drawSersic(self, gsObject, PSF):
+        """
+        Approximate a Sersic profile convolved with a PSF using the template bank.
+
+        @param [in] gsObject is an instantiation of the GalSimCelestialObject class
+        carrying information about the galaxy to be drawn
+
+        @param [in] PSF is an instantiation of a daughter class of PSFbase which depends on
+        neither position nor wavelength
+
+        @param [out] a GalSim GSObject of unit flux
+        """
+
+        self.setPSF(PSF)
+
+        hlr = float(gsObject.halfLightRadiusArcsec)
+        q = gsObject.minorAxisRadians/gsObject.majorAxisRadians
+        psfSquared = self._psfHalfLightRadius*self._psfHalfLightRadius
+
+        #GalSim's shear preserves area, so the semi-major and semi-minor axes of the galaxy are
+        #hlr/sqrt(q) and hlr*sqrt(q).  Convolution adds the square of the PSF size to each.
+        majorSquared = hlr*hlr/q + psfSquared
+        minorSquared = hlr*hlr*q + psfSquared
+
+        #the ratio of the radius of the circular galaxy with the same convolved area to the PSF radius
+        ratio = numpy.sqrt(max(numpy.sqrt(majorSquared*minorSquared) - psfSquared, 0.0)/psfSquared)
+
+        ix = numpy.argmin(numpy.abs(self.sindexGrid - gsObject.sindex))
+        jx = numpy.argmin(numpy.abs(numpy.log(numpy.maximum(self.ratioGrid, 1.0e-10)) -
+                                    numpy.log(max(ratio, 1.0e-10))))
+
+        template = self._getTemplate(ix, jx)
+
+        #correct for the difference between the size of the galaxy and that of the template
+        dilation = numpy.sqrt((1.0 + ratio*ratio)/(1.0 + self.ratioGrid[jx]*self.ratioGrid[jx]))
+
+        # Subtract pi/2 from the position angle, because GalSim sets position angle=0
+        # aligned with East, rather than North (see GalSimInterpreter.drawSersic)
+        return template.dilate(dilation).shear(q=numpy.sqrt(minorSquared/majorSquared), \
+                                               beta=(0.5*numpy.pi-gsObject.positionAngleRadians)*galsim.radians)
+
+
+    def writeBank(self, fileName):
+        """
+        Write the templates which have been rendered to a numpy .npz file
+
+        @param [in] fileName is the name of the file to write.  The file is written under exactly
+        this name (numpy.savez would append '.npz' to a name without that extension), so that
+        readBank can read it back from the same name.
+        """
+
+        if self._psfHalfLightRadius is None:
+            raise RuntimeError("GalSimTemplateBank has no templates to write; call setPSF")
+
+        arrays = {}
+        keys = []
+        scales = []
+        for ix, key in enumerate(self._templates):
+            keys.append(key)
+            scales.append(self._templates[key].scale)
+            arrays['template_%d' % ix] = self._templates[key].array
+
+        arrays['keys'] = numpy.array(keys, dtype=int).reshape(len(keys), 2)
+        arrays['scales'] = numpy.array(scales)
+        arrays['sindexGrid'] = self.sindexGrid
+        arrays['ratioGrid'] = self.ratioGrid
+        arrays['samplesPerHalfLightRadius'] = self.samplesPerHalfLightRadius
+        arrays['psfHalfLightRadius'] = self._psfHalfLightRadius
+        arrays['psfFingerprint'] = numpy.array(self._psfFingerprint)
+
+        with open(fileName, 'wb') as fileHandle:
+            numpy.savez(fileHandle, **arrays)
+
+
+    def readBank(self, fileName):
+        """
+        Read templates written by writeBank, replacing the grids and templates of this bank.
+        The templates will be discarded if setPSF is later called with a PSF whose profile
+        differs from that of the PSF with which they were rendered (see _getPSFFingerprint).
+        Banks written without a fingerprint are always discarded by setPSF.
+
+        @param [in] fileName is the name of the file to read
+        """
+
+        data = numpy.load(fileName)
+
+        try:
+            self.sindexGrid = data['sindexGrid']
+            self.ratioGrid = data['ratioGrid']
+            self.samplesPerHalfLightRadius = float(data['samplesPerHalfLightRadius'])
+            self._psfHalfLightRadius = float(data['psfHalfLightRadius'])
+
+            if 'psfFingerprint' in data.files:
+                self._psfFingerprint = str(data['psfFingerprint'])
+            else:
+                self._psfFingerprint = None
+
+            self._PSF = None
+
+            self._templates = {}
+            self._interpolatedImages = {}
+            for ix, (key, scale) in enumerate(zip(data['keys'], data['scales'])):
+                self._templates[(int(key[0]), int(key[1]))] = galsim.Image(numpy.array(data['template_%d' % ix]),
+                                                                          scale=float(scale))
+        finally:
+            data.close()
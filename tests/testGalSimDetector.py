@@ -9,7 +9,7 @@ from lsst.sims.photUtils import PhotometricParameters
 from lsst.sims.coordUtils.utils import ReturnCamera
 from lsst.sims.coordUtils import _observedFromICRS, _raDecFromPixelCoords, \
                                  pupilCoordsFromPixelCoords
-from lsst.sims.GalSimInterface import GalSimDetector
+from lsst.sims.GalSimInterface import GalSimDetector, GalSimDetectorIndex
 
 class GalSimDetectorTest(unittest.TestCase):
 
@@ -87,8 +87,9 @@ class GalSimDetectorTest(unittest.TestCase):
 
         testAnswer = gsdet.containsRaDec(raList, decList)
 
+        self.assertTrue(isinstance(testAnswer, numpy.ndarray))
         for c, t in zip(correctAnswer, testAnswer):
-            self.assertTrue(c is t)
+            self.assertEqual(c, t)
 
 
     def testContainsPupilCoordinates(self):
@@ -137,8 +138,66 @@ class GalSimDetectorTest(unittest.TestCase):
 
         testAnswer = gsdet.containsPupilCoordinates(xPupilList, yPupilList)
 
+        self.assertTrue(isinstance(testAnswer, numpy.ndarray))
         for c, t in zip(correctAnswer, testAnswer):
-            self.assertTrue(c is t)
+            self.assertEqual(c, t)
+
+    def testDetectorIndex(self):
+        """
+        Test that GalSimDetectorIndex finds the same detectors as a brute force
+        comparison against every detector in the camera
+        """
+
+        photParams = PhotometricParameters()
+        detectorList = [GalSimDetector(dd, self.camera, self.obs, self.epoch, photParams=photParams)
+                        for dd in self.camera]
+
+        index = GalSimDetectorIndex(detectorList)
+
+        xMin = min([dd.xMinArcsec for dd in detectorList])
+        xMax = max([dd.xMaxArcsec for dd in detectorList])
+        yMin = min([dd.yMinArcsec for dd in detectorList])
+        yMax = max([dd.yMaxArcsec for dd in detectorList])
+
+        numpy.random.seed(42)
+        xCenterList = numpy.random.random_sample(200)*1.2*(xMax-xMin) + xMin - 0.1*(xMax-xMin)
+        yCenterList = numpy.random.random_sample(200)*1.2*(yMax-yMin) + yMin - 0.1*(yMax-yMin)
+        radiusList = numpy.random.random_sample(200)*0.5*(xMax-xMin)
+
+        foundSome = False
+        for xx, yy, rr in zip(xCenterList, yCenterList, radiusList):
+            controlCircle = []
+            controlBox = []
+            for dd in detectorList:
+                dx = max(dd.xMinArcsec-xx, 0.0, xx-dd.xMaxArcsec)
+                dy = max(dd.yMinArcsec-yy, 0.0, yy-dd.yMaxArcsec)
+                if dx*dx + dy*dy < rr*rr:
+                    controlCircle.append(dd.name)
+
+                if dd.xMaxArcsec > xx-rr and dd.xMinArcsec < xx+rr and \
+                   dd.yMaxArcsec > yy-rr and dd.yMinArcsec < yy+rr:
+
+                    controlBox.append(dd.name)
+
+            testCircle = [dd.name for dd in index.findDetectorsInCircle(xx, yy, rr)]
+            testBox = [dd.name for dd in index.findDetectors(xx-rr, xx+rr, yy-rr, yy+rr)]
+
+            self.assertEqual(controlCircle, testCircle)
+            self.assertEqual(controlBox, testBox)
+
+            if len(controlCircle)>0:
+                foundSome = True
+
+        self.assertTrue(foundSome)
+
+        #test that the vectorized membership matrix agrees with findDetectorsInCircle
+        membership = index.circleMembership(xCenterList, yCenterList, radiusList)
+        self.assertEqual(membership.shape, (len(xCenterList), len(detectorList)))
+        for xx, yy, rr, isMember in zip(xCenterList, yCenterList, radiusList, membership):
+            control = [dd.name for dd in index.findDetectorsInCircle(xx, yy, rr)]
+            test = [detectorList[ix].name for ix in numpy.where(isMember)[0]]
+            self.assertEqual(control, test)
+
 
 def suite():
     utilsTests.init()
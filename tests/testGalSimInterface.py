@@ -1,6 +1,7 @@
 from __future__ import with_statement
 import os
 import copy
+import warnings
 import numpy
 import unittest
 import galsim
@@ -8,13 +9,14 @@ from collections import OrderedDict
 import lsst.utils
 import lsst.utils.tests as utilsTests
 from lsst.sims.utils import arcsecFromRadians, radiansFromArcsec
-from lsst.sims.photUtils import Bandpass, calcSkyCountsPerPixelForM5, LSSTdefaults, PhotometricParameters
+from lsst.sims.photUtils import Bandpass, Sed, calcSkyCountsPerPixelForM5, LSSTdefaults, PhotometricParameters
 from lsst.sims.coordUtils import pixelCoordsFromPupilCoords
 from lsst.sims.catalogs.measures.instance import InstanceCatalog
 from lsst.sims.catalogs.generation.utils import makePhoSimTestDB
 from lsst.sims.utils import ObservationMetaData
 from lsst.sims.GalSimInterface import GalSimGalaxies, GalSimStars, GalSimAgn, \
-                                               SNRdocumentPSF, ExampleCCDNoise
+                                               SNRdocumentPSF, PSFbase, ExampleCCDNoise, GalSimCelestialObject, \
+                                               GalSimTemplateBank, GalSimObjectBatch
 from lsst.sims.catUtils.utils import calcADUwrapper, testGalaxyBulgeDBObj, testGalaxyDiskDBObj, \
                                      testGalaxyAgnDBObj, testStarsDBObj
 import lsst.afw.image as afwImage
@@ -60,6 +62,36 @@ class testStarCatalog(GalSimStars):
 
     PSF = SNRdocumentPSF()
 
+class batchedStarCatalog(testStarCatalog):
+    """
+    Draws the stars in each chunk of the catalog together
+    """
+    batchPointSources = True
+    achromaticFastPath = True
+
+
+class smallPhotonBatchStarCatalog(batchedStarCatalog):
+    """
+    Draws the stars in each chunk of the catalog together, shooting a few photons at a time
+    """
+    pointSourcePhotonBatchSize = 1000
+
+
+class psfStampStarCatalog(testStarCatalog):
+    """
+    Draws every star from a pre-rendered image of the PSF
+    """
+    psfStampFluxThreshold = 1.0e10
+
+
+class analyticStarCatalog(testStarCatalog):
+    """
+    Draws the stars in each chunk of the catalog by integrating the PSF over pixels analytically
+    """
+    analyticPointSources = True
+    achromaticFastPath = True
+
+
 class testAgnCatalog(GalSimAgn):
     """
     Wraps the GalSimAgn class.  Adds columns to the output
@@ -101,6 +133,155 @@ class noisyCatalog(testGalaxyCatalog):
     noise_and_background = ExampleCCDNoise(seed=42)
 
 
+class fullImageCatalog(testGalaxyCatalog):
+    """
+    Draws each object onto a full-detector image rather than a postage stamp
+    """
+    PSF = SNRdocumentPSF()
+    useStamps = False
+
+
+class exactFootprintCatalog(testGalaxyCatalog):
+    """
+    Finds the detectors illumined by each object by drawing a test image
+    """
+    PSF = SNRdocumentPSF()
+    exactFootprint = True
+
+
+class chromaticGaussianPSF(PSFbase):
+    """
+    A Gaussian PSF whose width scales with the effective wavelength
+    of the bandpass like a Kolmogorov seeing disk
+    """
+
+    wavelength_dependent = True
+
+    position_dependent = False
+
+    def _getPSF(self, xPupil=None, yPupil=None, bandpass=None):
+        fwhm = 0.7*numpy.power(bandpass.effective_wavelength/500.0, -0.2)
+        return galsim.Gaussian(fwhm=fwhm)
+
+
+class singleFootprintCatalog(testGalaxyCatalog):
+    """
+    Evaluates the footprints of objects convolved with a wavelength dependent
+    PSF in a single bandpass
+    """
+    PSF = chromaticGaussianPSF()
+    singleFootprintPass = True
+
+
+class chromaticDrawingCatalog(testGalaxyCatalog):
+    """
+    Has GalSim integrate each object over its SED, even though the PSF is achromatic
+    """
+    PSF = SNRdocumentPSF()
+    achromaticFastPath = False
+
+
+class sharedPhotonCatalog(testGalaxyCatalog):
+    """
+    Shoots the photons of each object once for all of the bandpasses
+    """
+    PSF = SNRdocumentPSF()
+    sharedPhotons = True
+    achromaticFastPath = True
+
+
+class straddlerCatalog(testGalaxyCatalog):
+    """
+    Shoots the photons of objects illumining several detectors once per bandpass
+    """
+    PSF = SNRdocumentPSF()
+    shootStraddlersOnce = True
+    achromaticFastPath = True
+
+
+class fftCatalog(testGalaxyCatalog):
+    """
+    Draws every object with an FFT rather than by photon shooting
+    """
+    PSF = SNRdocumentPSF()
+    drawMethod = 'fft'
+
+
+class autoDrawCatalog(testGalaxyCatalog):
+    """
+    Chooses between photon shooting and FFTs for each object
+    """
+    PSF = SNRdocumentPSF()
+    drawMethod = 'auto'
+
+
+class photonBudgetCatalog(testGalaxyCatalog):
+    """
+    Shoots at most 100 photons per object, so that photons carry
+    more than one electron each
+    """
+    PSF = SNRdocumentPSF()
+    maxPhotons = 100
+
+
+class noisyPhotonBudgetCatalog(noisyCatalog):
+    """
+    Shoots at most 100 photons per object into images with sky noise
+    """
+    maxPhotons = 100
+
+
+class broadenedGalaxyCatalog(testGalaxyCatalog):
+    """
+    Draws every galaxy smaller than ten times the PSF as a broadened PSF
+    """
+    PSF = SNRdocumentPSF()
+    unresolvedRadiusRatio = 10.0
+
+
+class pointSourceGalaxyCatalog(testGalaxyCatalog):
+    """
+    Draws every galaxy smaller than ten times the PSF as a point source
+    """
+    PSF = SNRdocumentPSF()
+    pointSourceRadiusRatio = 10.0
+    batchPointSources = True
+    achromaticFastPath = True
+
+
+class sersicCacheCatalog(testGalaxyCatalog):
+    """
+    Rounds Sersic indices onto a grid so that galaxies share cached Sersic profiles
+    """
+    PSF = SNRdocumentPSF()
+    sersicIndexStep = 0.5
+
+
+class templateBankCatalog(testGalaxyCatalog):
+    """
+    Draws galaxies from a bank of pre-rendered, PSF-convolved templates
+    """
+    PSF = SNRdocumentPSF()
+    templateBank = GalSimTemplateBank()
+
+
+class integerPixelCatalog(testGalaxyCatalog):
+    """
+    Stores the pixels of the images as integer electron counts
+    """
+    PSF = SNRdocumentPSF()
+    pixelDtype = numpy.int32
+
+
+class integerBudgetCatalog(integerPixelCatalog):
+    """
+    Limits the number of photons shot per object while storing integer electron counts
+    """
+    maxPhotons = 100
+    sharedPhotons = True
+    achromaticFastPath = True
+
+
 class testFakeBandpassCatalog(testStarCatalog):
     """
     tests the GalSim interface on fake bandpasses
@@ -437,6 +618,105 @@ class GalSimInterfaceTest(unittest.TestCase):
             os.unlink(catName)
 
 
+    def testBatchedStars(self):
+        """
+        Test that GalSimInterpreter puts the right number of counts on images of stars
+        when the stars are drawn together
+        """
+        catName = 'testBatchedStarCat.sav'
+        stars = testStarsDBObj(driver=self.driver, database=self.dbName)
+        cat = batchedStarCatalog(stars, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+
+        statistics = cat.galSimInterpreter.getStatistics()
+        self.assertTrue(statistics['batchedPointSources'] > 0)
+        self.assertTrue(statistics['photDraws'] < statistics['batchedPointSources'])
+
+        self.catalogTester(catName=catName, catalog=cat, nameRoot='batchedStars')
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+        #shooting the photons in many small batches should give the same images
+        cat = smallPhotonBatchStarCatalog(stars, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+
+        smallStatistics = cat.galSimInterpreter.getStatistics()
+        self.assertEqual(smallStatistics['batchedPointSources'], statistics['batchedPointSources'])
+
+        self.catalogTester(catName=catName, catalog=cat, nameRoot='smallPhotonBatchStars')
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
+    def testAnalyticStars(self):
+        """
+        Test that GalSimInterpreter puts the right number of counts on images of stars
+        when the stars are drawn by integrating the PSF over pixels analytically
+        """
+        components = SNRdocumentPSF().getGaussianComponents()
+        self.assertAlmostEqual(sum([weight for weight, sigma in components]), 0.9999, 10)
+
+        catName = 'testAnalyticStarCat.sav'
+        stars = testStarsDBObj(driver=self.driver, database=self.dbName)
+        cat = analyticStarCatalog(stars, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+
+        statistics = cat.galSimInterpreter.getStatistics()
+        self.assertTrue(statistics['analyticPointSources'] > 0)
+        self.assertEqual(statistics['batchedPointSources'], 0)
+        self.assertEqual(statistics['photDraws'] + statistics['fftDraws'], 0)
+
+        self.catalogTester(catName=catName, catalog=cat, nameRoot='analyticStars')
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+        #draw one star on a blank image; only the pixels of its stamp should receive counts
+        interpreter = cat.galSimInterpreter
+        detector = interpreter.detectors[0]
+        bandpassName = cat.bandpassNames[0]
+        name = interpreter._getFileName(detector=detector, bandpassName=bandpassName)
+        interpreter.detectorImages[name] = interpreter.blankImage(detector=detector)
+
+        flux = 1.0e5
+        footprint = 2.0
+        membership = numpy.zeros((1, len(interpreter.detectors)), dtype=bool)
+        membership[0][0] = True
+        pixelPositionsList = [{detector.name: (detector.xCenterPix, detector.yCenterPix)}]
+        interpreter._drawGaussianPointSources(components, bandpassName, numpy.array([flux]),
+                                              numpy.array([footprint]), membership, pixelPositionsList)
+
+        image = interpreter.detectorImages[name]
+        rows, columns = numpy.where(image.array != 0.0)
+        self.assertTrue(len(rows) > 0)
+
+        center = interpreter._getImagePosition(detector, detector.xCenterPix, detector.yCenterPix)
+        halfSize = footprint/detector.photParams.platescale + 1.0
+        self.assertTrue((numpy.abs(rows + 1 - center.y) <= halfSize + 0.5).all())
+        self.assertTrue((numpy.abs(columns + 1 - center.x) <= halfSize + 0.5).all())
+
+        electrons = image.array.sum()*detector.photParams.gain
+        self.assertTrue(numpy.abs(electrons - 0.9999*flux) < 5.0*numpy.sqrt(flux))
+
+
+    def testPSFStampStars(self):
+        """
+        Test that GalSimInterpreter puts the right number of counts on images of stars
+        when the stars are drawn from pre-rendered images of the PSF
+        """
+        catName = 'testPSFStampStarCat.sav'
+        stars = testStarsDBObj(driver=self.driver, database=self.dbName)
+        cat = psfStampStarCatalog(stars, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+
+        statistics = cat.galSimInterpreter.getStatistics()
+        self.assertTrue(statistics['psfStampDraws'] > 0)
+        self.assertEqual(statistics['photDraws'] + statistics['fftDraws'], 0)
+
+        self.catalogTester(catName=catName, catalog=cat, nameRoot='psfStampStars')
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
     def testStars(self):
         """
         Test that GalSimInterpreter puts the right number of counts on images of stars
@@ -535,6 +815,582 @@ class GalSimInterfaceTest(unittest.TestCase):
             os.unlink(catName)
 
 
+    def testFullImages(self):
+        """
+        Test that GalSimInterpreter puts the right number of counts on images of Galaxy bulges
+        when objects are drawn onto full-detector images instead of postage stamps
+        """
+        catName = 'testFullImageCat.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = fullImageCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+        self.catalogTester(catName=catName, catalog=cat, nameRoot='fullImage')
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
+    def testExactFootprint(self):
+        """
+        Test that GalSimInterpreter puts the right number of counts on images of Galaxy bulges
+        when the detectors illumined by each object are found by drawing a test image
+        """
+        catName = 'testExactFootprintCat.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = exactFootprintCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+        self.catalogTester(catName=catName, catalog=cat, nameRoot='exactFootprint')
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
+    def testStampCentering(self):
+        """
+        Test that a postage stamp is centered on the pixel containing its object, so that
+        an object just short of a pixel edge loses no more of its flux off the stamp than
+        it does off its footprint
+        """
+        catName = 'testStampCenteringCat.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = testGalaxyCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+        interpreter = cat.galSimInterpreter
+        detector = interpreter.detectors[0]
+        obj = galsim.Gaussian(sigma=0.3, flux=1.0e4)
+
+        #put the object 0.49 pixels to the +x and +y of the center of a pixel
+        nx = detector.xMaxPix - detector.xMinPix + 1
+        ny = detector.yMaxPix - detector.yMinPix + 1
+        xPix = detector.xCenterPix + numpy.floor(0.5*(1+nx)) - 0.5*(1+nx) + 0.49
+        yPix = detector.yCenterPix + numpy.floor(0.5*(1+ny)) - 0.5*(1+ny) + 0.49
+
+        stampSize = interpreter._getStampSize(interpreter._getFootprintRadius(obj), detector)
+        self.assertEqual(stampSize % 2, 1)
+
+        bounds, imagePosition = interpreter._getStampBounds(detector, xPix, yPix, stampSize)
+        self.assertAlmostEqual(imagePosition.x - numpy.floor(imagePosition.x), 0.49, 10)
+        self.assertAlmostEqual(imagePosition.y - numpy.floor(imagePosition.y), 0.49, 10)
+
+        stamp = galsim.Image(bounds=bounds, wcs=detector.wcs)
+        stamp = obj.drawImage(image=stamp, wcs=detector.wcs, method='no_pixel',
+                              offset=imagePosition-stamp.trueCenter())
+
+        fullImage = interpreter.blankImage(detector=detector)
+        fullImage = obj.drawImage(image=fullImage, wcs=detector.wcs, method='no_pixel',
+                                  offset=galsim.PositionD(xPix-detector.xCenterPix, yPix-detector.yCenterPix))
+
+        fullFlux = fullImage.array.sum()
+        self.assertTrue(numpy.abs(stamp.array.sum()/fullFlux - 1.0) < galsim.GSParams().folding_threshold)
+        numpy.testing.assert_array_almost_equal(stamp.array/fullFlux, fullImage[bounds].array/fullFlux, 6)
+
+
+    def testChromaticDrawing(self):
+        """
+        Test that GalSimInterpreter puts the right number of counts on images of Galaxy bulges
+        when it does not take the achromatic fast path
+        """
+        catName = 'testChromaticDrawingCat.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = chromaticDrawingCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+        self.catalogTester(catName=catName, catalog=cat, nameRoot='chromaticDrawing')
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
+    def testSharedPhotons(self):
+        """
+        Test that GalSimInterpreter puts the right number of counts on images of Galaxy bulges
+        when the photons of each object are shared among the bandpasses
+        """
+        catName = 'testSharedPhotonCat.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = sharedPhotonCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+        self.catalogTester(catName=catName, catalog=cat, nameRoot='sharedPhotons')
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
+    def testStraddlers(self):
+        """
+        Test that GalSimInterpreter puts the right number of counts on images of Galaxy bulges
+        when the photons of objects illumining several detectors are shot once
+        """
+        catName = 'testStraddlerCat.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = straddlerCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+        self.catalogTester(catName=catName, catalog=cat, nameRoot='straddlers')
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+        #find the two detectors which are side by side with the narrowest gap between them
+        interpreter = cat.galSimInterpreter
+        boundary = None
+        for left in interpreter.detectors:
+            for right in interpreter.detectors:
+                yMin = max(left.yMinArcsec, right.yMinArcsec)
+                yMax = min(left.yMaxArcsec, right.yMaxArcsec)
+                gap = right.xMinArcsec - left.xMaxArcsec
+                if yMax > yMin and gap >= 0.0 and (boundary is None or gap < boundary[0]):
+                    boundary = (gap, left, right, 0.5*(yMin + yMax))
+
+        self.assertTrue(boundary is not None)
+        gap, left, right, yBoundary = boundary
+
+        #put a bright, extended galaxy in the middle of that gap, so that it illumines both detectors
+        sed = Sed()
+        sed.setFlatSED()
+        sed.multiplyFluxNorm(sed.calcFluxNorm(16.0, cat.bandpassDict['r']))
+        sed.multiplyFluxNorm(cat.photParams.exptime*cat.photParams.effarea*cat.photParams.nexp)
+        hlr = radiansFromArcsec(max(2.0, gap))
+        gsObject = GalSimCelestialObject('sersic', sed, 0.0, 0.0,
+                                         radiansFromArcsec(0.5*(left.xMaxArcsec + right.xMinArcsec)),
+                                         radiansFromArcsec(yBoundary),
+                                         hlr, hlr, hlr, 0.0, 1.0)
+
+        def drawnCounts(interpreter, detectorNames):
+            #the total counts (in electrons) in each bandpass on the named detectors
+            counts = {}
+            for detector in interpreter.detectors:
+                if detector.name not in detectorNames:
+                    continue
+                for bandpassName in interpreter.bandpasses:
+                    name = interpreter._getFileName(detector=detector, bandpassName=bandpassName)
+                    if name in interpreter.detectorImages:
+                        total = interpreter.detectorImages[name].array.sum()*detector.photParams.gain
+                        counts[bandpassName] = counts.get(bandpassName, 0.0) + total
+            return counts
+
+        detectorNames = [dd.name for dd in interpreter.detectors]
+        statistics = interpreter.getStatistics()
+        counts = drawnCounts(interpreter, detectorNames)
+        outputString = interpreter.drawObject(gsObject)
+        newStatistics = interpreter.getStatistics()
+        newCounts = drawnCounts(interpreter, detectorNames)
+
+        self.assertTrue(outputString is not None)
+        illumined = outputString.split('//')
+        self.assertTrue(len(illumined) > 1)
+        self.assertTrue(left.name in illumined)
+        self.assertTrue(right.name in illumined)
+
+        #the photons of the galaxy are shot once per bandpass, however many detectors it illumines
+        self.assertEqual(newStatistics['straddlerDraws'] - statistics['straddlerDraws'],
+                         len(interpreter.bandpasses))
+        self.assertEqual(newStatistics['photDraws'] - statistics['photDraws'],
+                         len(interpreter.bandpasses))
+
+        #draw the same galaxy on each detector separately; the detectors should receive the
+        #same total flux to within Poisson noise
+        class separateStraddlerCatalog(straddlerCatalog):
+            shootStraddlersOnce = False
+
+        controlCat = separateStraddlerCatalog(gals, obs_metadata = self.obs_metadata)
+        controlCat.write_catalog(catName)
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+        controlInterpreter = controlCat.galSimInterpreter
+        controlCounts = drawnCounts(controlInterpreter, detectorNames)
+        controlOutputString = controlInterpreter.drawObject(gsObject)
+        newControlCounts = drawnCounts(controlInterpreter, detectorNames)
+        self.assertEqual(controlOutputString, outputString)
+
+        for bandpassName in interpreter.bandpasses:
+            straddlerFlux = newCounts[bandpassName] - counts.get(bandpassName, 0.0)
+            controlFlux = newControlCounts[bandpassName] - controlCounts.get(bandpassName, 0.0)
+            self.assertTrue(controlFlux > 0.0)
+            self.assertTrue(numpy.abs(straddlerFlux - controlFlux) < 5.0*numpy.sqrt(2.0*controlFlux),
+                            msg='%s: %e %e' % (bandpassName, straddlerFlux, controlFlux))
+
+
+    def testFFTDrawing(self):
+        """
+        Test that GalSimInterpreter puts the right number of counts on images of Galaxy bulges
+        when the objects are drawn with FFTs
+        """
+        catName = 'testFFTCat.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = fftCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+
+        statistics = cat.galSimInterpreter.getStatistics()
+        self.assertTrue(statistics['fftDraws'] > 0)
+        self.assertEqual(statistics['photDraws'], 0)
+
+        self.catalogTester(catName=catName, catalog=cat, nameRoot='fft')
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+        #by default, these galaxies should be photon shot
+        cat = psfCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+        statistics = cat.galSimInterpreter.getStatistics()
+        self.assertTrue(statistics['photDraws'] > 0)
+        self.assertEqual(statistics['fftDraws'], 0)
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+        #when the method is chosen for each object, most of these faint galaxies should be photon shot
+        cat = autoDrawCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+        statistics = cat.galSimInterpreter.getStatistics()
+        self.assertTrue(statistics['photDraws'] > statistics['fftDraws'])
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
+    def testPhotonBudget(self):
+        """
+        Test that GalSimInterpreter puts the right number of counts on images of Galaxy bulges
+        when the number of photons shot per object is limited
+        """
+        catName = 'testPhotonBudgetCat.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = photonBudgetCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+
+        statistics = cat.galSimInterpreter.getStatistics()
+        self.assertTrue(statistics['weightedPhotonDraws'] > 0)
+
+        self.catalogTester(catName=catName, catalog=cat, nameRoot='photonBudget')
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+        #with sky noise, faint objects can be drawn with much heavier photons than bright ones
+        cat = noisyPhotonBudgetCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+
+        statistics = cat.galSimInterpreter.getStatistics()
+        self.assertTrue(statistics['weightedPhotonDraws'] > 0)
+
+        self.catalogTester(catName=catName, catalog=cat, nameRoot='noisyPhotonBudget')
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+        interpreter = cat.galSimInterpreter
+        detector = interpreter.detectors[0]
+        interpreter.maxPhotons = 10
+        noiseLevel = interpreter._getNoiseLevel('r')
+        platescale = detector.photParams.platescale
+
+        weights = []
+        for magNorm in [18.0, 22.0]:
+            sed = Sed()
+            sed.setFlatSED()
+            sed.multiplyFluxNorm(sed.calcFluxNorm(magNorm, cat.bandpassDict['r']))
+            sed.multiplyFluxNorm(cat.photParams.exptime*cat.photParams.effarea*cat.photParams.nexp)
+
+            gsObject = GalSimCelestialObject('pointSource', sed, 0.0, 0.0, 0.0, 0.0,
+                                             0.0, 0.0, 0.0, 0.0, 0.0)
+
+            centeredObjDict, footprintDict = interpreter._createCenteredObjects(gsObject)
+            flux = interpreter._getBandFlux(gsObject, 'r')
+            weight = interpreter._getPhotonWeight(flux, centeredObjDict['r'], 'r', detector)
+            weights.append(weight)
+
+            #the extra variance in the brightest pixel is bounded by the variance of that pixel
+            peak = flux*centeredObjDict['r'].maxSB()*platescale*platescale
+            self.assertTrue((weight - 1.0)*peak <=
+                            interpreter.photonNoiseFraction*(peak + noiseLevel*noiseLevel)*(1.0 + 1.0e-10))
+
+        self.assertTrue(weights[1] > 1.01)
+        self.assertTrue(weights[1] > weights[0])
+
+
+    def testUnresolvedGalaxies(self):
+        """
+        Test that GalSimInterpreter puts the right number of counts on images of galaxies
+        when galaxies much smaller than the PSF are drawn as a broadened PSF or as point sources
+        """
+        #only galaxies with shallow profiles (i.e. disks) are drawn as a broadened PSF
+        for catClass, dbClass, nameRoot in [(broadenedGalaxyCatalog, testGalaxyDiskDBObj, 'broadenedGalaxies'),
+                                            (pointSourceGalaxyCatalog, testGalaxyBulgeDBObj, 'pointSourceGalaxies')]:
+
+            catName = 'test%sCat.sav' % nameRoot
+            gals = dbClass(driver=self.driver, database=self.dbName)
+            cat = catClass(gals, obs_metadata = self.obs_metadata)
+            cat.write_catalog(catName)
+
+            statistics = cat.galSimInterpreter.getStatistics()
+            self.assertTrue(statistics[nameRoot] > 0)
+
+            self.catalogTester(catName=catName, catalog=cat, nameRoot=nameRoot)
+            if os.path.exists(catName):
+                os.unlink(catName)
+
+        #the demoted galaxies were drawn by the point source fast path
+        self.assertTrue(statistics['batchedPointSources'] > 0)
+
+
+    def testBroadenedPSFAccuracy(self):
+        """
+        Test that galaxies near the size below which they are drawn as a broadened PSF look
+        like Sersic profiles convolved with the PSF, and that steep profiles are never broadened
+        """
+        catName = 'testBroadenedPSFAccuracyCat.sav'
+        gals = testGalaxyDiskDBObj(driver=self.driver, database=self.dbName)
+        cat = broadenedGalaxyCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+        interpreter = cat.galSimInterpreter
+        sed = Sed()
+        sed.setFlatSED()
+        psfRadius = interpreter._getPSFHalfLightRadiusAt(0.0, 0.0)
+
+        for ratio in [0.2, 0.3]:
+            for sindex in [0.5, 1.0, 1.5]:
+                hlr = radiansFromArcsec(ratio*psfRadius)
+                gsObject = GalSimCelestialObject('sersic', sed, 0.0, 0.0, 0.0, 0.0,
+                                                 hlr, 0.7*hlr, hlr, 0.5, sindex)
+
+                interpreter.unresolvedRadiusRatio = 0.35
+                broadened = interpreter.drawSersic(gsObject).drawImage(nx=64, ny=64, scale=0.2).array
+                interpreter.unresolvedRadiusRatio = None
+                control = interpreter.drawSersic(gsObject).drawImage(nx=64, ny=64, scale=0.2).array
+
+                self.assertTrue(numpy.abs(broadened - control).max() < 0.03*control.max())
+
+        #a de Vaucouleurs galaxy is drawn as a Sersic profile however small it is
+        interpreter.unresolvedRadiusRatio = 0.35
+        hlr = radiansFromArcsec(0.2*psfRadius)
+        for sindex, broadenedGalaxies in [(4.0, 0), (1.0, 1)]:
+            gsObject = GalSimCelestialObject('sersic', sed, 0.0, 0.0, 0.0, 0.0,
+                                             hlr, 0.7*hlr, hlr, 0.5, sindex)
+            statistics = interpreter.getStatistics()
+            interpreter._demoteUnresolvedGalaxy(gsObject)
+            newStatistics = interpreter.getStatistics()
+            self.assertEqual(newStatistics['broadenedGalaxies'] - statistics['broadenedGalaxies'],
+                             broadenedGalaxies)
+
+
+    def testSersicCache(self):
+        """
+        Test that GalSimInterpreter puts the right number of counts on images of Galaxy bulges
+        when Sersic profiles are taken from the Sersic profile cache
+        """
+        catName = 'testSersicCacheCat.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = sersicCacheCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+
+        statistics = cat.galSimInterpreter.getStatistics()
+        self.assertTrue(statistics['sersicCacheHits'] > 0)
+        self.assertTrue(statistics['sersicCacheMisses'] < statistics['sersicCacheHits'])
+
+        self.catalogTester(catName=catName, catalog=cat, nameRoot='sersicCache')
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+        #indices which round to the same grid point share a profile
+        interpreter = cat.galSimInterpreter
+        self.assertTrue(interpreter._getUnitSersic(3.9) is interpreter._getUnitSersic(4.1))
+        self.assertFalse(interpreter._getUnitSersic(3.7) is interpreter._getUnitSersic(4.1))
+        self.assertAlmostEqual(interpreter._getUnitSersic(4.1).getHalfLightRadius(), 1.0, 6)
+
+
+    def testFootprintCacheKeys(self):
+        """
+        Test that galaxies whose shape parameters are not positive are given no footprint
+        cache key, rather than sharing a key derived from the logarithm of zero
+        """
+        catName = 'testFootprintCacheKeysCat.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = testGalaxyCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+        interpreter = cat.galSimInterpreter
+
+        galSimType = numpy.array(['sersic', 'sersic', 'sersic', 'sersic', 'pointSource'])
+        halfLightRadius = numpy.array([1.0, 0.0, 1.0, 1.0, 0.0])
+        sindex = numpy.array([4.0, 4.0, 4.0, 1.0, 0.0])
+        minorAxis = numpy.array([0.5, 0.5, 0.0, 0.5, 0.0])
+        majorAxis = numpy.array([1.0, 1.0, 1.0, 1.0, 0.0])
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            keys = interpreter._footprintCacheKeys(galSimType, halfLightRadius, sindex,
+                                                   minorAxis, majorAxis, 'r')
+
+        self.assertTrue(keys[0] is not None)
+        self.assertTrue(keys[1] is None)
+        self.assertTrue(keys[2] is None)
+        self.assertTrue(keys[3] is not None)
+        self.assertTrue(keys[4] is not None)
+        self.assertNotEqual(keys[0], keys[3])
+
+
+    def testTemplateBank(self):
+        """
+        Test that GalSimInterpreter puts the right number of counts on images of Galaxy bulges
+        drawn from a template bank
+        """
+        catName = 'testTemplateBankCat.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = templateBankCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+
+        statistics = cat.galSimInterpreter.getStatistics()
+        self.assertTrue(statistics['templateBankMisses'] > 0)
+        self.assertEqual(statistics['sersicCacheHits'] + statistics['sersicCacheMisses'], 0)
+
+        self.catalogTester(catName=catName, catalog=cat, nameRoot='templateBank')
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
+    def testSingleFootprintPass(self):
+        """
+        Test that GalSimInterpreter puts the right number of counts on images of Galaxy bulges
+        convolved with a wavelength dependent PSF when footprints are only evaluated in the
+        bandpass with the widest PSF
+        """
+        catName = 'testSingleFootprintCat.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = singleFootprintCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+        self.catalogTester(catName=catName, catalog=cat, nameRoot='singleFootprint')
+
+        #the PSF is widest at the shortest wavelength
+        self.assertEqual(cat.galSimInterpreter._getFootprintBandpass(), 'u')
+
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+        #compare with a catalog that evaluates footprints in every bandpass;
+        #the single pass should look up one footprint per object rather than
+        #one per object per bandpass
+        class multipleFootprintCatalog(singleFootprintCatalog):
+            singleFootprintPass = False
+
+        controlCat = multipleFootprintCatalog(gals, obs_metadata = self.obs_metadata)
+        controlCat.write_catalog(catName)
+
+        statistics = cat.galSimInterpreter.getStatistics()
+        controlStatistics = controlCat.galSimInterpreter.getStatistics()
+        nLookups = statistics['footprintCacheHits'] + statistics['footprintCacheMisses']
+        nControlLookups = controlStatistics['footprintCacheHits'] + controlStatistics['footprintCacheMisses']
+        self.assertTrue(nLookups > 0)
+        self.assertEqual(nLookups*len(cat.bandpassNames), nControlLookups)
+
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
+    def testIntegerPixels(self):
+        """
+        Test that images stored as integer electron counts contain the same flux
+        as images stored as floating point ADU
+        """
+        catName = 'testIntegerPixelCat.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+
+        intCat = integerPixelCatalog(gals, obs_metadata = self.obs_metadata)
+        intCat.write_catalog(catName)
+
+        floatCat = psfCatalog(gals, obs_metadata = self.obs_metadata)
+        floatCat.write_catalog(catName)
+
+        gain = intCat.photParams.gain
+        self.assertEqual(len(intCat.galSimInterpreter.detectorImages),
+                         len(floatCat.galSimInterpreter.detectorImages))
+
+        for name in floatCat.galSimInterpreter.detectorImages:
+            intArray = intCat.galSimInterpreter.detectorImages[name].array
+            floatArray = floatCat.galSimInterpreter.detectorImages[name].array
+            self.assertEqual(intArray.dtype, numpy.int32)
+            self.assertEqual(floatArray.dtype, numpy.float32)
+
+            electrons = float(intArray.sum())
+            controlElectrons = float(floatArray.sum())*gain
+            if controlElectrons > 1000.0:
+                self.assertTrue(numpy.abs(electrons/controlElectrons - 1.0) < 0.05)
+
+        #photons binned into integer images are summed before they are rounded
+        interpreter = intCat.galSimInterpreter
+        image = galsim.Image(10, 10, dtype=numpy.int32)
+        interpreter._binPhotons(image, numpy.ones(10)*5.0, numpy.ones(10)*5.0, numpy.ones(10)*1.4)
+        self.assertEqual(image.array.sum(), 14)
+        self.assertEqual(image(5, 5), 14)
+
+        #integer images are never drawn with weighted photons
+        budgetCat = integerBudgetCatalog(gals, obs_metadata = self.obs_metadata)
+        budgetCat.write_catalog(catName)
+        self.assertEqual(budgetCat.galSimInterpreter.getStatistics()['weightedPhotonDraws'], 0)
+
+        for name in floatCat.galSimInterpreter.detectorImages:
+            electrons = float(budgetCat.galSimInterpreter.detectorImages[name].array.sum())
+            controlElectrons = float(floatCat.galSimInterpreter.detectorImages[name].array.sum())*gain
+            if controlElectrons > 1000.0:
+                self.assertTrue(numpy.abs(electrons/controlElectrons - 1.0) < 0.05)
+
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
+    def testSpectrum(self):
+        """
+        Test that the galsim.SED which GalSimInterpreter builds from a LookupTable agrees
+        with an SED that interpolates the original Sed with numpy.interp, both inside and
+        outside of the wavelength range of the Sed
+        """
+        catName = 'testSpectrumCat.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = psfCatalog(gals, obs_metadata = self.obs_metadata)
+        cat.write_catalog(catName)
+        interpreter = cat.galSimInterpreter
+
+        wavelen = numpy.arange(400.0, 600.0, 0.5)
+        sed = Sed(wavelen=wavelen, flambda=1.0e-15*(1.0+numpy.sin(wavelen/10.0)**2))
+        gsObject = GalSimCelestialObject('pointSource', sed, 0.0, 0.0, 0.0, 0.0,
+                                         0.0, 0.0, 0.0, 0.0, 0.0)
+
+        spectrum = interpreter._getSpectrum(gsObject)
+        self.assertTrue(interpreter._getSpectrum(gsObject) is spectrum)
+
+        control = galsim.SED(spec = lambda ll: numpy.interp(ll, sed.wavelen, sed.flambda),
+                             flux_type='flambda')
+
+        for ww in numpy.arange(interpreter._minWavelength, interpreter._maxWavelength, 7.3):
+            self.assertAlmostEqual(spectrum(ww)/control(ww), 1.0, 6)
+
+        for bandpassName in interpreter.bandpasses:
+            bandpass = interpreter.bandpasses[bandpassName]
+            self.assertAlmostEqual(spectrum.calculateFlux(bandpass)/control.calculateFlux(bandpass), 1.0, 4)
+
+            #the flux used by the achromatic fast path should agree with GalSim's integral
+            self.assertAlmostEqual(interpreter._getBandFlux(gsObject, bandpassName)/spectrum.calculateFlux(bandpass),
+                                   1.0, 2)
+
+        #Seds made from the same template share one cached galsim.SED,
+        #scaled by their own normalizations
+        spectra = []
+        misses = interpreter.getStatistics()['spectrumCacheMisses']
+        for normalization in [2.0, 5.0]:
+            templateSed = Sed(wavelen=wavelen, flambda=normalization*sed.flambda)
+            templateSed.galSimTemplate = ('testTemplate', 0.0, 0.0, 0.0, 0.0, 0.0)
+            templateSed.galSimNormalization = normalization
+            spectra.append(interpreter._getSpectrum(GalSimCelestialObject('pointSource', templateSed,
+                                                                          0.0, 0.0, 0.0, 0.0, 0.0,
+                                                                          0.0, 0.0, 0.0, 0.0)))
+
+        self.assertEqual(interpreter.getStatistics()['spectrumCacheMisses'], misses + 1)
+        for ww in numpy.arange(interpreter._minWavelength, interpreter._maxWavelength, 7.3):
+            self.assertAlmostEqual(spectra[0](ww)/(2.0*control(ww)), 1.0, 6)
+            self.assertAlmostEqual(spectra[1](ww)/(5.0*control(ww)), 1.0, 6)
+
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
     def testBackground(self):
         """
         Test that GalSimInterpreter puts the right number of counts on images of Galaxy bulges with
@@ -620,6 +1476,304 @@ class GalSimInterfaceTest(unittest.TestCase):
         msg = 'var %e varADU %e ; ratio %e ; background %e' % (var, varADU, var/varADU, background)
         self.assertTrue(numpy.abs(var/varADU - 1.0) < 0.05, msg=msg)
 
+        noiseLevel = noise.getNoiseLevel(bandpass, m5=m5, seeing=lsstDefaults.seeing('r'),
+                                         photParams=photParams)
+
+        self.assertAlmostEqual(noiseLevel*noiseLevel/varElectrons, 1.0, 10)
+
+        noise = ExampleCCDNoise(seed=42, addNoise=False)
+        self.assertEqual(noise.getNoiseLevel(bandpass, m5=m5, seeing=lsstDefaults.seeing('r'),
+                                             photParams=photParams), 0.0)
+
+
+    def testSkyLimitedFootprint(self):
+        """
+        Test that, when noise is added to the images, bright objects are given
+        larger footprints than faint objects, and that no object is given a
+        footprint smaller than GalSim's default
+        """
+        catName = 'testSkyLimitedCatalog.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = noisyCatalog(gals, obs_metadata=self.obs_metadata)
+        cat.write_catalog(catName)
+        interpreter = cat.galSimInterpreter
+        interpreter.skyLimitedFootprint = True
+
+        footprints = []
+        for magNorm in [16.0, 26.0]:
+            sed = Sed()
+            sed.setFlatSED()
+            sed.multiplyFluxNorm(sed.calcFluxNorm(magNorm, cat.bandpassDict['r']))
+            sed.multiplyFluxNorm(cat.photParams.exptime*cat.photParams.effarea*cat.photParams.nexp)
+
+            gsObject = GalSimCelestialObject('pointSource', sed, 0.0, 0.0, 0.0, 0.0,
+                                             0.0, 0.0, 0.0, 0.0, 0.0)
+
+            centeredObjDict, footprintDict = interpreter._createCenteredObjects(gsObject)
+            defaultFootprint = interpreter._getFootprint(gsObject, 'r', centeredObjDict['r'])
+            footprints.append(footprintDict['r'])
+
+            if magNorm < 20.0:
+                self.assertTrue(footprintDict['r'] > defaultFootprint)
+            else:
+                self.assertTrue(footprintDict['r'] >= defaultFootprint)
+
+        self.assertTrue(footprints[0] > footprints[1])
+
+        interpreter.skyLimitedFootprint = False
+        centeredObjDict, footprintDict = interpreter._createCenteredObjects(gsObject)
+        self.assertAlmostEqual(footprintDict['r'], defaultFootprint, 10)
+
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
+    def testBandFluxCache(self):
+        """
+        Test that drawObjectList only integrates the Sed of each object over each bandpass once,
+        even though the fluxes are needed to cull, size, and draw the objects
+        """
+        catName = 'testBandFluxCatalog.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = noisyCatalog(gals, obs_metadata=self.obs_metadata)
+        cat.write_catalog(catName)
+        interpreter = cat.galSimInterpreter
+        interpreter.snrFloor = 5.0
+        interpreter.achromaticFastPath = True
+
+        gsObjectList = []
+        for magNorm in [16.0, 17.0, 18.0]:
+            sed = Sed()
+            sed.setFlatSED()
+            sed.multiplyFluxNorm(sed.calcFluxNorm(magNorm, cat.bandpassDict['r']))
+            sed.multiplyFluxNorm(cat.photParams.exptime*cat.photParams.effarea*cat.photParams.nexp)
+
+            gsObjectList.append(GalSimCelestialObject('pointSource', sed, 0.0, 0.0, 0.0, 0.0,
+                                                      0.0, 0.0, 0.0, 0.0, 0.0))
+
+        statistics = interpreter.getStatistics()
+        interpreter.drawObjectList(gsObjectList)
+        newStatistics = interpreter.getStatistics()
+        self.assertEqual(newStatistics['bandFluxCalculations'] - statistics['bandFluxCalculations'],
+                         len(gsObjectList)*len(interpreter.bandpasses))
+
+        #on the default chromatic path, GalSim integrates the Seds as it draws the objects
+        #and nothing else needs their fluxes
+        interpreter.snrFloor = None
+        interpreter.achromaticFastPath = False
+        gsObjectList = [GalSimCelestialObject('pointSource', gsObject.sed, 0.0, 0.0, 0.0, 0.0,
+                                              0.0, 0.0, 0.0, 0.0, 0.0) for gsObject in gsObjectList]
+
+        statistics = interpreter.getStatistics()
+        interpreter.drawObjectList(gsObjectList)
+        newStatistics = interpreter.getStatistics()
+        self.assertEqual(newStatistics['bandFluxCalculations'], statistics['bandFluxCalculations'])
+        self.assertTrue(newStatistics['photDraws'] > statistics['photDraws'])
+
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
+    def testBatchCulling(self):
+        """
+        Test that drawObjectList culls a batch on its columns, only building the
+        objects which are actually drawn
+        """
+        catName = 'testBatchCullingCatalog.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = noisyCatalog(gals, obs_metadata=self.obs_metadata)
+        cat.write_catalog(catName)
+        interpreter = cat.galSimInterpreter
+        interpreter.snrFloor = 5.0
+
+        #a bright star, a star too faint to be drawn, and a bright star off of the camera
+        sedList = []
+        for magNorm in [16.0, 35.0, 16.0]:
+            sed = Sed()
+            sed.setFlatSED()
+            sed.multiplyFluxNorm(sed.calcFluxNorm(magNorm, cat.bandpassDict['r']))
+            sed.multiplyFluxNorm(cat.photParams.exptime*cat.photParams.effarea*cat.photParams.nexp)
+            sedList.append(sed)
+
+        xPupil = numpy.array([0.0, 0.0, radiansFromArcsec(1.0e5)])
+        zeros = numpy.zeros(3)
+        batch = GalSimObjectBatch('pointSource', sedList, zeros, zeros, xPupil, zeros,
+                                  zeros, zeros, zeros, zeros, zeros)
+
+        builtSedList = []
+        createCenteredObjectDict = interpreter._createCenteredObjectDict
+        def recordingCreateCenteredObjectDict(gsObject):
+            builtSedList.append(gsObject.sed)
+            return createCenteredObjectDict(gsObject)
+        interpreter._createCenteredObjectDict = recordingCreateCenteredObjectDict
+
+        statistics = interpreter.getStatistics()
+        outputList = interpreter.drawObjectList(batch)
+        newStatistics = interpreter.getStatistics()
+
+        self.assertEqual(len(outputList), 3)
+        self.assertTrue(outputList[0] is not None)
+        self.assertTrue(outputList[1] is None)
+        self.assertTrue(outputList[2] is None)
+        self.assertEqual(newStatistics['culledObjects'] - statistics['culledObjects'], 1)
+        self.assertEqual(newStatistics['culledBandpasses'] - statistics['culledBandpasses'],
+                         len(interpreter.bandpasses))
+
+        #only the bright star on the camera was built
+        self.assertEqual(len(builtSedList), 1)
+        self.assertTrue(builtSedList[0] is sedList[0])
+
+        #a list of objects is treated in the same way
+        self.assertEqual(interpreter.drawObjectList(list(batch)), outputList)
+
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
+    def testFaintSourceCulling(self):
+        """
+        Test that objects whose predicted signal to noise ratio is below snrFloor
+        are not drawn and are not assigned to any detectors
+        """
+        catName = 'testFaintSourceCatalog.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+        cat = noisyCatalog(gals, obs_metadata=self.obs_metadata)
+        cat.write_catalog(catName)
+        interpreter = cat.galSimInterpreter
+        interpreter.snrFloor = 5.0
+
+        for magNorm in [16.0, 35.0]:
+            sed = Sed()
+            sed.setFlatSED()
+            sed.multiplyFluxNorm(sed.calcFluxNorm(magNorm, cat.bandpassDict['r']))
+            sed.multiplyFluxNorm(cat.photParams.exptime*cat.photParams.effarea*cat.photParams.nexp)
+
+            gsObject = GalSimCelestialObject('pointSource', sed, 0.0, 0.0, 0.0, 0.0,
+                                             0.0, 0.0, 0.0, 0.0, 0.0)
+
+            statistics = interpreter.getStatistics()
+            centeredObjDict, footprintDict = interpreter._createCenteredObjects(gsObject)
+            culledStatistics = interpreter.getStatistics()
+
+            if magNorm < 20.0:
+                self.assertTrue(interpreter._getSignalToNoise(gsObject, 'r') > interpreter.snrFloor)
+                self.assertEqual(len(footprintDict), len(interpreter.bandpasses))
+                self.assertEqual(culledStatistics['culledObjects'], statistics['culledObjects'])
+            else:
+                self.assertTrue(interpreter._getSignalToNoise(gsObject, 'r') < interpreter.snrFloor)
+                self.assertEqual(len(footprintDict), 0)
+                self.assertEqual(culledStatistics['culledObjects'], statistics['culledObjects']+1)
+                self.assertEqual(culledStatistics['culledBandpasses'],
+                                 statistics['culledBandpasses']+len(interpreter.bandpasses))
+                self.assertTrue(interpreter.drawObject(gsObject) is None)
+
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+        #a catalog in which every object is culled should draw nothing
+        class culledCatalog(noisyCatalog):
+            snrFloor = 1.0e10
+
+        culledCat = culledCatalog(gals, obs_metadata=self.obs_metadata)
+        culledCat.write_catalog(catName)
+        statistics = culledCat.galSimInterpreter.getStatistics()
+        self.assertTrue(statistics['culledObjects'] > 0)
+        self.assertEqual(statistics['photDraws'] + statistics['fftDraws'], 0)
+        self.assertEqual(len(culledCat.galSimInterpreter.detectorImages), 0)
+
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
+    def testFaintBackground(self):
+        """
+        Test that the flux of objects too faint to be drawn is added to the
+        detector images as a smooth background
+        """
+        catName = 'testFaintBackgroundCatalog.sav'
+        gals = testGalaxyBulgeDBObj(driver=self.driver, database=self.dbName)
+
+        class faintBackgroundCatalog(noisyCatalog):
+            snrFloor = 1.0e10
+            faintBackground = True
+
+        cat = faintBackgroundCatalog(gals, obs_metadata=self.obs_metadata)
+        cat.write_catalog(catName)
+        interpreter = cat.galSimInterpreter
+
+        statistics = interpreter.getStatistics()
+        self.assertTrue(statistics['aggregatedBandpasses'] > 0)
+        self.assertEqual(statistics['photDraws'] + statistics['fftDraws'], 0)
+        self.assertTrue(len(interpreter._faintBackgroundGrids) > 0)
+
+        #objects whose flux was aggregated are assigned to the detectors they fell on,
+        #so they still appear in the catalog (which omits objects with no fitsFiles)
+        with open(catName, 'r') as inputFile:
+            lines = [line for line in inputFile if line[0] != '#']
+        self.assertTrue(len(lines) > 0)
+
+        expectedCounts = {}
+        initialCounts = {}
+        for name in interpreter._faintBackgroundGrids:
+            detector, grid = interpreter._faintBackgroundGrids[name]
+            expectedCounts[name] = grid.sum()/detector.photParams.gain
+            initialCounts[name] = interpreter.detectorImages[name].array.sum()
+
+        interpreter._applyFaintBackground()
+        self.assertEqual(len(interpreter._faintBackgroundGrids), 0)
+
+        for name in expectedCounts:
+            counts = interpreter.detectorImages[name].array.sum() - initialCounts[name]
+            gain = cat.photParams.gain
+            msg = 'counts %e expected %e' % (counts, expectedCounts[name])
+            self.assertTrue(numpy.abs(counts - expectedCounts[name]) < 5.0*numpy.sqrt(expectedCounts[name]/gain) + 1.0,
+                            msg=msg)
+
+        if os.path.exists(catName):
+            os.unlink(catName)
+
+
+    def testObjectBatch(self):
+        """
+        Test that GalSimObjectBatch yields objects with the same attributes
+        as the equivalent GalSimCelestialObjects
+        """
+        numpy.random.seed(42)
+        nObjects = 10
+        sedList = [Sed() for ix in range(nObjects)]
+        columns = [numpy.random.random_sample(nObjects)*radiansFromArcsec(100.0) for ix in range(9)]
+
+        batch = GalSimObjectBatch('sersic', sedList, *columns)
+        self.assertEqual(len(batch), nObjects)
+
+        attributes = ['galSimType', 'sed', 'raRadians', 'decRadians', 'xPupilRadians', 'xPupilArcsec',
+                      'yPupilRadians', 'yPupilArcsec', 'halfLightRadiusRadians', 'halfLightRadiusArcsec',
+                      'minorAxisRadians', 'majorAxisRadians', 'positionAngleRadians', 'sindex']
+
+        for ix, batchObject in enumerate(batch):
+            control = GalSimCelestialObject('sersic', sedList[ix], *[cc[ix] for cc in columns])
+            for attribute in attributes:
+                if attribute in ('galSimType', 'sed'):
+                    self.assertTrue(getattr(batchObject, attribute) is getattr(control, attribute) or
+                                    getattr(batchObject, attribute) == getattr(control, attribute))
+                else:
+                    self.assertAlmostEqual(getattr(batchObject, attribute), getattr(control, attribute), 10)
+
+        #slices are batches
+        subBatch = batch[2:5]
+        self.assertEqual(len(subBatch), 3)
+        self.assertAlmostEqual(subBatch[0].xPupilArcsec, batch[2].xPupilArcsec, 10)
+        self.assertTrue(subBatch[0].sed is sedList[2])
+
+        subBatch = batch[numpy.array([1, 7])]
+        self.assertEqual(len(subBatch), 2)
+        self.assertAlmostEqual(subBatch[1].sindex, columns[8][7], 10)
+
+        #the objects cannot be modified
+        self.assertRaises(AttributeError, setattr, batch[0], 'sindex', 2.0)
+
+        self.assertRaises(RuntimeError, GalSimObjectBatch, 'sersic', sedList[:5], *columns)
+
 
     def testMultipleImages(self):
         """
@@ -651,6 +1805,12 @@ class GalSimInterfaceTest(unittest.TestCase):
         catName = 'multipleStarCatalog.sav'
         cat.write_catalog(catName)
         self.catalogTester(catName=catName, catalog=cat, nameRoot='multipleStars')
+
+        #all of the stars share a footprint, so it should only have been
+        #calculated for the first star (once per bandpass)
+        statistics = cat.galSimInterpreter.getStatistics()
+        self.assertEqual(statistics['footprintCacheMisses'], len(cat.bandpassNames))
+        self.assertTrue(statistics['footprintCacheHits'] > 0)
         if os.path.exists(catName):
             os.unlink(catName)
 
@@ -44,6 +44,21 @@ class placementCatalog(GalSimStars):
                         ]
 
 
+class placementStampCatalog(placementCatalog):
+    """
+    Draws every star from a pre-rendered image of the PSF
+    """
+    psfStampFluxThreshold = 1.0e10
+
+
+class placementAnalyticCatalog(placementCatalog):
+    """
+    Draws every star by integrating the PSF over pixels analytically
+    """
+    analyticPointSources = True
+    achromaticFastPath = True
+
+
 class GalSimPlacementTest(unittest.TestCase):
 
     def setUp(self):
@@ -137,6 +152,32 @@ class GalSimPlacementTest(unittest.TestCase):
         circles of 2 fwhm radii about the object's expected positions with
         the actual expected flux of the objects.
         """
+        self.placementTester(placementCatalog)
+
+
+    def testStampPlacement(self):
+        """
+        Test that objects drawn from pre-rendered images of the PSF
+        are placed on the correct pixel (see testObjectPlacement)
+        """
+        self.placementTester(placementStampCatalog)
+
+
+    def testAnalyticPlacement(self):
+        """
+        Test that objects drawn by integrating the PSF over pixels analytically
+        are placed on the correct pixel (see testObjectPlacement)
+        """
+        self.placementTester(placementAnalyticCatalog)
+
+
+    def placementTester(self, catalogClass):
+        """
+        Draw images of stars with the catalog class catalogClass and verify that the stars
+        were placed on the correct pixels (see testObjectPlacement)
+
+        @param [in] catalogClass is a daughter class of placementCatalog
+        """
         scratchDir = os.path.join(getPackageDir('sims_GalSimInterface'), 'tests', 'scratchSpace')
         catName = os.path.join(scratchDir, 'placementCatalog.dat')
         imageRoot = os.path.join(scratchDir, 'placementImage')
@@ -192,7 +233,7 @@ class GalSimPlacementTest(unittest.TestCase):
             create_text_catalog(obs, dbFileName, xDisplacementList, yDisplacementList,
                                 mag_norm=[self.magNorm]*len(xDisplacementList))
             db = placementFileDBObj(dbFileName, runtable='test')
-            cat = placementCatalog(db, obs_metadata=obs)
+            cat = catalogClass(db, obs_metadata=obs)
             if actualCounts is None:
                 actualCounts = controlSed.calcADU(uBandpass, cat.photParams)
 
@@ -0,0 +1,166 @@
+import unittest
+import os
+import numpy
+import galsim
+import lsst.utils.tests as utilsTests
+
+from lsst.sims.utils import radiansFromArcsec
+from lsst.sims.GalSimInterface import GalSimTemplateBank, GalSimCelestialObject, \
+                                      DoubleGaussianPSF, SNRdocumentPSF, PSFbase
+
+
+class gaussianPSF(PSFbase):
+    """
+    A Gaussian PSF with a given half light radius
+    """
+
+    wavelength_dependent = False
+
+    position_dependent = False
+
+    def __init__(self, halfLightRadius):
+        self._cached_psf = galsim.Gaussian(half_light_radius=halfLightRadius)
+
+    def _getPSF(self, xPupil=None, yPupil=None, **kwargs):
+        return self._cached_psf
+
+class GalSimTemplateBankTest(unittest.TestCase):
+
+    def getGalaxy(self, hlr, sindex, minor=1.0, major=1.0, pa=0.0):
+        """
+        Return a GalSimCelestialObject representing a Sersic profile
+
+        @param [in] hlr is the half light radius in arcseconds
+
+        @param [in] sindex is the Sersic index
+
+        @param [in] minor and major set the axis ratio
+
+        @param [in] pa is the position angle in degrees
+        """
+        return GalSimCelestialObject('sersic', None, 0.0, 0.0, 0.0, 0.0,
+                                     radiansFromArcsec(hlr), minor, major, numpy.radians(pa), sindex)
+
+
+    def getMoments(self, obj, scale=0.05, size=512):
+        """
+        Return the flux and the second moments (Ixx, Iyy, Ixy) of a GalSim object
+        """
+        image = obj.drawImage(nx=size, ny=size, scale=scale, method='no_pixel')
+        xx, yy = numpy.meshgrid(numpy.arange(size) - 0.5*(size-1), numpy.arange(size) - 0.5*(size-1))
+        xx = xx*scale
+        yy = yy*scale
+        flux = image.array.sum()
+        ixx = (image.array*xx*xx).sum()/flux
+        iyy = (image.array*yy*yy).sum()/flux
+        ixy = (image.array*xx*yy).sum()/flux
+        return flux, ixx, iyy, ixy
+
+
+    def testHalfLightRadius(self):
+        """
+        Test that PSFbase.getHalfLightRadius agrees with the half light radius of a Gaussian
+        """
+        psf = DoubleGaussianPSF(fwhm1=0.6, fwhm2=0.6, wgt1=1.0, wgt2=0.0)
+        sigma = 0.6/2.355
+        self.assertTrue(numpy.abs(psf.getHalfLightRadius()/(1.17741*sigma) - 1.0) < 0.02)
+
+
+    def testTemplates(self):
+        """
+        Test that galaxies drawn from the template bank have the flux and second moments
+        of the galaxies convolved with the PSF
+        """
+        psf = SNRdocumentPSF()
+        bank = GalSimTemplateBank()
+
+        #the moments of the wings of high Sersic index profiles are poorly approximated,
+        #so only test a round n=4 profile
+        for hlr, sindex, minor, pa in [(0.5, 1.0, 1.0, 0.0), (1.0, 4.0, 1.0, 0.0),
+                                       (0.6, 1.0, 0.5, 30.0), (0.2, 1.0, 0.7, 75.0)]:
+            gsObject = self.getGalaxy(hlr, sindex, minor=minor, pa=pa)
+
+            control = galsim.Sersic(n=sindex, half_light_radius=hlr)
+            control = control.shear(q=minor, beta=(0.5*numpy.pi-gsObject.positionAngleRadians)*galsim.radians)
+            control = psf.applyPSF(xPupil=0.0, yPupil=0.0, obj=control)
+
+            test = bank.drawSersic(gsObject, psf)
+
+            controlMoments = self.getMoments(control)
+            testMoments = self.getMoments(test)
+
+            self.assertTrue(numpy.abs(testMoments[0]/controlMoments[0] - 1.0) < 0.02)
+            controlSize = controlMoments[1] + controlMoments[2]
+            self.assertTrue(numpy.abs((testMoments[1] + testMoments[2])/controlSize - 1.0) < 0.1)
+            self.assertTrue(numpy.abs(testMoments[3] - controlMoments[3]) < 0.1*controlSize)
+
+        self.assertTrue(bank.misses > 0)
+        misses = bank.misses
+        bank.drawSersic(self.getGalaxy(0.5, 1.0), psf)
+        self.assertEqual(bank.misses, misses)
+
+
+    def testPersistence(self):
+        """
+        Test that a template bank can be written to disk and read back in
+        """
+        fileName = 'testTemplateBank.npz'
+        psf = SNRdocumentPSF()
+        bank = GalSimTemplateBank()
+        gsObject = self.getGalaxy(0.5, 1.0, minor=0.5, pa=10.0)
+        control = bank.drawSersic(gsObject, psf)
+        bank.writeBank(fileName)
+
+        newBank = GalSimTemplateBank()
+        newBank.readBank(fileName)
+        test = newBank.drawSersic(gsObject, psf)
+        self.assertEqual(newBank.misses, 0)
+
+        controlImage = control.drawImage(nx=64, ny=64, scale=0.2)
+        testImage = test.drawImage(nx=64, ny=64, scale=0.2)
+        numpy.testing.assert_array_almost_equal(controlImage.array, testImage.array, decimal=6)
+
+        #templates rendered with a different PSF are discarded
+        newBank.drawSersic(gsObject, SNRdocumentPSF(fwhm=1.0))
+        self.assertEqual(newBank.misses, 1)
+
+        #even if the PSF has the same half light radius as the PSF with which they were rendered
+        psfHalfLightRadius = psf.getHalfLightRadius()
+        otherPSF = gaussianPSF(psfHalfLightRadius)
+        self.assertNotEqual(bank._getPSFFingerprint(psf, psfHalfLightRadius),
+                            bank._getPSFFingerprint(otherPSF, psfHalfLightRadius))
+
+        newBank = GalSimTemplateBank()
+        newBank.readBank(fileName)
+        newBank.drawSersic(gsObject, otherPSF)
+        self.assertEqual(newBank.misses, 1)
+
+        if os.path.exists(fileName):
+            os.unlink(fileName)
+
+        #the bank is written under exactly the name it is given, even without an extension
+        fileName = 'testTemplateBankNoExtension'
+        bank.writeBank(fileName)
+        self.assertTrue(os.path.exists(fileName))
+        self.assertFalse(os.path.exists(fileName + '.npz'))
+
+        newBank = GalSimTemplateBank()
+        newBank.readBank(fileName)
+        newBank.drawSersic(gsObject, psf)
+        self.assertEqual(newBank.misses, 0)
+
+        if os.path.exists(fileName):
+            os.unlink(fileName)
+
+
+def suite():
+    utilsTests.init()
+    suites = []
+    suites += unittest.makeSuite(GalSimTemplateBankTest)
+
+    return unittest.TestSuite(suites)
+
+def run(shouldExit = False):
+    utilsTests.run(suite(), shouldExit)
+if __name__ == "__main__":
+    run(True)